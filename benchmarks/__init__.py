@@ -0,0 +1 @@
+"""pyspire hot-path benchmarks; run with `python -m benchmarks --help`."""
@@ -0,0 +1,64 @@
+# benchmarks/__main__.py
+"""
+Run the pyspire benchmark suite from the repo root (pyspire installed,
+e.g. `pip install -e .`).
+
+    python -m benchmarks                          # everything, table to stdout
+    python -m benchmarks --quick -k event_emit    # light cases matching a filter
+    python -m benchmarks --out now.json --baseline base.json
+    python -m benchmarks --save-baseline base.json
+
+Exits 1 when --baseline is given and any case is slower than the
+baseline by more than --threshold.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+from . import cases  # noqa: F401  (registers cases)
+from .harness import REGISTRY, Result, compare, format_seconds, load, measure, to_json
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks")
+    ap.add_argument("-k", "--filter", default="", help="only run cases whose name contains this")
+    ap.add_argument("--quick", action="store_true", help="skip heavy (4K / 1000+ sprite) cases")
+    ap.add_argument("--min-time", type=float, default=0.2, help="seconds to spend per case")
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--baseline", help="compare against this results JSON")
+    ap.add_argument("--save-baseline", help="write results JSON here as the new baseline")
+    ap.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown ratio (0.10 = 10%%)")
+    args = ap.parse_args(argv)
+
+    results: List[Result] = []
+    for case in REGISTRY:
+        if args.filter not in case.name or (args.quick and case.heavy):
+            continue
+        r = measure(case, min_time=args.min_time)
+        results.append(r)
+        print(f"{r.name:<48}{format_seconds(r.per_op_s):>14}/op  ({r.rounds} rounds)", flush=True)
+
+    data = to_json(results)
+    for path in (args.out, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, indent=2)
+
+    if not args.baseline:
+        return 0
+    regressions = 0
+    print(f"\n{'case':<48}{'baseline':>14}{'current':>14}{'ratio':>8}")
+    for c in compare(data, load(args.baseline)):
+        flag = ""
+        if c.ratio > 1.0 + args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{c.name:<48}{format_seconds(c.baseline_s):>14}{format_seconds(c.current_s):>14}{c.ratio:>8.2f}{flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
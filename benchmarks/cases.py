@@ -0,0 +1,236 @@
+# benchmarks/cases.py
+from __future__ import annotations
+
+import atexit
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+import cairocffi
+
+from pyspire import (
+    CairoCompositor, EventBus, FrameArchiveSink, OutputProfile, PngEncoder, PySpire, SharedMemorySink, Size,
+    Sprite, SpriteLayer, TiledCompositor, Vec2,
+)
+from pyspire.animation import Bump, Fade, Sweep
+
+from .harness import bench
+
+RESOLUTIONS = {"1080p": Size(1920, 1080), "4k": Size(3840, 2160)}
+SPRITE_COUNTS = (10, 100, 1_000, 10_000)
+FANOUTS = (0, 1, 10, 100, 1_000, 10_000)
+ANIMATIONS_PER_ROUND = 100
+
+_TMP = tempfile.mkdtemp(prefix="pyspire-bench-")
+atexit.register(shutil.rmtree, _TMP, True)
+
+
+# ---- synthetic assets -------------------------------------------------------
+
+def make_asset(w: int = 240, h: int = 120, rgb=(0.2, 0.45, 0.8)) -> cairocffi.ImageSurface:
+    """Flat-colour card with an anti-aliased rounded edge, like the cmake diagrams."""
+    surface = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, w, h)
+    ctx = cairocffi.Context(surface)
+    r = h / 4
+    ctx.new_sub_path()
+    ctx.arc(w - r, r, r, -1.5708, 0)
+    ctx.arc(w - r, h - r, r, 0, 1.5708)
+    ctx.arc(r, h - r, r, 1.5708, 3.1416)
+    ctx.arc(r, r, r, 3.1416, 4.7124)
+    ctx.close_path()
+    ctx.set_source_rgba(*rgb, 0.95)
+    ctx.fill()
+    return surface
+
+
+def asset_png() -> str:
+    path = os.path.join(_TMP, "asset.png")
+    if not os.path.exists(path):
+        make_asset().write_to_png(path)
+    return path
+
+
+def make_scene(size: Size, n_sprites: int, base_filename: str = "", **kw: Any) -> PySpire:
+    spire = PySpire(size=size, base_filename=base_filename or os.path.join(_TMP, "frame"), **kw)
+    bg, fg = make_asset(), make_asset(160, 60, (0.95, 0.95, 0.95))
+    cols = max(1, int(size.width) // 120)
+    for i in range(n_sprites):
+        s = spire.add_sprite(f"s{i}")
+        s.layers.append(SpriteLayer(surface=bg))
+        s.layers.append(SpriteLayer(surface=fg, offset=Vec2(40, 30), opacity=0.8))
+        # spread over the canvas, overlapping like a busy diagram
+        s.position = Vec2((i % cols) * 120 % size.width, (i // cols) * 60 % size.height)
+    return spire
+
+
+# ---- compositing ------------------------------------------------------------
+
+for _res, _size in RESOLUTIONS.items():
+    for _n in SPRITE_COUNTS:
+        def _setup(size: Size = _size, n: int = _n) -> Callable[[], Any]:
+            spire = make_scene(size, n)
+            return spire.composite
+        bench(f"composite[{_res},sprites={_n}]", "composite", heavy=_n >= 1_000 or _res == "4k")(_setup)
+
+# backends: cairo vs NumPy blits (NumPy cases only when it's installed)
+COMPOSITORS: Dict[str, Callable[[], Any]] = {"cairo": CairoCompositor}
+try:
+    from pyspire.numpy_compositor import NumpyCompositor
+    COMPOSITORS["numpy"] = NumpyCompositor
+except ImportError:
+    pass
+
+for _res, _size in RESOLUTIONS.items():
+    for _backend, _make in COMPOSITORS.items():
+        def _setup(size: Size = _size, make: Callable[[], Any] = _make) -> Callable[[], Any]:
+            spire = make_scene(size, 100, compositor=make())
+            return spire.composite
+        bench(f"composite[{_res},backend={_backend},sprites=100]", "composite", heavy=_res == "4k")(_setup)
+
+
+# tiled compositing: scaling with thread count
+THREADS = (1, 2, 4, 8)
+
+for _threads in THREADS:
+    def _setup(threads: int = _threads) -> Callable[[], Any]:
+        spire = make_scene(RESOLUTIONS["4k"], 1_000, compositor=TiledCompositor(threads))
+        return spire.composite
+    bench(f"composite[4k,sprites=1000,threads={_threads}]", "composite", heavy=True)(_setup)
+
+
+# ---- render_frame with each output sink ------------------------------------
+
+def _png_sink(spire: PySpire) -> Callable[[], None]:
+    def reset() -> None:
+        spire.frame_no = 0  # overwrite the same file every round
+    return reset
+
+
+def _archive_sink(spire: PySpire) -> Callable[[], None]:
+    spire.sink = FrameArchiveSink(os.path.join(_TMP, "frames.pfa"))
+    return lambda: None
+
+
+def _shm_sink(spire: PySpire) -> Callable[[], None]:
+    # frames go to encoder processes; a round measures handoff, not encoding
+    sink = spire.sink = SharedMemorySink(PngEncoder(os.path.join(_TMP, "shm")), slots=8)
+    atexit.register(sink.close)
+    return lambda: None
+
+
+# name -> configure(spire), returning a per-round reset
+SINKS: Dict[str, Callable[[PySpire], Callable[[], None]]] = {
+    "png": _png_sink,
+    "archive": _archive_sink,
+    "shm": _shm_sink,
+}
+
+for _res, _size in RESOLUTIONS.items():
+    for _sink, _configure in SINKS.items():
+        def _setup(size: Size = _size, configure: Callable[[PySpire], Callable[[], None]] = _configure) -> Callable[[], Any]:
+            spire = make_scene(size, 100)
+            reset = configure(spire)
+            def run() -> None:
+                reset()
+                spire.render_frame()
+            return run
+        bench(f"render_frame[{_res},sink={_sink},sprites=100]", "render_frame", heavy=_res == "4k")(_setup)
+
+
+# ---- one simulation pass, several output profiles -------------------------
+
+# name -> profile scales relative to 4K
+OUTPUT_SETS = {"4k": (1.0,), "4k+1080p+480p": (1.0, 0.5, 480 / 2160)}
+
+for _name, _scales in OUTPUT_SETS.items():
+    def _setup(scales: tuple = _scales) -> Callable[[], Any]:
+        outputs = [OutputProfile(f"p{i}", scale=sc) for i, sc in enumerate(scales)]
+        spire = make_scene(RESOLUTIONS["4k"], 100, outputs=outputs)
+        def run() -> None:
+            spire.frame_no = 0
+            spire.render_frame()
+        return run
+    bench(f"render_frame[outputs={_name},sprites=100]", "render_frame", heavy=True)(_setup)
+
+
+# ---- Animation.step throughput ---------------------------------------------
+
+def _bump() -> Bump:
+    a, b = Sprite(name="a"), Sprite(name="b", position=Vec2(400, 0))
+    for s in (a, b):
+        s.layers.append(SpriteLayer(surface=_CARD))
+    return Bump(a, b, forward_time_s=0.5, hold_time_s=0.1, return_time_s=0.5)
+
+
+def _sweep() -> Sweep:
+    return Sweep(SpriteLayer(surface=_CARD), container_width=1000, duration_s=1.0)
+
+
+def _fade() -> Fade:
+    return Fade(Sprite(name="f"), duration_s=1.0, end=0.0)
+
+
+_CARD = make_asset()
+ANIMATION_FACTORIES = {"bump": _bump, "sweep": _sweep, "fade": _fade}
+
+for _kind, _factory in ANIMATION_FACTORIES.items():
+    _steps = 0
+    _probe = _factory()
+    while not _probe.done:
+        _probe.step()
+        _steps += 1
+
+    def _setup(factory: Callable[[], Any] = _factory) -> Callable[[], Any]:
+        def run() -> None:
+            for _ in range(ANIMATIONS_PER_ROUND):
+                anim = factory()
+                while not anim.done:
+                    anim.step()
+        return run
+    bench(f"animation_step[{_kind}]", "animation_step", ops=ANIMATIONS_PER_ROUND * _steps)(_setup)
+
+
+# ---- EventBus.emit fan-out ---------------------------------------------------
+
+for _n in FANOUTS:
+    def _setup(n: int = _n) -> Callable[[], Any]:
+        bus = EventBus()
+        for _ in range(n):
+            bus.on("tick", lambda **kw: None)
+        def run() -> None:
+            for _ in range(100):
+                bus.emit("tick", frame=1)
+        return run
+    bench(f"event_emit[handlers={_n}]", "event_emit", ops=100)(_setup)
+
+
+# ---- asset decode ------------------------------------------------------------
+
+def _setup_decode() -> Callable[[], Any]:
+    path = asset_png()
+    def run() -> None:
+        Sprite(name="decode").add_image(path)
+    return run
+
+bench("sprite_add_image[240x120]", "decode")(_setup_decode)
+
+
+# ---- scene graph: world-space flattening ---------------------------------------
+
+GROUPINGS = {"flat": 0, "groups=10": 10}
+
+for _name, _groups in GROUPINGS.items():
+    def _setup(groups: int = _groups) -> Callable[[], Any]:
+        spire = make_scene(RESOLUTIONS["1080p"], 1_000)
+        nodes = [spire.add_group(f"g{i}") for i in range(groups)]
+        for i, sprite in enumerate(spire.sprites):
+            if nodes:
+                nodes[i % groups].add(sprite)
+        def run() -> None:
+            for node in nodes:  # one update per group moves its 100 children
+                node.x += 1
+            spire.render_list()
+        return run
+    bench(f"render_list[sprites=1000,{_name}]", "scene_graph")(_setup)
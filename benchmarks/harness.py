@@ -0,0 +1,113 @@
+# benchmarks/harness.py
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import sys
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+# A case's setup returns the callable to time; each call performs `ops` operations.
+Setup = Callable[[], Callable[[], Any]]
+
+
+@dataclass
+class Case:
+    name: str
+    group: str
+    setup: Setup
+    ops: int = 1
+    heavy: bool = False   # skipped by --quick
+
+
+@dataclass
+class Result:
+    name: str
+    group: str
+    ops: int
+    rounds: int
+    median_s: float
+    min_s: float
+    stdev_s: float
+
+    @property
+    def per_op_s(self) -> float:
+        return self.median_s / self.ops
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "group": self.group, "ops": self.ops, "rounds": self.rounds,
+            "median_s": self.median_s, "min_s": self.min_s, "stdev_s": self.stdev_s,
+            "per_op_s": self.per_op_s,
+        }
+
+
+REGISTRY: List[Case] = []
+
+
+def bench(name: str, group: str, *, ops: int = 1, heavy: bool = False) -> Callable[[Setup], Setup]:
+    def register(setup: Setup) -> Setup:
+        REGISTRY.append(Case(name=name, group=group, setup=setup, ops=ops, heavy=heavy))
+        return setup
+    return register
+
+
+def measure(case: Case, *, min_time: float = 0.2, max_rounds: int = 50, min_rounds: int = 3) -> Result:
+    fn = case.setup()
+    fn()  # warm-up (first-touch allocations, lazy imports)
+    samples: List[float] = []
+    spent = 0.0
+    while len(samples) < min_rounds or (spent < min_time and len(samples) < max_rounds):
+        t0 = perf_counter()
+        fn()
+        dt = perf_counter() - t0
+        samples.append(dt)
+        spent += dt
+    return Result(
+        name=case.name, group=case.group, ops=case.ops, rounds=len(samples),
+        median_s=statistics.median(samples), min_s=min(samples),
+        stdev_s=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    )
+
+
+def environment() -> Dict[str, str]:
+    return {"python": sys.version.split()[0], "platform": platform.platform(), "machine": platform.machine()}
+
+
+def to_json(results: List[Result]) -> Dict[str, Any]:
+    return {"environment": environment(), "cases": {r.name: r.to_dict() for r in results}}
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline_s: float
+    current_s: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_s / self.baseline_s if self.baseline_s > 0 else float("inf")
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[Comparison]:
+    """Pair up cases present in both result sets by per-op median time."""
+    out: List[Comparison] = []
+    for name, cur in current["cases"].items():
+        base = baseline["cases"].get(name)
+        if base is not None:
+            out.append(Comparison(name, base["per_op_s"], cur["per_op_s"]))
+    return out
+
+
+def format_seconds(s: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if s >= scale:
+            return f"{s / scale:.3f} {unit}"
+    return f"{s / 1e-9:.1f} ns"
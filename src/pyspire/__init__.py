@@ -1,18 +1,61 @@
-from .event_bus import EventBus
+from .event_bus import EventBus, EventQueue
 from .sprite_layer import SpriteLayer
 from .sprite import Sprite
+from .scene_graph import Group
 from .primitives import Vec2, Size, Rect, lerp  # <- adjust as needed
 from .py_spire import PySpire
 from .animation_base import Animation
+from .recording import Timeline, TimelineRecorder, TimelineReplay
+from .profiling import FrameProfiler
+from .tracing import Tracer
+from .memory import MemoryBudget, MemoryTracker
+from .frame_cache import FrameCache
+from .sinks import FrameArchive, FrameArchiveSink, FrameSink, PngSequenceSink, RawFrameSink, RawFrameStore
+from .outputs import OutputProfile
+from .compositing import CairoCompositor, Compositor
+from .tiling import TiledCompositor
+from .shared_frames import FrameRing, PngEncoder, SharedMemorySink
+from .assets import AssetCache
+from .batch import BatchRunner, SceneResult
+from .forking import SceneFork
+from .segments import SegmentedEncoderSink
 
 __all__ = [
     "EventBus",
+    "EventQueue",
     "Sprite",
     "SpriteLayer",
+    "Group",
     "Vec2",
     "Size",
     "Rect",
     "lerp",
     "PySpire",
-    "Animation"
+    "Animation",
+    "Timeline",
+    "TimelineRecorder",
+    "TimelineReplay",
+    "FrameProfiler",
+    "Tracer",
+    "MemoryBudget",
+    "MemoryTracker",
+    "FrameCache",
+    "FrameSink",
+    "PngSequenceSink",
+    "FrameArchive",
+    "FrameArchiveSink",
+    "RawFrameSink",
+    "RawFrameStore",
+    "OutputProfile",
+    "Compositor",
+    "CairoCompositor",
+    "TiledCompositor",
+    "FrameRing",
+    "PngEncoder",
+    "SharedMemorySink",
+    "AssetCache",
+    "BatchRunner",
+    "SceneResult",
+    "SceneFork",
+    "SegmentedEncoderSink",
 ]
@@ -16,6 +16,7 @@ class Bump(Animation):
       - bump_start, bump_paused, bump_resume, bump_completed
     Custom events:
       - bump_contact (fires at the moment of impact)
+        payload: source=<subject>, target=<against>, at=(x, y)
     """
 
     def __init__(
@@ -66,6 +67,18 @@ class Bump(Animation):
             },
         }
 
+    def describe(self) -> Dict[str, Any]:
+        return {
+            **super().describe(),
+            "against": self.against,
+            "forward_time_s": self.forward_time_s,
+            "hold_time_s": self.hold_time_s,
+            "return_time_s": self.return_time_s,
+            "ease_forward": getattr(self.ease_forward, "__name__", repr(self.ease_forward)),
+            "ease_return": getattr(self.ease_return, "__name__", repr(self.ease_return)),
+            "epsilon": self.epsilon,
+        }
+
     # ---- Animation subclass contract --------------------------------------
 
     def _updates(self) -> Generator[Dict[str, Any], None, None]:
@@ -86,11 +99,7 @@ class Bump(Animation):
 
         # contact (emit right at impact; keep position stable this frame)
         cx, cy = sx + dx, sy + dy
-        self.bus.emit("bump_contact", {
-            "source": self.target,
-            "target": self.against,
-            "at": {"x": cx, "y": cy},
-        })
+        self.bus.emit("bump_contact", source=self.target, target=self.against, at=(cx, cy))
         yield {"x": cx, "y": cy}
 
         # hold phase (nh frames) – stay at contact
@@ -54,6 +54,15 @@ class Fade(Animation):
     def total_frames(self) -> Optional[int]:
         return self._frames
 
+    def describe(self) -> Dict[str, Any]:
+        return {
+            **super().describe(),
+            "frames": self._frames,
+            "start": self._start,
+            "end": self._end,
+            "easing": getattr(self._ease, "__name__", repr(self._ease)),
+        }
+
     # --- internals ---------------------------------------------------------
 
     def _updates(self) -> Iterator[Dict[str, float]]:
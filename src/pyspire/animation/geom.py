@@ -13,14 +13,21 @@ def normalize(v: Vec) -> Vec:
     d = hypot(x, y)
     return (1.0, 0.0) if d == 0.0 else (x/d, y/d)
 
+def rect_of(node) -> Tuple[float, float, float, float]:
+    """World-space (x, y, w, h): `bounds` for sprites and groups, else x/y and size."""
+    bounds = getattr(node, "bounds", None)
+    if bounds is not None:
+        return bounds.x, bounds.y, bounds.w, bounds.h
+    return node.x, node.y, node.get_width(), node.get_height()
+
 def center_of(sprite) -> Point:
-    return (sprite.x + sprite.get_width() * 0.5,
-            sprite.y + sprite.get_height() * 0.5)
+    x, y, w, h = rect_of(sprite)
+    return (x + w * 0.5, y + h * 0.5)
 
 def half_extent_along(sprite, vhat: Vec) -> float:
     # Axis-aligned rect projected onto vhat
-    return abs(vhat[0]) * (sprite.get_width() * 0.5) + \
-           abs(vhat[1]) * (sprite.get_height() * 0.5)
+    _, _, w, h = rect_of(sprite)
+    return abs(vhat[0]) * (w * 0.5) + abs(vhat[1]) * (h * 0.5)
 
 def distance_to_touch_along(bumper, target, vhat: Vec) -> float:
     cbx, cby = center_of(bumper)
@@ -51,6 +51,16 @@ class Sweep(Animation):
     def total_frames(self) -> Optional[int]:
         return self._frames
 
+    def describe(self) -> Dict[str, Any]:
+        return {
+            **super().describe(),
+            "frames": self._frames,
+            "container_width": self._container_width,
+            "left_padding": self._left_pad,
+            "right_padding": self._right_pad,
+            "easing": getattr(self._ease, "__name__", repr(self._ease)),
+        }
+
     # --- internals ---------------------------------------------------------
 
     def _layer_width(self) -> int:
@@ -66,6 +76,9 @@ class Sweep(Animation):
             return int(getattr(t, "width"))
         if hasattr(t, "get_intrinsic_width"):
             return int(t.get_intrinsic_width())
+        # - sprite or group: world-space bounds (a group's width spans its children)
+        if hasattr(t, "bounds"):
+            return int(t.bounds.w)
         # Fallback: if target has get_width() that returns x + width (your earlier draft),
         # try to derive intrinsic by subtracting current x.
         if hasattr(t, "get_width"):
@@ -74,10 +87,18 @@ class Sweep(Animation):
             return max(0, gw - x)
         raise AttributeError("Sweep target must expose a width (surface.get_width, .width, or get_intrinsic_width).")
 
+    def _content_offset(self) -> int:
+        """How far a group's drawn content starts right of its own x (0 for sprites and layers)."""
+        t = self.target
+        if hasattr(t, "bounds") and hasattr(t, "world_position"):
+            return int(t.bounds.x - t.world_position.x)
+        return 0
+
     def _updates(self) -> Iterator[Dict[str, int]]:
         layer_w = self._layer_width()
-        start_x = self._left_pad
-        end_x = max(self._left_pad, self._container_width - layer_w - self._right_pad)
+        inset = self._content_offset()
+        start_x = self._left_pad - inset
+        end_x = max(self._left_pad, self._container_width - layer_w - self._right_pad) - inset
 
         # avoid division by zero in t (single-frame path places at end)
         n = self._frames
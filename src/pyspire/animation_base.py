@@ -15,6 +15,8 @@ class Animation:
       - pausing keeps re-applying the LAST UPDATE without advancing
       - each animation has its own EventBus
       - events: <name>_start, <name>_paused, <name>_resume, <name>_completed
+      - on completion the generator is dropped and the bus is cleared, so
+        handler closures don't outlive the animation's useful life
       - queue_event_in(seconds, event, **data) schedules per-frame emission
       - subclass must implement `_updates()` generator yielding dicts of updates
       - `apply_update` applies arbitrary key/value pairs to target
@@ -25,6 +27,12 @@ class Animation:
         self.fps = int(fps)
         self.bus = EventBus()
 
+        # lifecycle event names, built once instead of per emit
+        self.event_start = f"{name}_start"
+        self.event_paused = f"{name}_paused"
+        self.event_resume = f"{name}_resume"
+        self.event_completed = f"{name}_completed"
+
         self._started = False
         self._paused = False
         self._done = False
@@ -42,17 +50,17 @@ class Animation:
             return
         self._gen = self._updates()
         self._started = True
-        self.bus.emit(f"{self.name}_start")
+        self.bus.emit(self.event_start)
 
     def pause(self) -> None:
         if not self._paused and not self._done:
             self._paused = True
-            self.bus.emit(f"{self.name}_paused")
+            self.bus.emit(self.event_paused)
 
     def resume(self) -> None:
         if self._paused and not self._done:
             self._paused = False
-            self.bus.emit(f"{self.name}_resume")
+            self.bus.emit(self.event_resume)
 
     def toggle_paused(self) -> None:
         if self._paused:
@@ -82,7 +90,7 @@ class Animation:
             self.start()
 
         # 1) scheduled events for this frame
-        for payload in self._scheduled.pop(self._frame, []):
+        for payload in self._scheduled.pop(self._frame, ()):
             self.bus.emit(payload["event"], **payload["data"])
 
         # 2) update application
@@ -100,7 +108,11 @@ class Animation:
             self._frame += 1
         except StopIteration:
             self._done = True
-            self.bus.emit(f"{self.name}_completed")
+            # release everything a finished animation can no longer use
+            self._gen = None
+            self._scheduled.clear()
+            self.bus.emit(self.event_completed)
+            self.bus.clear()
 
     # ---- scheduling
 
@@ -129,6 +141,10 @@ class Animation:
                 else:
                     object.__setattr__(self.target, k, v)
 
+    def describe(self) -> Dict[str, Any]:
+        """Plain summary of what this animation is (recordings, tooling)."""
+        return {"type": type(self).__name__, "name": self.name, "fps": self.fps}
+
     def __repr__(self) -> str:
         state = (
             "done" if self._done
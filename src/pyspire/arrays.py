@@ -0,0 +1,58 @@
+# arrays.py
+"""
+Zero-copy NumPy views of cairo image surfaces (frames and layer surfaces).
+
+Requires NumPy (`pip install pyspire[numpy]`).
+"""
+from __future__ import annotations
+
+import sys
+from typing import Any
+
+import cairocffi
+import numpy as np
+
+
+class _SurfaceBuffer:
+    """Array-interface holder; NumPy keeps it as the view's base, and it keeps the surface alive."""
+    def __init__(self, surface: Any, shape: tuple, strides: tuple) -> None:
+        self.surface = surface
+        self.data = surface.get_data()
+        address = np.frombuffer(self.data, dtype=np.uint8).__array_interface__["data"][0]
+        # a raw address (rather than the buffer itself) makes NumPy use this object as the base
+        self.__array_interface__ = {
+            "version": 3,
+            "shape": shape,
+            "strides": strides,
+            "typestr": "|u1",
+            "data": (address, False),
+        }
+
+
+def surface_array(surface: Any, *, readonly: bool = False) -> np.ndarray:
+    """
+    (height, width, 4) uint8 view of an ARGB32 or RGB24 surface's pixels.
+
+    Channels are in B, G, R, A order on every platform. The values are
+    premultiplied, and the fourth byte of an RGB24 surface is undefined.
+    Rows keep cairo's stride, so the view is not C-contiguous when the
+    stride has padding. The view shares memory with the surface and keeps
+    it alive. After writing through it, call surface.mark_dirty() before
+    cairo draws on or encodes the surface again.
+    """
+    fmt = surface.get_format()
+    if fmt not in (cairocffi.FORMAT_ARGB32, cairocffi.FORMAT_RGB24):
+        raise ValueError(f"surface_array supports ARGB32 and RGB24 surfaces, not format {fmt}")
+    surface.flush()
+    h, w, stride = surface.get_height(), surface.get_width(), surface.get_stride()
+    px = np.asarray(_SurfaceBuffer(surface, (h, w, 4), (stride, 4, 1)))
+    if sys.byteorder == "big":  # cairo pixels are native-endian 0xAARRGGBB words
+        px = px[..., ::-1]
+    if readonly:
+        px.flags.writeable = False
+    return px
+
+
+def layer_array(layer: Any, *, readonly: bool = False) -> np.ndarray:
+    """surface_array() of a SpriteLayer's surface."""
+    return surface_array(layer.surface, readonly=readonly)
@@ -0,0 +1,82 @@
+# assets.py
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import cairocffi
+
+from .memory import surface_nbytes
+
+
+class AssetCache:
+    """
+    Decoded PNGs shared by every scene loaded while it is active.
+
+    Entries are keyed by absolute path and invalidated when the file's
+    mtime changes. Surfaces are handed out as-is: pyspire never draws
+    into layer surfaces, so scenes can share them. Thread-safe.
+    """
+    def __init__(self) -> None:
+        self._surfaces: Dict[str, Tuple[int, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str) -> Any:
+        path = os.path.abspath(path)
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            entry = self._surfaces.get(path)
+            if entry is not None and entry[0] == mtime:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        surface = cairocffi.ImageSurface.create_from_png(path)
+        with self._lock:
+            self._surfaces[path] = (mtime, surface)
+        return surface
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(surface_nbytes(s) for _, s in self._surfaces.values())
+
+    def report(self) -> str:
+        return (f"asset cache: {len(self)} images, {self.nbytes() / 2**20:.1f} MiB, "
+                f"{self.hits} hits / {self.misses} decodes")
+
+
+_cache: ContextVar[Optional[AssetCache]] = ContextVar("pyspire_asset_cache", default=None)
+_directory: ContextVar[Optional[str]] = ContextVar("pyspire_asset_directory", default=None)
+
+
+@contextmanager
+def asset_scope(cache: Optional[AssetCache] = None, directory: Optional[str] = None) -> Iterator[None]:
+    """
+    Within the block, load_png() decodes through `cache` and resolves
+    relative names against `directory` instead of the working directory.
+    The scope follows the context (thread or asyncio task) it was set in.
+    """
+    cache_token = _cache.set(cache)
+    dir_token = _directory.set(directory)
+    try:
+        yield
+    finally:
+        _directory.reset(dir_token)
+        _cache.reset(cache_token)
+
+
+def load_png(filename: str) -> Any:
+    """Decode a PNG into an image surface, through the active asset scope if any."""
+    directory = _directory.get()
+    path = filename if directory is None else os.path.join(directory, filename)
+    cache = _cache.get()
+    if cache is None:
+        return cairocffi.ImageSurface.create_from_png(path)
+    return cache.get(path)
@@ -0,0 +1,194 @@
+# batch.py
+"""
+Render several scene scripts in one process.
+
+    python -m pyspire.batch cmake_animation/01_simple_compile.py cmake_animation/04_lib_compile.py
+
+Each script is an ordinary scene script: it builds a PySpire and calls
+render_until_done(). Scripts are loaded one after another; inside a load,
+render_until_done() only queues the scene. The queued scenes then render
+concurrently and share one decoded-PNG cache, one pool of PNG encoder
+threads and one framebuffer memory budget.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import runpy
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from .assets import AssetCache, asset_scope
+from .memory import MemoryBudget
+
+if TYPE_CHECKING:
+    from .py_spire import PySpire
+
+_pending: ContextVar[Optional[List[Tuple["PySpire", Dict[str, Any]]]]] = ContextVar("pyspire_batch_pending", default=None)
+
+
+def defer_render(spire: "PySpire", **kwargs: Any) -> bool:
+    """Queue `spire` instead of rendering it when called during a batch load."""
+    pending = _pending.get()
+    if pending is None:
+        return False
+    pending.append((spire, kwargs))
+    return True
+
+
+@dataclass
+class SceneResult:
+    name: str
+    path: str
+    frames: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    reports: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass
+class _Scene:
+    result: SceneResult
+    directory: str
+    spire: Optional["PySpire"] = None
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+class BatchRunner:
+    """
+    Loads scene scripts into this process and renders them together.
+
+    - `jobs` scenes render at once (default: half the CPUs), each as a
+      RenderPipeline; scenes with a frame_cache render sequentially
+    - `encoders` threads PNG-encode frames for all scenes (default: one per CPU)
+    - `memory_budget` caps framebuffer bytes in flight across all scenes
+    - images load through one AssetCache, relative to their script's directory
+
+    Relative base_filenames are resolved against the script's directory.
+    Scenes that would write the same files get their name appended
+    (<base>_<name>_000000.png). A scene that fails is reported in its
+    SceneResult and does not stop the others.
+    """
+    def __init__(self, scripts: Sequence[str], *, jobs: Optional[int] = None, encoders: Optional[int] = None,
+                 memory_budget: Optional[int] = None, assets: Optional[AssetCache] = None) -> None:
+        cpus = os.cpu_count() or 1
+        self.scripts = [os.path.abspath(s) for s in scripts]
+        self.jobs = max(1, int(jobs or cpus // 2))
+        self.encoders = max(1, int(encoders or cpus))
+        self.budget = MemoryBudget(memory_budget)
+        self.assets = assets or AssetCache()
+        self.results: List[SceneResult] = []
+        self.seconds = 0.0
+
+    def load(self) -> List[_Scene]:
+        scenes: List[_Scene] = []
+        for path in self.scripts:
+            name = os.path.splitext(os.path.basename(path))[0]
+            directory = os.path.dirname(path)
+            token = _pending.set([])
+            try:
+                with asset_scope(self.assets, directory):
+                    runpy.run_path(path, run_name=f"pyspire_batch.{name}")
+                queued = _pending.get()
+            except Exception as exc:
+                scenes.append(_Scene(SceneResult(name, path, error=f"load failed: {type(exc).__name__}: {exc}"),
+                                     directory))
+                continue
+            finally:
+                _pending.reset(token)
+            if not queued:
+                scenes.append(_Scene(SceneResult(name, path, error="script never called render_until_done()"),
+                                     directory))
+            for i, (spire, kwargs) in enumerate(queued):
+                label = name if len(queued) == 1 else f"{name}[{i}]"
+                spire.rebase(os.path.join(directory, spire.base_filename))
+                spire.memory.budget = self.budget
+                scenes.append(_Scene(SceneResult(label, path), directory, spire, kwargs))
+
+        bases: Dict[str, int] = {}
+        for scene in scenes:
+            if scene.spire is not None:
+                bases[scene.spire.base_filename] = bases.get(scene.spire.base_filename, 0) + 1
+        for scene in scenes:
+            if scene.spire is not None:
+                if bases[scene.spire.base_filename] > 1:
+                    scene.spire.rebase(f"{scene.spire.base_filename}_{scene.result.name}")
+                os.makedirs(os.path.dirname(scene.spire.base_filename), exist_ok=True)
+        return scenes
+
+    def run(self, *, quiet: bool = False) -> List[SceneResult]:
+        """Load and render every script; returns one SceneResult per scene."""
+        start = perf_counter()
+        scenes = self.load()
+        with ThreadPoolExecutor(self.encoders, thread_name_prefix="pyspire-encode") as encode_pool, \
+                ThreadPoolExecutor(self.jobs, thread_name_prefix="pyspire-scene") as scene_pool:
+            futures = [scene_pool.submit(self._render, scene, encode_pool, quiet)
+                       for scene in scenes if scene.spire is not None]
+            for future in futures:
+                future.result()
+        self.seconds = perf_counter() - start
+        self.results = [scene.result for scene in scenes]
+        return self.results
+
+    def _render(self, scene: _Scene, encode_pool: ThreadPoolExecutor, quiet: bool) -> None:
+        spire, result = scene.spire, scene.result
+        first = spire.frame_no
+        start = perf_counter()
+        try:
+            with asset_scope(self.assets, scene.directory):
+                result.reports = spire.render_until_done(
+                    resume=scene.kwargs.get("resume", False), pipelined=spire.frame_cache is None,
+                    quiet=True, encode_pool=encode_pool)
+        except Exception as exc:
+            result.error = f"{type(exc).__name__}: {exc}"
+        result.seconds = perf_counter() - start
+        result.frames = spire.frame_no - first
+        if not quiet:
+            status = "ok" if result.ok else f"FAILED ({result.error})"
+            print(f"{result.name}: {result.frames} frames in {result.seconds:.1f}s, {status}", flush=True)
+
+    def summary(self) -> str:
+        width = max([len("scene")] + [len(r.name) for r in self.results])
+        lines = [f"{'scene':<{width}}  {'frames':>7}  {'seconds':>8}  {'fps':>7}  status"]
+        for r in self.results:
+            status = "ok" if r.ok else f"FAILED: {r.error}"
+            lines.append(f"{r.name:<{width}}  {r.frames:>7}  {r.seconds:>8.1f}  {r.fps:>7.1f}  {status}")
+        frames = sum(r.frames for r in self.results)
+        lines.append(f"{len(self.results)} scenes, {frames} frames in {self.seconds:.1f}s "
+                     f"({self.jobs} at once, {self.encoders} encoders)")
+        lines.append(self.assets.report())
+        lines.append(f"framebuffers in flight: peak {self.budget.peak / 2**20:.1f} MiB")
+        return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m pyspire.batch")
+    ap.add_argument("scripts", nargs="+", help="scene scripts to render")
+    ap.add_argument("-j", "--jobs", type=int, help="scenes rendered at once")
+    ap.add_argument("--encoders", type=int, help="PNG encoder threads shared by all scenes")
+    ap.add_argument("--memory-budget", type=float, help="MiB of framebuffers in flight across all scenes")
+    args = ap.parse_args(argv)
+
+    budget = None if args.memory_budget is None else int(args.memory_budget * 2**20)
+    runner = BatchRunner(args.scripts, jobs=args.jobs, encoders=args.encoders, memory_budget=budget)
+    results = runner.run()
+    print(runner.summary())
+    return 0 if all(r.ok for r in results) else 1
+
+
+if __name__ == "__main__":
+    # run the package's copy of this module: render_until_done() checks its queue, not __main__'s
+    from pyspire.batch import main as _main
+    sys.exit(_main())
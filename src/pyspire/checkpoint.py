@@ -0,0 +1,73 @@
+# checkpoint.py
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List
+
+from .recording import scene_state
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_TRAILER = b"IEND\xaeB`\x82"
+
+
+@dataclass
+class Checkpoint:
+    """
+    Simulation state after `frame_no` frames have been written.
+
+    Animation generators and scene callbacks can't be serialized, so a
+    resume replays the simulation (animation steps and events only, no
+    compositing or encoding) up to `frame_no` and compares the result
+    with this snapshot before rendering the remaining frames.
+    """
+    frame_no: int
+    done: bool
+    scene: List[Dict[str, Any]] = field(default_factory=list)
+    animations: List[Dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def capture(cls, spire: Any) -> "Checkpoint":
+        animations = [
+            {
+                "type": type(a).__name__,
+                "name": a.name,
+                "frame": a._frame,
+                "paused": a._paused,
+                "done": a.done,
+                "scheduled": {str(f): [p["event"] for p in ps] for f, ps in sorted(a._scheduled.items())},
+            }
+            for a in spire.animations
+        ]
+        cp = cls(frame_no=spire.frame_no, done=spire.done, scene=scene_state(spire.render_list()), animations=animations)
+        return cls(**json.loads(json.dumps(asdict(cp))))  # normalize to what save/load produces
+
+    @classmethod
+    def load(cls, path: str) -> "Checkpoint":
+        with open(path, "r", encoding="utf-8") as fh:
+            return cls(**json.load(fh))
+
+    def save(self, path: str) -> None:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(asdict(self), fh, separators=(",", ":"))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+
+    def diff(self, other: "Checkpoint") -> List[str]:
+        """Names of the fields that differ (empty when the states match)."""
+        return [k for k in ("frame_no", "done", "scene", "animations") if getattr(self, k) != getattr(other, k)]
+
+
+def is_complete_png(path: str) -> bool:
+    """True when `path` starts with the PNG signature and ends with an IEND chunk."""
+    try:
+        with open(path, "rb") as fh:
+            if fh.read(len(PNG_SIGNATURE)) != PNG_SIGNATURE:
+                return False
+            fh.seek(-len(PNG_TRAILER), os.SEEK_END)
+            return fh.read() == PNG_TRAILER
+    except OSError:
+        return False
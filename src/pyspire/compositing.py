@@ -0,0 +1,63 @@
+# compositing.py
+from __future__ import annotations
+
+from typing import Optional, Protocol, Sequence, Tuple
+
+import cairocffi
+
+from .outputs import ScaledAssets
+from .sprite import Sprite
+
+
+class Compositor(Protocol):
+    """
+    Backend that turns the scene's sprites into one frame (PySpire.compositor).
+
+    `background` is an opaque (r, g, b) painted first, or None for a
+    transparent frame; `assets`, when given, supplies pre-scaled layer
+    surfaces for a scaled output profile. With `target` (a surface of the
+    given format and size, e.g. a shared-memory slot) the frame is drawn
+    into it, overwriting whatever it held, and it is returned.
+
+    The frame cache keys frames by backend, since some (NumpyCompositor)
+    differ from cairo's pixels: an optional `cache_tag` attribute names
+    the output (default: the class name). Backends whose pixels match
+    CairoCompositor exactly, like TiledCompositor, use "".
+    """
+    def composite(self, fmt: int, width: int, height: int, sprites: Sequence[Sprite],
+                  background: Optional[Tuple[float, float, float]] = None,
+                  assets: Optional[ScaledAssets] = None,
+                  target: Optional[cairocffi.ImageSurface] = None) -> cairocffi.ImageSurface: ...
+    def close(self) -> None: ...
+
+
+class CairoCompositor:
+    """The reference backend: one cairo context, sprites painted in order."""
+    cache_tag = ""  # reference pixels: keeps frame-cache keys from before backends existed
+
+    def composite(self, fmt: int, width: int, height: int, sprites: Sequence[Sprite],
+                  background: Optional[Tuple[float, float, float]] = None,
+                  assets: Optional[ScaledAssets] = None,
+                  target: Optional[cairocffi.ImageSurface] = None) -> cairocffi.ImageSurface:
+        surface = cairocffi.ImageSurface(fmt, width, height) if target is None else target
+        ctx = cairocffi.Context(surface)
+        if target is not None:
+            clear(ctx)
+        if background is not None:
+            ctx.set_source_rgb(*background)
+            ctx.paint()
+        for sprite in sprites:
+            sprite.render(ctx, assets)
+        return surface
+
+    def close(self) -> None:
+        pass
+
+
+def clear(ctx: cairocffi.Context) -> None:
+    """Reset every pixel of the context's target to transparent black."""
+    ctx.save()
+    ctx.set_operator(cairocffi.OPERATOR_SOURCE)
+    ctx.set_source_rgba(0, 0, 0, 0)
+    ctx.paint()
+    ctx.restore()
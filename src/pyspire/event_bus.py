@@ -1,25 +1,145 @@
 # event_bus.py
-from collections import defaultdict
-from typing import Callable, Dict, List, Any, Iterable
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
+import inspect
 import traceback
+import weakref
+
+Handlers = Tuple[Callable[..., Any], ...]
+
+class EventQueue:
+    """
+    Frame-batched delivery for one or more EventBus instances.
+
+    A bus with `queue` set appends (handlers, event, payload, trace) here instead
+    of calling handlers inline; the owner drains once per frame.
+
+    - ordering is emit order; events emitted while draining form the next
+      batch of the same drain
+    - events named in `coalesce` keep one pending entry per (bus, event):
+      the first position wins, the latest payload replaces earlier ones
+    - handlers are captured at emit time, like the immediate path
+    """
+    def __init__(self, *, coalesce: Iterable[str] = (), max_rounds: int = 100) -> None:
+        self.coalesce = frozenset(coalesce)
+        self.max_rounds = int(max_rounds)
+        self._pending: List[List[Any]] = []
+        self._coalesced: Dict[Tuple[int, str], List[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def push(self, bus: "EventBus", event: str, handlers: Handlers, payload: Dict[str, Any]) -> None:
+        if event in self.coalesce:
+            key = (id(bus), event)
+            entry = self._coalesced.get(key)
+            if entry is not None:
+                entry[0] = handlers
+                entry[2] = payload
+                return
+            entry = [handlers, event, payload, bus.trace]
+            self._coalesced[key] = entry
+            self._pending.append(entry)
+            return
+        self._pending.append([handlers, event, payload, bus.trace])
+
+    def drain(self) -> int:
+        """Dispatch everything pending, batch by batch. Returns events delivered."""
+        delivered = 0
+        rounds = 0
+        while self._pending:
+            if rounds == self.max_rounds:
+                raise RuntimeError(f"EventQueue.drain: events still cascading after {rounds} batches")
+            batch = self._pending
+            self._pending = []
+            self._coalesced = {}
+            for handlers, event, payload, trace in batch:
+                if trace is None:
+                    for h in handlers:
+                        h(**payload)
+                else:
+                    for h in handlers:
+                        trace(event, h, payload)
+            delivered += len(batch)
+            rounds += 1
+        return delivered
+
+class _Subscription:
+    """
+    Handler entry for weak and/or owner-scoped subscriptions.
+    Plain subscriptions are stored bare so emit stays a direct call.
+    """
+    __slots__ = ("handler", "ref", "finalizer", "__weakref__")
+
+    def __init__(self, bus: "EventBus", event: str, handler: Callable[..., Any],
+                 weak: bool, owner: Any) -> None:
+        bus_ref = weakref.ref(bus)
+        self_ref = weakref.ref(self)
+
+        def drop(*_: Any) -> None:
+            b, s = bus_ref(), self_ref()
+            if b is not None and s is not None:
+                b._discard(event, s)
+
+        self.handler: Optional[Callable[..., Any]] = None
+        self.ref: Optional[Callable[[], Any]] = None
+        if weak:
+            self.ref = weakref.WeakMethod(handler, drop) if inspect.ismethod(handler) else weakref.ref(handler, drop)
+        else:
+            self.handler = handler
+        self.finalizer = weakref.finalize(owner, drop) if owner is not None else None
+
+    def target(self) -> Optional[Callable[..., Any]]:
+        return self.handler if self.ref is None else self.ref()
+
+    def __call__(self, **payload: Any) -> None:
+        h = self.target()
+        if h is not None:
+            h(**payload)
+
+    def __eq__(self, other: object) -> bool:
+        return self is other or (other is not None and self.target() == other)
+
+    __hash__ = object.__hash__
+
+    def release(self) -> None:
+        if self.finalizer is not None:
+            self.finalizer.detach()
+
 
 class EventBus:
-    def __init__(self, *, raise_on_error: bool = True, log_errors: bool = True):
-        self._subs: Dict[str, List[Callable[..., Any]]] = defaultdict(list)
+    """
+    Per-object pub/sub with kwargs-only payloads.
+
+    Subscriptions are stored as immutable handler tuples that are rebuilt
+    only by on/off, so emit never copies: the tuple it grabs is already a
+    snapshot (handlers added or removed mid-emit take effect next emit).
+
+    With `queue` set, emit defers delivery to that EventQueue. With `tap`
+    set, every emit is reported to it first (recording). With `trace` set,
+    each handler call goes through it (per-handler timing).
+
+    Subscriptions need not outlive their subject:
+      - on(..., weak=True) holds the handler weakly (use bound methods; the
+        subscription is dropped when the instance is collected)
+      - on(..., owner=obj) drops the subscription when `obj` is collected
+    """
+    def __init__(self, *, raise_on_error: bool = True, log_errors: bool = True,
+                 queue: Optional[EventQueue] = None):
+        self._subs: Dict[str, Handlers] = {}
+        self.queue = queue
+        # observer called as tap(event, payload) for every emit, listened-to or not
+        self.tap: Optional[Callable[[str, Dict[str, Any]], None]] = None
+        # when set, handlers are invoked as trace(event, handler, payload) (timing)
+        self.trace: Optional[Callable[[str, Callable[..., Any], Dict[str, Any]], None]] = None
         self._raise = raise_on_error
         self._log = log_errors
 
-    def on(self, event: str, handler: Callable[..., Any]) -> Callable[[], None]:
-        self._subs[event].append(handler)
+    def on(self, event: str, handler: Callable[..., Any], *,
+           weak: bool = False, owner: Any = None) -> Callable[[], None]:
+        entry = handler if not weak and owner is None else _Subscription(self, event, handler, weak, owner)
+        self._subs[event] = self._subs.get(event, ()) + (entry,)
         def off() -> None:
-            lst = self._subs.get(event)
-            if not lst: return
-            try:
-                lst.remove(handler)
-            except ValueError:
-                pass
-            if not lst:
-                self._subs.pop(event, None)
+            self._discard(event, entry)
         return off
 
     def once(self, event: str, handler: Callable[..., Any]) -> Callable[[], None]:
@@ -30,33 +150,69 @@ class EventBus:
         return off
 
     def off(self, event: str, handler: Callable[..., Any]) -> None:
-        lst = self._subs.get(event)
-        if not lst: return
-        try:
-            lst.remove(handler)
-        except ValueError:
-            pass
-        if not lst:
+        handlers = self._subs.get(event)
+        if not handlers: return
+        for i, h in enumerate(handlers):
+            if h is handler or h == handler:
+                self._remove_at(event, handlers, i)
+                return
+
+    def clear(self) -> None:
+        """Drop every subscription (releases the handlers and anything they capture)."""
+        subs, self._subs = self._subs, {}
+        for handlers in subs.values():
+            for h in handlers:
+                if type(h) is _Subscription:
+                    h.release()
+
+    def _discard(self, event: str, entry: Callable[..., Any]) -> None:
+        handlers = self._subs.get(event)
+        if not handlers: return
+        for i, h in enumerate(handlers):
+            if h is entry:
+                self._remove_at(event, handlers, i)
+                return
+
+    def _remove_at(self, event: str, handlers: Handlers, i: int) -> None:
+        removed = handlers[i]
+        handlers = handlers[:i] + handlers[i + 1:]
+        if handlers:
+            self._subs[event] = handlers
+        else:
             self._subs.pop(event, None)
+        if type(removed) is _Subscription:
+            removed.release()
 
     def emit(self, event: str, *args: Any, **kwargs: Any) -> None:
         # DEBUG: print(f"emit: {self} {event}")
-        handlers: Iterable[Callable[..., Any]] = list(self._subs.get(event, ()))
+        # Validate before the fast path, so a bad call fails whether or not anyone listens.
+        if args and not (len(args) == 1 and isinstance(args[0], dict) and not kwargs):
+            # mixed/positional calling is disallowed to keep things sane
+            msg = f"EventBus.emit('{event}') does not support positional args (got {args})"
+            if self._log: print("[EventBus ERROR]", msg)
+            if self._raise: raise TypeError(msg)
+            return
+
+        handlers = self._subs.get(event)
+        if handlers is None:
+            if self.tap is None:
+                return  # fast path: nobody listening, skip copying the payload
+            handlers = ()
 
         # Normalize to kwargs only.
         if args:
-            if len(args) == 1 and isinstance(args[0], dict) and not kwargs:
-                kwargs = dict(args[0])  # support emit(event, payload_dict)
-            else:
-                # mixed/positional calling is disallowed to keep things sane
-                msg = f"EventBus.emit('{event}') does not support positional args (got {args})"
-                if self._log: print("[EventBus ERROR]", msg)
-                if self._raise: raise TypeError(msg)
-                return
+            kwargs = dict(args[0])  # support emit(event, payload_dict)
 
-        errors: List[str] = []
+        if self.tap is not None:
+            self.tap(event, kwargs)
+        if not handlers:
+            return
+        if self.queue is not None:
+            self.queue.push(self, event, handlers, kwargs)
+            return
+        if self.trace is not None:
+            for h in handlers:
+                self.trace(event, h, kwargs)
+            return
         for h in handlers:
             h(**kwargs)
-
-        if errors and self._raise:
-            raise RuntimeError(f"{len(errors)} error(s) during emit('{event}')\n" + "\n---\n".join(errors))
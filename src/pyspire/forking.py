@@ -0,0 +1,115 @@
+# forking.py
+from __future__ import annotations
+
+import os
+import shutil
+from typing import TYPE_CHECKING, Callable, Dict, List
+
+from .checkpoint import Checkpoint
+from .sinks import PngSequenceSink
+
+if TYPE_CHECKING:
+    from .py_spire import PySpire
+
+Wiring = Callable[["PySpire"], None]
+
+
+class SceneFork:
+    """
+    A family of scene variants that share their first `fork_at` frames.
+
+    `build()` must make the same scene every time it is called.
+    `branches` maps each variant's name to a callback that rewires it at
+    the fork, e.g. by adding bus handlers or animations or by swapping a
+    layer image. Branch output goes to <base_filename>_<branch>.
+
+    The first branch renders the shared prefix and then carries on as
+    that branch. Animation generators can't be copied, so every other
+    branch is built afresh and simulated, without compositing, up to the
+    fork. Its state must match the first branch's there, or it raises
+    RuntimeError. It then reuses the prefix PNGs (hard links where the
+    filesystem allows, copies otherwise) and renders only its own tail.
+    A family costs about one prefix plus the tails.
+
+    Outputs must be PNG sequences: no sink, and output profiles using
+    PngSequenceSink.
+    """
+    def __init__(self, build: Callable[[], "PySpire"], fork_at: int, branches: Dict[str, Wiring]) -> None:
+        if not branches:
+            raise ValueError("a fork needs at least one branch")
+        if fork_at < 0:
+            raise ValueError(f"fork_at must be >= 0, got {fork_at}")
+        self.build = build
+        self.fork_at = int(fork_at)
+        self.branches = dict(branches)
+        self.rendered = 0
+        self.reused = 0
+        self.frames: Dict[str, int] = {}
+
+    def render(self, *, quiet: bool = False) -> Dict[str, int]:
+        """Render every branch; returns the frame count of each."""
+        names = list(self.branches)
+        trunk = self._scene(names[0])
+        while trunk.frame_no < self.fork_at and not trunk.done:
+            trunk.render_frame()
+        if trunk.frame_no < self.fork_at:
+            raise ValueError(f"scene finished at frame {trunk.frame_no}, before the fork at {self.fork_at}")
+        shared = Checkpoint.capture(trunk)
+        prefix = [frame_files(trunk, n) for n in range(self.fork_at)]
+        self.rendered += self.fork_at
+        self._finish(names[0], trunk, quiet)
+
+        for name in names[1:]:
+            spire = self._scene(name)
+            spire.fast_forward(self.fork_at)
+            diverged = shared.diff(Checkpoint.capture(spire))
+            if diverged:
+                raise RuntimeError(f"fork: branch {name!r} differs from {names[0]!r} at frame {self.fork_at} "
+                                   f"({', '.join(diverged)}); does build() make the same scene every time?")
+            for n, sources in enumerate(prefix):
+                for src, dst in zip(sources, frame_files(spire, n)):
+                    share_file(src, dst)
+            self.reused += self.fork_at
+            self._finish(name, spire, quiet)
+        return self.frames
+
+    def _scene(self, name: str) -> "PySpire":
+        spire = self.build()
+        if spire.sink is not None or any(not isinstance(p.sink, PngSequenceSink) for p in spire.outputs):
+            raise ValueError("forked scenes must write PNG sequences (no sink; PngSequenceSink profiles)")
+        spire.rebase(f"{spire.base_filename}_{name}")
+        for profile in spire.outputs:
+            if profile.sink.base_filename != f"{spire.base_filename}_{profile.name}":
+                raise ValueError(f"output {profile.name!r} would write {profile.sink.base_filename}_* for every "
+                                 "branch; let PySpire create profile sinks and build new profiles each time")
+        return spire
+
+    def _finish(self, name: str, spire: "PySpire", quiet: bool) -> None:
+        """Apply the branch's wiring and render its tail."""
+        start = spire.frame_no
+        self.branches[name](spire)
+        spire.render_until_done(quiet=quiet)
+        self.rendered += spire.frame_no - start
+        self.frames[name] = spire.frame_no
+
+    def report(self) -> str:
+        total = self.rendered + self.reused
+        return (f"fork: {len(self.frames)} branches, {total} frames, {self.rendered} rendered, "
+                f"{self.reused} reused from the {self.fork_at}-frame prefix")
+
+
+def frame_files(spire: "PySpire", frame_no: int) -> List[str]:
+    """Every PNG a PNG-sequence scene writes for `frame_no`."""
+    if not spire.outputs:
+        return [spire.output_filename(frame_no)]
+    return [p.sink.filename(frame_no) for p in spire.outputs]
+
+
+def share_file(src: str, dst: str) -> None:
+    """Make `dst` hold `src`'s bytes: a hard link when possible, else a copy."""
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
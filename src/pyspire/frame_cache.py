@@ -0,0 +1,113 @@
+# frame_cache.py
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+from typing import Any, Dict, Sequence, Tuple
+
+from .sprite import Sprite
+
+# Bump when anything that changes pixels for the same scene state changes
+# (compositing rules, PNG settings), so stale cache entries stop matching.
+CACHE_VERSION = 1
+
+
+class FrameCache:
+    """
+    On-disk, content-addressed cache of rendered PNG frames.
+
+    A frame's key hashes everything the compositor reads: canvas size, and
+    per sprite its position and opacity plus each layer's offset, scale,
+    opacity and surface identity. Surfaces loaded from files are identified
+    by path, size and mtime; surfaces built in code by a hash of their
+    pixels. On a hit the cached PNG is hard-linked (or copied) into place
+    and the frame is neither composited nor encoded.
+    """
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._file_ids: Dict[str, str] = {}
+        self._pixel_ids: Dict[int, Tuple[Any, str]] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    # ---- keys
+
+    def key(self, size: Sequence[float], sprites: Sequence[Sprite], extra: Sequence[Any] = ()) -> str:
+        """`extra`: other frame-wide settings that change pixels (background, output format)."""
+        h = hashlib.sha256()
+        h.update(repr((CACHE_VERSION, tuple(size)) + ((tuple(extra),) if extra else ())).encode())
+        for sprite in sprites:
+            h.update(repr((sprite.position.x, sprite.position.y, sprite.opacity)).encode())
+            for layer in sprite.layers:
+                h.update(repr((self._surface_id(layer), layer.offset.x, layer.offset.y,
+                               layer.scale, layer.opacity)).encode())
+            h.update(b"|")
+        return h.hexdigest()
+
+    def _surface_id(self, layer: Any) -> str:
+        if layer.source:
+            ident = self._file_ids.get(layer.source)
+            if ident is None:
+                st = os.stat(layer.source)
+                ident = self._file_ids[layer.source] = f"{os.path.abspath(layer.source)}:{st.st_size}:{st.st_mtime_ns}"
+            return ident
+        surface = layer.surface
+        cached = self._pixel_ids.get(id(surface))
+        if cached is None or cached[0] is not surface:
+            surface.flush()
+            digest = hashlib.sha256(bytes(surface.get_data())).hexdigest()
+            cached = self._pixel_ids[id(surface)] = (surface, digest)
+        return cached[1]
+
+    # ---- storage
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.png")
+
+    def fetch(self, key: str, dest: str) -> bool:
+        """
+        Place the cached frame for `key` at `dest`; False on a miss. On a miss
+        any old file at `dest` is removed, so the fresh write can't clobber a
+        cache entry it was hard-linked to.
+        """
+        src = self.path_for(key)
+        if not os.path.exists(src):
+            self.misses += 1
+            if os.path.lexists(dest):
+                os.remove(dest)
+            return False
+        _place(src, dest)
+        self.hits += 1
+        return True
+
+    def store(self, key: str, rendered: str) -> None:
+        """Adopt a freshly written frame file as the cache entry for `key`."""
+        dest = self.path_for(key)
+        if os.path.exists(dest):
+            return
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f"{dest}.{os.getpid()}.tmp"
+        _place(rendered, tmp)
+        os.replace(tmp, dest)
+
+    # ---- stats
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def report(self) -> str:
+        return f"frame cache: {self.hits} hits, {self.misses} misses ({self.hit_rate:.0%} hit rate)"
+
+
+def _place(src: str, dest: str) -> None:
+    """Hard-link `src` to `dest`, copying when linking isn't possible."""
+    if os.path.lexists(dest):
+        os.remove(dest)
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
@@ -0,0 +1,111 @@
+# memory.py
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+def surface_nbytes(surface: Any) -> int:
+    """Pixel bytes held by an image surface (stride * height)."""
+    try:
+        return int(surface.get_stride()) * int(surface.get_height())
+    except AttributeError:
+        return int(surface.get_width()) * int(surface.get_height()) * 4
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes, or None if unavailable."""
+    try:
+        with open("/proc/self/statm", "r") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # no cheap "current" on this platform; fall back to the lifetime peak
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryBudget:
+    """
+    Byte budget for framebuffers in flight between render stages.
+
+    acquire() blocks while the budget is exhausted, so a stage that runs
+    ahead waits for downstream stages to release buffers (backpressure)
+    instead of growing without bound. A single request larger than the
+    whole budget can never be satisfied and raises MemoryError.
+    """
+    def __init__(self, limit: Optional[int] = None) -> None:
+        self.limit = limit
+        self.in_flight = 0
+        self.count = 0
+        self.peak = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, nbytes: int, timeout: Optional[float] = None) -> None:
+        with self._cond:
+            if self.limit is not None:
+                if nbytes > self.limit:
+                    raise MemoryError(f"frame of {nbytes} bytes exceeds memory budget of {self.limit} bytes")
+                if not self._cond.wait_for(lambda: self.in_flight + nbytes <= self.limit, timeout):
+                    raise TimeoutError(f"timed out waiting for {nbytes} bytes of memory budget")
+            self.in_flight += nbytes
+            self.count += 1
+            if self.in_flight > self.peak:
+                self.peak = self.in_flight
+
+    def release(self, nbytes: int) -> None:
+        with self._cond:
+            self.in_flight -= nbytes
+            self.count -= 1
+            self._cond.notify_all()
+
+
+class MemoryTracker:
+    """
+    Memory accounting for one PySpire scene.
+
+    - `budget` governs framebuffers in flight
+    - caches register a byte-count callable under a name
+    - sample() tracks peak RSS for the current render (reset_peak() starts one)
+    """
+    def __init__(self, *, budget: Optional[int] = None) -> None:
+        self.budget = MemoryBudget(budget)
+        self.caches: Dict[str, Callable[[], int]] = {}
+        self.peak_rss: Optional[int] = None
+
+    def register_cache(self, name: str, nbytes: Callable[[], int]) -> None:
+        self.caches[name] = nbytes
+
+    def reset_peak(self) -> None:
+        self.peak_rss = current_rss()
+
+    def sample(self) -> None:
+        rss = current_rss()
+        if rss is not None and (self.peak_rss is None or rss > self.peak_rss):
+            self.peak_rss = rss
+
+    def report(self, surfaces: Iterable[Any]) -> Dict[str, Any]:
+        seen: Dict[int, int] = {}
+        for surface in surfaces:
+            if id(surface) not in seen:
+                seen[id(surface)] = surface_nbytes(surface)
+        layer_bytes = sum(seen.values())
+        caches = {name: int(fn()) for name, fn in self.caches.items()}
+        return {
+            "layer_surfaces": {"count": len(seen), "bytes": layer_bytes},
+            "framebuffers": {
+                "in_flight": self.budget.count,
+                "bytes": self.budget.in_flight,
+                "peak_bytes": self.budget.peak,
+                "budget_bytes": self.budget.limit,
+            },
+            "caches": caches,
+            "tracked_bytes": layer_bytes + self.budget.in_flight + sum(caches.values()),
+            "rss": {"current": current_rss(), "peak_render": self.peak_rss},
+        }
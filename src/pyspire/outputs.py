@@ -0,0 +1,83 @@
+# outputs.py
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import cairocffi
+
+from .memory import surface_nbytes
+from .sinks import FrameSink
+
+
+@dataclass
+class OutputProfile:
+    """
+    One rendition of the scene, composited from the same simulated state as
+    every other profile (see PySpire.outputs).
+
+    scale:          output size relative to PySpire.size (0.25 turns 4K into 960x540)
+    sink:           where frames go; defaults to PNGs named
+                    <base_filename>_<name>_<frame:06>.png
+    background,
+    output_format:  as on PySpire; None inherits the scene's setting
+    """
+    name: str
+    scale: float = 1.0
+    sink: Optional[FrameSink] = None
+    background: Optional[Tuple[float, float, float]] = None
+    output_format: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if self.scale <= 0:
+            raise ValueError(f"output profile {self.name!r}: scale must be positive, got {self.scale}")
+
+
+class ScaledAssets:
+    """
+    Layer surfaces resampled once to one output scale, so a downscaled
+    profile composites from small sources instead of filtering the
+    full-size assets every frame.
+
+    Entries are keyed by surface identity: a layer whose surface is
+    replaced gets a fresh copy, but pixels drawn into an existing surface
+    after its first use are not picked up.
+    """
+    def __init__(self, scale: float) -> None:
+        self.scale = float(scale)
+        self._cache: Dict[int, Tuple[Any, Any]] = {}
+        self.grew = False
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, surface: Any) -> Any:
+        entry = self._cache.get(id(surface))
+        if entry is None or entry[0] is not surface:
+            entry = self._cache[id(surface)] = (surface, self._resample(surface))
+            self.grew = True
+        return entry[1]
+
+    def _resample(self, surface: Any) -> Any:
+        w = max(1, math.ceil(surface.get_width() * self.scale))
+        h = max(1, math.ceil(surface.get_height() * self.scale))
+        scaled = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, w, h)
+        ctx = cairocffi.Context(scaled)
+        ctx.scale(self.scale, self.scale)
+        pattern = cairocffi.SurfacePattern(surface)
+        pattern.set_filter(cairocffi.FILTER_BEST)
+        ctx.set_source(pattern)
+        ctx.paint()
+        scaled.flush()
+        return scaled
+
+    def retain(self, surfaces: Iterable[Any]) -> None:
+        """Drop entries whose source surface is no longer in `surfaces`."""
+        live = {id(s) for s in surfaces}
+        for key in [k for k in self._cache if k not in live]:
+            del self._cache[key]
+        self.grew = False
+
+    def nbytes(self) -> int:
+        return sum(surface_nbytes(scaled) for _, scaled in self._cache.values())
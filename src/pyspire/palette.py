@@ -0,0 +1,261 @@
+# palette.py
+"""
+Palette-quantized (indexed-color) PNG output for flat-color scenes.
+
+Requires NumPy (`pip install pyspire[numpy]`).
+"""
+from __future__ import annotations
+
+import struct
+import zlib
+from time import perf_counter
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import cairocffi
+import numpy as np
+
+from .arrays import surface_array
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def unpremultiply(bgra: np.ndarray, *, opaque: bool = False) -> np.ndarray:
+    """
+    (h, w, 4) premultiplied B,G,R,A -> (h, w, 4) straight-alpha R,G,B,A uint8.
+    `opaque` (RGB24 input, whose fourth byte is undefined) forces alpha to 255.
+    """
+    rgba = np.ascontiguousarray(bgra[..., [2, 1, 0, 3]])
+    alpha = rgba[..., 3]
+    if opaque:
+        alpha[...] = 255
+    if alpha.min() == 255:
+        return rgba
+    a = alpha[..., None].astype(np.uint16)
+    rgb = (rgba[..., :3].astype(np.uint16) * 255 + a // 2) // np.maximum(a, 1)
+    rgba[..., :3] = np.minimum(rgb, 255)
+    return rgba
+
+
+def _pack(rgba: np.ndarray) -> np.ndarray:
+    """One uint32 key per pixel (byte order is irrelevant, only equality matters)."""
+    return np.ascontiguousarray(rgba, dtype=np.uint8).reshape(-1, 4).view(np.uint32).ravel()
+
+
+def _unpack(keys: np.ndarray) -> np.ndarray:
+    return np.ascontiguousarray(keys, dtype=np.uint32).view(np.uint8).reshape(-1, 4)
+
+
+class Palette:
+    """
+    Up to 256 straight-alpha RGBA colors with a vectorized pixel -> index lookup.
+
+    Colors present in the palette map exactly; anything else maps to the
+    nearest entry (squared RGBA distance), and quantize() reports the mean
+    per-channel error so callers can decide whether the result is usable.
+    """
+    def __init__(self, colors: np.ndarray) -> None:
+        colors = np.asarray(colors, dtype=np.uint8).reshape(-1, 4)
+        if not 1 <= len(colors) <= 256:
+            raise ValueError(f"a palette needs 1..256 colors, got {len(colors)}")
+        self.colors = colors
+        keys = _pack(colors)
+        self._order = np.argsort(keys, kind="stable")
+        self._keys = keys[self._order]
+
+    def __len__(self) -> int:
+        return len(self.colors)
+
+    @classmethod
+    def from_histogram(cls, keys: np.ndarray, counts: np.ndarray, max_colors: int = 256) -> "Palette":
+        """The `max_colors` most frequent colors (keys as produced by histogram())."""
+        top = np.argsort(counts, kind="stable")[::-1][:max_colors]
+        return cls(_unpack(keys[top]))
+
+    @classmethod
+    def from_surfaces(cls, surfaces: Iterable[Any], max_colors: int = 256) -> "Palette":
+        """Palette of the most frequent colors across `surfaces` (plus full transparency)."""
+        keys, counts = histogram(np.zeros((1, 1, 4), dtype=np.uint8))
+        for surface in surfaces:
+            rgba = unpremultiply(surface_array(surface, readonly=True), opaque=surface.get_format() == cairocffi.FORMAT_RGB24)
+            keys, counts = merge_histograms(keys, counts, *histogram(rgba))
+        return cls.from_histogram(keys, counts, max_colors)
+
+    def quantize(self, rgba: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Map (h, w, 4) RGBA pixels to (h, w) uint8 indices; also returns the mean channel error."""
+        h, w = rgba.shape[:2]
+        uniq, inverse, counts = np.unique(_pack(rgba), return_inverse=True, return_counts=True)
+        pos = np.minimum(np.searchsorted(self._keys, uniq), len(self._keys) - 1)
+        exact = self._keys[pos] == uniq
+        index = np.empty(len(uniq), dtype=np.uint8)
+        index[exact] = self._order[pos[exact]]
+        error = 0.0
+        if not exact.all():
+            misses = _unpack(uniq[~exact]).astype(np.int32)
+            nearest = self._nearest(misses)
+            index[~exact] = nearest
+            diff = np.abs(misses - self.colors[nearest].astype(np.int32)).mean(axis=1)
+            error = float((diff * counts[~exact]).sum()) / (h * w)
+        return index[inverse.ravel()].reshape(h, w), error
+
+    def _nearest(self, colors: np.ndarray, chunk: int = 4096) -> np.ndarray:
+        pal = self.colors.astype(np.int32)
+        out = np.empty(len(colors), dtype=np.uint8)
+        for start in range(0, len(colors), chunk):
+            block = colors[start: start + chunk]
+            dist = ((block[:, None, :] - pal[None, :, :]) ** 2).sum(axis=2)
+            out[start: start + chunk] = dist.argmin(axis=1)
+        return out
+
+
+def histogram(rgba: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(color keys, pixel counts) for an (h, w, 4) RGBA image."""
+    return np.unique(_pack(rgba), return_counts=True)
+
+
+def merge_histograms(keys_a: np.ndarray, counts_a: np.ndarray,
+                     keys_b: np.ndarray, counts_b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    keys, inverse = np.unique(np.concatenate([keys_a, keys_b]), return_inverse=True)
+    counts = np.bincount(inverse.ravel(), weights=np.concatenate([counts_a, counts_b]))
+    return keys, counts.astype(np.int64)
+
+
+def _chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+
+def encode_indexed_png(indices: np.ndarray, palette: Palette, *, compress_level: int = 6) -> bytes:
+    """
+    PNG (color type 3) with PLTE and, when any entry is translucent, tRNS.
+    Palettes of up to 2/4/16 colors are written at 1/2/4 bits per pixel.
+    """
+    h, w = indices.shape
+    n = len(palette)
+    bits = 1 if n <= 2 else 2 if n <= 4 else 4 if n <= 16 else 8
+    rows = indices.astype(np.uint8)
+    if bits < 8:
+        per = 8 // bits
+        pad = -w % per
+        if pad:
+            rows = np.pad(rows, ((0, 0), (0, pad)))
+        shifts = (bits * np.arange(per - 1, -1, -1)).astype(np.uint8)
+        rows = np.bitwise_or.reduce(rows.reshape(h, -1, per) << shifts, axis=2).astype(np.uint8)
+    raw = np.hstack([np.zeros((h, 1), dtype=np.uint8), rows])  # filter type 0 per row
+
+    out = [PNG_SIGNATURE,
+           _chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, bits, 3, 0, 0, 0)),
+           _chunk(b"PLTE", palette.colors[:, :3].tobytes())]
+    alpha = palette.colors[:, 3]
+    opaque = np.nonzero(alpha != 255)[0]
+    if opaque.size:
+        out.append(_chunk(b"tRNS", alpha[: opaque[-1] + 1].tobytes()))
+    out.append(_chunk(b"IDAT", zlib.compress(raw.tobytes(), compress_level)))
+    out.append(_chunk(b"IEND", b""))
+    return b"".join(out)
+
+
+class PalettePngSink:
+    """
+    Frame sink writing <base_filename>_<frame:06>.png as 8-bit indexed PNGs.
+
+    palette:          fixed global palette (e.g. Palette.from_surfaces over
+                      the scene's layer surfaces); when None, the palette is
+                      built from the color histogram of the first
+                      `adaptive_frames` frames and then frozen
+    max_error:        mean per-channel error (0..255) above which a frame is
+                      written as truecolor RGBA instead
+    compare_every:    also encode every Nth frame as truecolor in memory to
+                      estimate the size and time saved (0 = never)
+    """
+    def __init__(self, base_filename: str, *, palette: Optional[Palette] = None, max_colors: int = 256,
+                 adaptive_frames: int = 30, max_error: float = 1.0, compare_every: int = 30,
+                 compress_level: int = 6) -> None:
+        self.base_filename = base_filename
+        self.palette = palette
+        self.max_colors = int(max_colors)
+        self.adaptive_frames = int(adaptive_frames)
+        self.max_error = float(max_error)
+        self.compare_every = int(compare_every)
+        self.compress_level = int(compress_level)
+        self._hist: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._seen = 0
+        self.indexed = 0
+        self.truecolor = 0
+        self.bytes_written = 0
+        self.encode_seconds = 0.0
+        # (frames, our bytes, our seconds, truecolor bytes, truecolor seconds) over compared frames
+        self._compared = [0, 0, 0.0, 0, 0.0]
+
+    @classmethod
+    def for_scene(cls, base_filename: str, sprites: Iterable[Any], **kwargs: Any) -> "PalettePngSink":
+        """Sink with a global palette built once from the sprites' layer surfaces."""
+        surfaces = {id(layer.surface): layer.surface for sprite in sprites for layer in sprite.layers}
+        palette = Palette.from_surfaces(surfaces.values(), kwargs.get("max_colors", 256))
+        return cls(base_filename, palette=palette, **kwargs)
+
+    def filename(self, frame_no: int) -> str:
+        return f"{self.base_filename}_{frame_no:06}.png"
+
+    def write(self, frame_no: int, surface: Any) -> None:
+        start = perf_counter()
+        rgba = unpremultiply(surface_array(surface, readonly=True), opaque=surface.get_format() == cairocffi.FORMAT_RGB24)
+        palette = self.palette
+        if palette is None:
+            hist = histogram(rgba)
+            self._hist = hist if self._hist is None else merge_histograms(*self._hist, *hist)
+            palette = Palette.from_histogram(*self._hist, self.max_colors)
+            self._seen += 1
+            if self._seen >= self.adaptive_frames:
+                self.palette = palette
+        indices, error = palette.quantize(rgba)
+        if error > self.max_error:
+            data = surface.write_to_png()
+            self.truecolor += 1
+        else:
+            data = encode_indexed_png(indices, palette, compress_level=self.compress_level)
+            self.indexed += 1
+        with open(self.filename(frame_no), "wb") as fh:
+            fh.write(data)
+        elapsed = perf_counter() - start
+        self.bytes_written += len(data)
+        self.encode_seconds += elapsed
+
+        if self.compare_every and (self.indexed + self.truecolor - 1) % self.compare_every == 0:
+            t0 = perf_counter()
+            reference = surface.write_to_png()
+            c = self._compared
+            c[0] += 1
+            c[1] += len(data)
+            c[2] += elapsed
+            c[3] += len(reference)
+            c[4] += perf_counter() - t0
+
+    def stats(self) -> Dict[str, Any]:
+        frames = self.indexed + self.truecolor
+        out: Dict[str, Any] = {
+            "frames": frames,
+            "indexed": self.indexed,
+            "truecolor": self.truecolor,
+            "bytes": self.bytes_written,
+            "encode_seconds": self.encode_seconds,
+            "palette_colors": len(self.palette) if self.palette is not None else None,
+        }
+        n, ours, our_s, ref, ref_s = self._compared
+        if n:
+            out["size_saving"] = 1.0 - ours / ref if ref else 0.0
+            out["time_saving"] = 1.0 - our_s / ref_s if ref_s else 0.0
+            out["truecolor_bytes_est"] = ref / n * frames
+            out["truecolor_seconds_est"] = ref_s / n * frames
+        return out
+
+    def report(self) -> str:
+        s = self.stats()
+        line = (f"palette png: {s['frames']} frames ({s['truecolor']} truecolor fallbacks), "
+                f"{s['bytes'] / 1e6:.1f} MB in {s['encode_seconds']:.2f}s")
+        if "size_saving" in s:
+            line += (f"; vs truecolor ~{s['truecolor_bytes_est'] / 1e6:.1f} MB in "
+                     f"{s['truecolor_seconds_est']:.2f}s ({s['size_saving']:.0%} smaller, "
+                     f"{s['time_saving']:.0%} faster)")
+        return line
+
+    def close(self) -> None:
+        pass
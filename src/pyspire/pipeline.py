@@ -0,0 +1,289 @@
+# pipeline.py
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field, replace
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+from .checkpoint import Checkpoint
+from .sprite import Sprite
+
+if TYPE_CHECKING:
+    from .py_spire import PySpire
+
+# queue name -> stage that consumes it
+STAGES = ("composite", "encode", "write")
+
+
+def snapshot(sprites: Sequence[Sprite]) -> List[Sprite]:
+    """Copies of the sprites and their layers (surfaces shared) for compositing later."""
+    return [replace(s, layers=[replace(layer) for layer in s.layers]) for s in sprites]
+
+
+@dataclass(eq=False)
+class _Frame:
+    frame_no: int
+    sprites: List[Sprite]
+    checkpoint: Optional[Checkpoint] = None
+    payloads: List[Any] = field(default_factory=list)  # per output: surface, then PNG bytes if encoded here
+    provided: List[Any] = field(default_factory=list)  # (sink, surface) for buffers lent by sinks
+    nbytes: int = 0  # memory budget held until the frame is written or abandoned
+    times: Dict[str, float] = field(default_factory=dict)
+    stamps: List[float] = field(default_factory=list)  # perf_counter at the end of each stage
+
+
+class RenderPipeline:
+    """
+    Renders a scene as four asyncio stages joined by bounded queues:
+
+      simulate   steps animations on the event loop thread and snapshots
+                 the scene, so it can run ahead of compositing
+      composite  draws each snapshot (one thread; the compositor may use more)
+      encode     PNG-encodes frames for outputs that accept bytes, with
+                 up to `encoders` frames in flight at once
+      write      writes frames in frame order, then saves checkpoints
+
+    Each queue holds at most `depth` frames, so a stage runs ahead only
+    until its downstream queue is full. depths() shows the current fill.
+    stats() shows the average fill and the time each stage spent blocked
+    on a full queue: the stage behind the fullest queue is the bottleneck.
+
+    `encode_pool` replaces the private encoder threads with a shared
+    executor (e.g. one pool for every scene of a batch); `progress=False`
+    turns off the per-frame status line.
+
+    If a stage fails, the others are cancelled and every frame still in
+    flight gives back its memory budget and any sink buffer it was
+    composited into (e.g. a SharedMemorySink slot) before the error
+    propagates, so a shared budget is not left short.
+    """
+    def __init__(self, spire: "PySpire", *, depth: int = 2, encoders: int = 2,
+                 encode_pool: Optional[Executor] = None, progress: bool = True) -> None:
+        if spire.frame_cache is not None:
+            raise ValueError("the render pipeline does not support frame_cache")
+        self.spire = spire
+        self.depth = max(1, int(depth))
+        self.encoders = max(1, int(encoders))
+        self.encode_pool = encode_pool
+        self.progress = progress
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self._depth_sum = dict.fromkeys(STAGES, 0)
+        self._samples = 0
+        self.blocked = dict.fromkeys(("simulate",) + STAGES[:-1], 0.0)
+        self.frames = 0
+        self._live: set = set()  # composited frames holding budget, until the writer claims them or they are abandoned
+        self._lock = threading.Lock()
+        self._aborted = False
+
+    # ---- introspection
+
+    def depths(self) -> Dict[str, int]:
+        return {name: q.qsize() for name, q in self.queues.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        n = max(1, self._samples)
+        mean = {name: total / n for name, total in self._depth_sum.items()}
+        return {
+            "frames": self.frames,
+            "depth": self.depth,
+            "mean_depth": mean,
+            "blocked_seconds": dict(self.blocked),
+            "bottleneck": max(mean, key=mean.get) if self._samples else None,
+        }
+
+    def report(self) -> str:
+        s = self.stats()
+        fill = ", ".join(f"{name} {d:.1f}/{self.depth}" for name, d in s["mean_depth"].items())
+        return f"pipeline: mean queue fill {fill}; bottleneck: {s['bottleneck']}"
+
+    # ---- running
+
+    async def run(self) -> int:
+        """Render until the scene is done; returns the number of frames written."""
+        self.queues = {name: asyncio.Queue(self.depth) for name in STAGES}
+        with ExitStack() as stack:
+            comp = stack.enter_context(ThreadPoolExecutor(1, thread_name_prefix="pyspire-composite"))
+            enc = self.encode_pool or stack.enter_context(
+                ThreadPoolExecutor(self.encoders, thread_name_prefix="pyspire-encode"))
+            wr = stack.enter_context(ThreadPoolExecutor(1, thread_name_prefix="pyspire-write"))
+            tasks = [asyncio.ensure_future(t) for t in
+                     (self._simulate(), self._composite(comp), self._encode(enc), self._write(wr))]
+            try:
+                await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            finally:
+                pending = [t for t in tasks if not t.done()]
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                failed = [t for t in tasks if not t.cancelled() and t.exception() is not None]
+                if pending or failed:
+                    # frames left in queues or dropped by cancelled stages; a composite still
+                    # running sees _aborted and frees its own, so the executors can shut down
+                    self._abandon()
+            if failed:
+                raise failed[0].exception()
+        return self.frames
+
+    def _abandon(self) -> None:
+        with self._lock:
+            self._aborted = True
+            for frame in list(self._live):
+                self._free(frame)
+
+    def _free(self, frame: _Frame) -> None:
+        """Give back a frame's budget and unwritten sink buffers (caller holds _lock)."""
+        self._live.discard(frame)
+        for sink, surface in frame.provided:
+            discard = getattr(sink, "discard", None)
+            if discard is not None:
+                discard(surface)
+        frame.provided = []
+        frame.payloads = []
+        if frame.nbytes:
+            self.spire.memory.budget.release(frame.nbytes)
+            frame.nbytes = 0
+
+    async def _put(self, stage: str, queue: str, item: Any) -> None:
+        if self.queues[queue].full():
+            start = perf_counter()
+            await self.queues[queue].put(item)
+            self.blocked[stage] += perf_counter() - start
+        else:
+            self.queues[queue].put_nowait(item)
+
+    async def _simulate(self) -> None:
+        spire = self.spire
+        while not spire.done:
+            t0 = perf_counter()
+            spire.step_animations()
+            sprites = spire.render_list()
+            if spire.recorder is not None:
+                spire.recorder.frame(spire.frame_no, sprites)
+            frame = _Frame(spire.frame_no, snapshot(sprites))
+            spire.frame_no += 1
+            if spire.checkpoint_every and (spire.done or spire.frame_no % spire.checkpoint_every == 0):
+                frame.checkpoint = Checkpoint.capture(spire)
+            frame.times["animate"] = perf_counter() - t0
+            frame.stamps.append(perf_counter())
+            for name, q in self.queues.items():
+                self._depth_sum[name] += q.qsize()
+            self._samples += 1
+            await self._put("simulate", "composite", frame)
+            await asyncio.sleep(0)  # let the other stages pick up work
+        await self._put("simulate", "composite", None)
+
+    async def _composite(self, pool: ThreadPoolExecutor) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            frame = await self.queues["composite"].get()
+            if frame is None:
+                break
+            await loop.run_in_executor(pool, self._composite_frame, frame)
+            await self._put("composite", "encode", frame)
+        await self._put("composite", "encode", None)
+
+    def _composite_frame(self, frame: _Frame) -> None:
+        spire = self.spire
+        t0 = perf_counter()
+        targets = spire.outputs or [None]
+        nbytes = sum(spire.frame_nbytes(p) for p in targets)
+        spire.memory.budget.acquire(nbytes)
+        frame.nbytes = nbytes
+        try:
+            for profile, sink in zip(targets, self._sinks()):
+                target = spire._sink_surface(profile)
+                if target is not None:
+                    frame.provided.append((sink, target))
+                frame.payloads.append(spire.composite(profile, target, frame.sprites))
+            for profile, surface in zip(targets, frame.payloads):
+                for hook in spire.frame_hooks:
+                    hook(frame.frame_no, surface, profile)
+                if spire.frame_hooks:
+                    surface.mark_dirty()
+        except BaseException:
+            with self._lock:
+                self._free(frame)
+            raise
+        with self._lock:
+            if self._aborted:  # the pipeline failed while this frame was being drawn
+                self._free(frame)
+                return
+            self._live.add(frame)
+        frame.times["composite"] = perf_counter() - t0
+        frame.stamps.append(perf_counter())
+
+    async def _encode(self, pool: Executor) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            frame = await self.queues["encode"].get()
+            if frame is None:
+                break
+            # queue the future itself: encodes overlap, the writer awaits them in order
+            future = loop.run_in_executor(pool, self._encode_frame, frame)
+            await self._put("encode", "write", (frame, future))
+        await self._put("encode", "write", None)
+
+    def _encode_frame(self, frame: _Frame) -> None:
+        t0 = perf_counter()
+        for i, sink in enumerate(self._sinks()):
+            if sink is None or hasattr(sink, "write_bytes"):
+                frame.payloads[i] = frame.payloads[i].write_to_png()
+        frame.times["encode"] = perf_counter() - t0
+        frame.stamps.append(perf_counter())
+
+    async def _write(self, pool: ThreadPoolExecutor) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            entry = await self.queues["write"].get()
+            if entry is None:
+                break
+            frame, encoded = entry
+            await encoded
+            await loop.run_in_executor(pool, self._write_frame, frame)
+            if not self.progress:
+                continue
+            prof = self.spire.profiler
+            if prof is None:
+                print(f"Frame: {frame.frame_no + 1}", end="\r", flush=True)
+            else:
+                print(prof.status_line(frame.frame_no + 1), end="\r", flush=True)
+
+    def _write_frame(self, frame: _Frame) -> None:
+        spire = self.spire
+        t0 = perf_counter()
+        with self._lock:  # claim the frame; held only briefly so compositing never waits on disk
+            if frame not in self._live:  # abandoned after a failure elsewhere
+                return
+            self._live.discard(frame)
+        try:
+            for sink, payload in zip(self._sinks(), frame.payloads):
+                if sink is None:
+                    with open(spire.output_filename(frame.frame_no), "wb") as fh:
+                        fh.write(payload)
+                elif isinstance(payload, bytes):
+                    sink.write_bytes(frame.frame_no, payload)
+                else:
+                    sink.write(frame.frame_no, payload)
+        finally:
+            with self._lock:
+                self._free(frame)
+        spire.memory.sample()
+        if frame.checkpoint is not None:
+            frame.checkpoint.save(spire.checkpoint_path())
+        frame.times["write"] = perf_counter() - t0
+        frame.stamps.append(perf_counter())
+        self.frames += 1
+        if spire.profiler is not None:
+            spire.profiler.record(frame.frame_no, frame.times)
+        if spire.tracer is not None:
+            names = ("animate", "composite", "encode", "write")
+            starts = [frame.stamps[0] - frame.times["animate"]] + frame.stamps[:-1]
+            spire.tracer.frame(frame.frame_no, [(n, s, s + frame.times[n]) for n, s in zip(names, starts)])
+
+    def _sinks(self) -> List[Any]:
+        spire = self.spire
+        return [p.sink for p in spire.outputs] if spire.outputs else [spire.sink]
@@ -0,0 +1,142 @@
+# profiling.py
+from __future__ import annotations
+
+import json
+from math import ceil
+from collections import deque
+from time import perf_counter
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+FrameHook = Callable[[int, Dict[str, float]], None]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of `samples` (q in 0..100); 0.0 when empty."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, ceil(q / 100.0 * len(ordered)) - 1))
+    return ordered[k]
+
+
+class FrameProfiler:
+    """
+    Per-stage frame timings for a render.
+
+    - record() takes one frame's stage durations in seconds
+    - rolling p50/p95/max come from the last `window` frames; totals, means
+      and all-time max cover the whole render
+    - fps is measured over the rolling window; eta() needs `expected_frames`
+    - hooks are called as hook(frame_no, durations) after every frame, to
+      feed external metrics
+    """
+    def __init__(self, *, window: int = 300, expected_frames: Optional[int] = None) -> None:
+        self.window = int(window)
+        self.expected_frames = expected_frames
+        self.frames = 0
+        self._recent: Dict[str, Deque[float]] = {}
+        self._total: Dict[str, float] = {}
+        self._max: Dict[str, float] = {}
+        self._stamps: Deque[float] = deque(maxlen=self.window + 1)
+        self._started: Optional[float] = None
+        self._hooks: List[FrameHook] = []
+
+    # ---- collection
+
+    def add_hook(self, hook: FrameHook) -> Callable[[], None]:
+        self._hooks.append(hook)
+        def remove() -> None:
+            if hook in self._hooks:
+                self._hooks.remove(hook)
+        return remove
+
+    def record(self, frame_no: int, durations: Dict[str, float]) -> None:
+        now = perf_counter()
+        if self._started is None:
+            self._started = now - sum(durations.values())
+            self._stamps.append(self._started)
+        self._stamps.append(now)
+        self.frames += 1
+        for stage, dt in durations.items():
+            recent = self._recent.get(stage)
+            if recent is None:
+                recent = self._recent[stage] = deque(maxlen=self.window)
+                self._total[stage] = 0.0
+                self._max[stage] = 0.0
+            recent.append(dt)
+            self._total[stage] += dt
+            if dt > self._max[stage]:
+                self._max[stage] = dt
+        for hook in self._hooks:
+            hook(frame_no, durations)
+
+    # ---- queries
+
+    def stage_stats(self, stage: str) -> Dict[str, float]:
+        recent = list(self._recent.get(stage, ()))
+        return {
+            "p50": percentile(recent, 50),
+            "p95": percentile(recent, 95),
+            "max": max(recent, default=0.0),
+            "mean": self._total.get(stage, 0.0) / self.frames if self.frames else 0.0,
+            "total": self._total.get(stage, 0.0),
+            "max_all": self._max.get(stage, 0.0),
+        }
+
+    @property
+    def fps(self) -> float:
+        if len(self._stamps) < 2:
+            return 0.0
+        span = self._stamps[-1] - self._stamps[0]
+        return (len(self._stamps) - 1) / span if span > 0 else 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return self._stamps[-1] - self._started if self._started is not None else 0.0
+
+    def eta(self) -> Optional[float]:
+        """Seconds left at the current rate, or None without `expected_frames`."""
+        if self.expected_frames is None or self.fps <= 0:
+            return None
+        return max(0, self.expected_frames - self.frames) / self.fps
+
+    def status_line(self, frame_no: int) -> str:
+        line = f"Frame: {frame_no}  {self.fps:6.1f} fps"
+        eta = self.eta()
+        if eta is not None:
+            line += f"  ETA {_clock(eta)}"
+        return line
+
+    # ---- reports
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "frames": self.frames,
+            "elapsed_s": self.elapsed,
+            "fps": self.frames / self.elapsed if self.elapsed > 0 else 0.0,
+            "window": self.window,
+            "stages": {stage: self.stage_stats(stage) for stage in self._recent},
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.summary(), indent=2)
+
+    def report(self) -> str:
+        s = self.summary()
+        lines = [
+            f"{s['frames']} frames in {s['elapsed_s']:.2f}s ({s['fps']:.1f} fps)",
+            f"{'stage':<12}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'total s':>10}{'share':>8}",
+        ]
+        grand = sum(st["total"] for st in s["stages"].values()) or 1.0
+        for stage, st in s["stages"].items():
+            lines.append(
+                f"{stage:<12}{st['p50'] * 1e3:>10.2f}{st['p95'] * 1e3:>10.2f}"
+                f"{st['max_all'] * 1e3:>10.2f}{st['total']:>10.2f}{st['total'] / grand:>8.0%}"
+            )
+        return "\n".join(lines)
+
+
+def _clock(seconds: float) -> str:
+    m, s = divmod(int(round(seconds)), 60)
+    h, m = divmod(m, 60)
+    return f"{h}:{m:02}:{s:02}"
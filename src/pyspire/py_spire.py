@@ -1,13 +1,31 @@
+import asyncio
+import os
+from concurrent.futures import Executor
 from dataclasses import dataclass, field
 from collections import defaultdict
-from typing import Callable, Dict, List, Any
+from time import perf_counter
+from typing import Callable, Dict, List, Any, Optional, Sequence, Tuple
 
 import cairocffi
 
 from .sprite import Sprite
 from .primitives import Size
-from .event_bus import EventBus
+from .event_bus import EventBus, EventQueue
 from .animation_base import Animation
+from .recording import TimelineRecorder
+from .profiling import FrameProfiler
+from .tracing import Tracer
+from .memory import MemoryTracker
+from .frame_cache import FrameCache
+from .checkpoint import Checkpoint, is_complete_png
+from .sinks import FrameSink, PngSequenceSink
+from .outputs import OutputProfile, ScaledAssets
+from .compositing import CairoCompositor, Compositor
+from .pipeline import RenderPipeline
+from .scene_graph import Group, WorldSprites
+from .batch import defer_render
+
+OUTPUT_FORMATS = {"auto", "argb32", "rgb24"}
 
 @dataclass
 class PySpire:
@@ -18,33 +36,387 @@ class PySpire:
     bus: EventBus = field(default_factory=EventBus)
     animations: List[Animation] = field(default_factory=list)
     done: bool = False
+    # Optional: when set, every bus owned by the scene defers delivery to this
+    # queue, which is drained once per frame after all animations have stepped.
+    event_queue: Optional[EventQueue] = None
+    # Optional: records events, animation creations and per-frame scene state
+    # so the render can be replayed without the script (see recording.py).
+    recorder: Optional[TimelineRecorder] = None
+    # Optional: times each render_frame stage (animate / composite / write).
+    profiler: Optional[FrameProfiler] = None
+    # Optional: collects frame-stage, animation and handler spans as a Chrome trace.
+    tracer: Optional[Tracer] = None
+    # Byte accounting for surfaces, in-flight framebuffers and caches; give it
+    # MemoryTracker(budget=...) to cap framebuffer memory.
+    memory: MemoryTracker = field(default_factory=MemoryTracker)
+    # Optional: reuse PNGs from earlier renders whose scene state hashes the same.
+    frame_cache: Optional[FrameCache] = None
+    # Write a resume checkpoint every N frames during render_until_done (0 = off).
+    checkpoint_every: int = 0
+    # Optional: send frames here instead of writing output_filename() PNGs
+    # (frame_cache and resume work on the PNG files, so they need sink=None
+    # and no outputs).
+    sink: Optional[FrameSink] = None
+    # Optional: (r, g, b) in 0..1 painted under the sprites of every frame.
+    background: Optional[Tuple[float, float, float]] = None
+    # "auto": opaque RGB24 frames when a background is set, transparent ARGB32
+    # otherwise (for overlays composited later in an editor). "argb32" and
+    # "rgb24" force one; rgb24 without a background flattens onto black.
+    output_format: str = "auto"
+    # Optional: several renditions (scale, format, sink) of each simulated
+    # frame, e.g. 4K + 1080p + thumbnail in one pass. Replaces the single
+    # output (base_filename PNGs / sink) and cannot be combined with
+    # frame_cache or sink.
+    outputs: List[OutputProfile] = field(default_factory=list)
+    # Compositing backend; None uses CairoCompositor. TiledCompositor spreads
+    # cairo over threads, NumpyCompositor blits premultiplied arrays.
+    compositor: Optional[Compositor] = None
+    # Called as hook(frame_no, surface, profile) on every composited frame
+    # before it is written (profile is None for the single output). Hooks may
+    # edit pixels in place, e.g. through arrays.surface_array(surface). With
+    # frame_cache, hooks must depend only on the scene's pixels.
+    frame_hooks: List[Callable[[int, Any, Optional[OutputProfile]], None]] = field(default_factory=list)
+    # Groups made by add_group (see scene_graph.py); grouped sprites are
+    # still listed in `sprites`, with positions relative to their group.
+    groups: List[Group] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        for fmt in [self.output_format] + [p.output_format for p in self.outputs if p.output_format is not None]:
+            if fmt not in OUTPUT_FORMATS:
+                raise ValueError(f"output_format must be one of {sorted(OUTPUT_FORMATS)}, got {fmt!r}")
+        if self.outputs and (self.sink is not None or self.frame_cache is not None):
+            raise ValueError("outputs replace the single output and cannot be combined with sink or frame_cache")
+        if self.compositor is None:
+            self.compositor = CairoCompositor()
+        compositor_nbytes = getattr(self.compositor, "nbytes", None)
+        if compositor_nbytes is not None:
+            self.memory.register_cache("compositor", compositor_nbytes)
+        self._assets: Dict[str, ScaledAssets] = {}
+        self._world = WorldSprites()
+        for profile in self.outputs:
+            if profile.sink is None:
+                profile.sink = PngSequenceSink(f"{self.base_filename}_{profile.name}")
+            if profile.scale != 1:
+                assets = self._assets[profile.name] = ScaledAssets(profile.scale)
+                self.memory.register_cache(f"scaled_assets[{profile.name}]", assets.nbytes)
+        if self.sink is not None and self.frame_cache is not None:
+            raise ValueError("frame_cache reuses PNG files and cannot be combined with a custom sink")
+        if self.recorder is not None:
+            self.recorder.begin(self.size, self.base_filename, self.sprites)
+        self._attach_bus(self.bus, "scene")
 
-    def add_sprite(self, name):
+    def add_sprite(self, name, parent: Optional[Group] = None):
         new_sprite = Sprite(name=name)
         self.sprites.append(new_sprite)
+        if parent is not None:
+            parent.add(new_sprite)
         return new_sprite
 
+    def add_group(self, name: str, parent: Optional[Group] = None, **kw: Any) -> Group:
+        """New Group (position=, opacity=, z= as keywords), optionally inside `parent`."""
+        group = Group(name, **kw)
+        self.groups.append(group)
+        if parent is not None:
+            parent.add(group)
+        return group
+
+    def render_list(self) -> Sequence[Sprite]:
+        """The sprites as the compositor draws them: world space, in paint order."""
+        return self._world(self.sprites)
+
     def add_animation(self, a: Animation) -> None:
+        self._attach_bus(a.bus, a.name)
+        if self.recorder is not None:
+            self.recorder.animation(a)
+        if self.tracer is not None:
+            self.tracer.animation_begin(a)
         self.animations.append(a)
 
+    def _attach_bus(self, bus: EventBus, source: str) -> None:
+        if self.event_queue is not None:
+            bus.queue = self.event_queue
+        if self.recorder is not None:
+            bus.tap = self.recorder.tap_for(source)
+        if self.tracer is not None:
+            bus.trace = self.tracer.handler_runner(source)
+
+    def step_animations(self) -> None:
+        """
+        Advance every animation by one frame, then (queued mode) deliver
+        this frame's events. Animations added during the frame start stepping
+        on the next one; finished animations are dropped.
+        """
+        anims = self.animations
+        finished = 0
+        if self.event_queue is None:
+            # handlers run inline and may append; only step what was here at frame start
+            for i in range(len(anims)):
+                anim = anims[i]
+                anim.step()
+                finished += anim.done
+        else:
+            for anim in anims:
+                anim.step()
+                finished += anim.done
+            self.event_queue.drain()
+        if finished:
+            if self.tracer is not None:
+                for a in anims:
+                    if a.done:
+                        self.tracer.animation_end(a)
+            anims[:] = [a for a in anims if not a.done]
+
     def render_frame(self):
-        for anim in list(self.animations):  # copy so we can remove safely
-            anim.step()
-            if anim.done:
-                self.animations.remove(anim)
-
-        surface = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, self.size.width, self.size.height)
-        ctx = cairocffi.Context(surface)
-        for sprite in self.sprites:
-            sprite.render(ctx)
-        surface.write_to_png(self.output_filename())
+        timed = self.profiler is not None or self.tracer is not None
+        if timed:
+            t0 = perf_counter()
+
+        self.step_animations()
+        if self.recorder is not None:
+            self.recorder.frame(self.frame_no, self.render_list())
+        if timed:
+            t1 = perf_counter()
+
+        key = None
+        if self.frame_cache is not None:
+            key = self.frame_cache.key(self.size, self.render_list(), self._cache_extra())
+            if self.frame_cache.fetch(key, self.output_filename()):
+                if timed:
+                    self._record_timings(t0, t1, t1, perf_counter())  # nothing composited
+                self.frame_no = self.frame_no + 1
+                return
+
+        targets = self.outputs or [None]
+        nbytes = sum(self.frame_nbytes(p) for p in targets)
+        self.memory.budget.acquire(nbytes)
+        try:
+            # every output is composited from the same simulated state, straight
+            # into the sink's own buffer when it offers one
+            frames = [self.composite(p, self._sink_surface(p)) for p in targets]
+            if self.frame_hooks:
+                for profile, surface in zip(targets, frames):
+                    for hook in self.frame_hooks:
+                        hook(self.frame_no, surface, profile)
+                    surface.mark_dirty()
+            if timed:
+                t2 = perf_counter()
+
+            for profile, surface in zip(targets, frames):
+                sink = self.sink if profile is None else profile.sink
+                if sink is None:
+                    surface.write_to_png(self.output_filename())
+                else:
+                    sink.write(self.frame_no, surface)
+        finally:
+            self.memory.budget.release(nbytes)
+        if key is not None:
+            self.frame_cache.store(key, self.output_filename())
+        if timed:
+            self._record_timings(t0, t1, t2, perf_counter())
         self.frame_no = self.frame_no + 1
 
-    def render_until_done(self):
-        while not self.done:
-              self.render_frame()
-              print(f"Frame: {self.frame_no}", end="\r", flush=True)
-        print(f"Frame: {self.frame_no}/{self.frame_no}")
+    def _sink_surface(self, profile: Optional[OutputProfile]) -> Optional[cairocffi.ImageSurface]:
+        sink = self.sink if profile is None else profile.sink
+        provide = getattr(sink, "frame_surface", None)
+        if provide is None:
+            return None
+        return provide(self.cairo_format(profile), *self.output_size(profile))
+
+    def _record_timings(self, t0: float, t1: float, t2: float, t3: float) -> None:
+        if self.profiler is not None:
+            self.profiler.record(self.frame_no, {"animate": t1 - t0, "composite": t2 - t1, "write": t3 - t2})
+        if self.tracer is not None:
+            self.tracer.frame(self.frame_no, [("animate", t0, t1), ("composite", t1, t2), ("write", t2, t3)])
+
+    @property
+    def opaque(self) -> bool:
+        """True when frames are rendered as RGB24 (no alpha channel)."""
+        return self._opaque(None)
+
+    def _background(self, profile: Optional[OutputProfile]) -> Optional[Tuple[float, float, float]]:
+        if profile is None or profile.background is None:
+            return self.background
+        return profile.background
+
+    def _opaque(self, profile: Optional[OutputProfile]) -> bool:
+        fmt = self.output_format if profile is None or profile.output_format is None else profile.output_format
+        if fmt == "auto":
+            return self._background(profile) is not None
+        return fmt == "rgb24"
+
+    def cairo_format(self, profile: Optional[OutputProfile] = None) -> int:
+        return cairocffi.FORMAT_RGB24 if self._opaque(profile) else cairocffi.FORMAT_ARGB32
+
+    def output_size(self, profile: Optional[OutputProfile] = None) -> Tuple[int, int]:
+        """Pixel (width, height) of frames for `profile` (None: the scene's own output)."""
+        scale = 1.0 if profile is None else profile.scale
+        return max(1, round(self.size.width * scale)), max(1, round(self.size.height * scale))
+
+    def _cache_extra(self) -> Tuple[Any, ...]:
+        extra: Tuple[Any, ...] = ()
+        if self.background is not None or self.opaque:
+            extra = (self.background, self.opaque)
+        tag = getattr(self.compositor, "cache_tag", type(self.compositor).__name__)
+        return extra + ((("compositor", tag),) if tag else ())
+
+    def composite(self, profile: Optional[OutputProfile] = None,
+                  target: Optional[cairocffi.ImageSurface] = None,
+                  sprites: Optional[List[Sprite]] = None) -> cairocffi.ImageSurface:
+        """Draw one frame for `profile` from `sprites` (default: the live scene)."""
+        if sprites is None:
+            sprites = self.render_list()
+        fmt = self.cairo_format(profile)
+        width, height = (self.size.width, self.size.height) if profile is None else self.output_size(profile)
+        background = self._background(profile)
+        if background is None and self._opaque(profile):
+            background = (0, 0, 0)  # RGB24 leaves the unused byte undefined; start from opaque black
+        assets = None if profile is None else self._assets.get(profile.name)
+        surface = self.compositor.composite(fmt, int(width), int(height), sprites, background, assets, target)
+        if assets is not None and assets.grew:
+            assets.retain(layer.surface for sprite in sprites for layer in sprite.layers)
+        return surface
+
+    def frame_nbytes(self, profile: Optional[OutputProfile] = None) -> int:
+        width, height = (int(self.size.width), int(self.size.height)) if profile is None else self.output_size(profile)
+        stride = cairocffi.ImageSurface.format_stride_for_width(self.cairo_format(profile), width)
+        return stride * height
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Bytes held by layer surfaces (each surface once), framebuffers in flight, caches and RSS."""
+        return self.memory.report(layer.surface for sprite in self.sprites for layer in sprite.layers)
+
+    def checkpoint_path(self) -> str:
+        return f"{self.base_filename}.checkpoint.json"
+
+    def resume(self) -> int:
+        """
+        Fast-forward to the latest checkpoint by re-running the simulation
+        only (no compositing or encoding), stopping early at the first output
+        frame that is missing or truncated. Raises RuntimeError if the
+        re-simulated state does not match the checkpoint. Returns the frame
+        rendering continues from. Only the default output_filename() PNGs
+        can be checked, so a custom sink or output profiles raise ValueError.
+        """
+        if self.sink is not None or self.outputs:
+            raise ValueError("resume checks the output_filename() PNGs and cannot be used with sink or outputs")
+        path = self.checkpoint_path()
+        cp = Checkpoint.load(path) if os.path.exists(path) else None
+        target = cp.frame_no if cp is not None else 0
+        for n in range(target):
+            if not is_complete_png(self.output_filename(n)):
+                target = n
+                break
+
+        self.fast_forward(target)
+
+        if cp is not None and self.frame_no == cp.frame_no:
+            diverged = cp.diff(Checkpoint.capture(self))
+            if diverged:
+                raise RuntimeError(
+                    f"resume: scene state at frame {cp.frame_no} differs from checkpoint "
+                    f"({', '.join(diverged)}); was the script changed?"
+                )
+        return self.frame_no
+
+    def fast_forward(self, frame_no: int) -> int:
+        """Simulate (no compositing or output) until `frame_no` or the end; returns the frame reached."""
+        while self.frame_no < frame_no and not self.done:
+            self.step_animations()
+            self.frame_no = self.frame_no + 1
+        return self.frame_no
+
+    def rebase(self, base_filename: str) -> None:
+        """Move the output to `base_filename`, including the default sinks of output profiles."""
+        old, self.base_filename = self.base_filename, base_filename
+        for profile in self.outputs:
+            if isinstance(profile.sink, PngSequenceSink) and profile.sink.base_filename == f"{old}_{profile.name}":
+                profile.sink.base_filename = f"{base_filename}_{profile.name}"
+
+    def render_until_done(self, resume: bool = False, pipelined: bool = False, *,
+                          quiet: bool = False, encode_pool: Optional[Executor] = None) -> List[str]:
+        """
+        Render every remaining frame. With pipelined=True, simulation,
+        compositing, PNG encoding and writing overlap as a RenderPipeline
+        (not available with frame_cache), encoding on `encode_pool` when
+        given. Returns the closing report lines, which are also printed
+        unless `quiet`. Inside a batch load (batch.py) the render is only
+        queued and this returns at once.
+        """
+        if defer_render(self, resume=resume, pipelined=pipelined):
+            return []
+        prof = self.profiler
+        self.memory.reset_peak()
+        if resume:
+            self.resume()
+        pipeline = None
+        try:
+            if pipelined:
+                pipeline = RenderPipeline(self, encode_pool=encode_pool, progress=not quiet)
+                asyncio.run(pipeline.run())
+            while not self.done:
+                  self.render_frame()
+                  self.memory.sample()
+                  if self.checkpoint_every and (self.done or self.frame_no % self.checkpoint_every == 0):
+                      Checkpoint.capture(self).save(self.checkpoint_path())
+                  if quiet:
+                      continue
+                  if prof is None:
+                      print(f"Frame: {self.frame_no}", end="\r", flush=True)
+                  else:
+                      print(prof.status_line(self.frame_no), end="\r", flush=True)
+        except BaseException:
+            self._abort_render()
+            raise
+        return self._finish_render(quiet, pipeline)
+
+    def _abort_render(self) -> None:
+        """Close the compositor and sinks of a failed render, keeping the original error."""
+        sinks = [self.sink] + [p.sink for p in self.outputs]
+        closers = [self.compositor.close] + [sink.close for sink in sinks if sink is not None]
+        if self.recorder is not None:
+            closers.append(self.recorder.close)
+        for close in closers:
+            try:
+                close()
+            except Exception:
+                pass
+
+    def _finish_render(self, quiet: bool, pipeline: Optional[RenderPipeline] = None) -> List[str]:
+        lines = []
+        if self.profiler is not None:
+            lines.append(self.profiler.report())
+        if self.frame_cache is not None:
+            lines.append(self.frame_cache.report())
+        if pipeline is not None:
+            lines.append(pipeline.report())
+        # close everything even if one fails (e.g. a sink whose encodes failed),
+        # so no encoder process or shared-memory block outlives the render
+        errors: List[BaseException] = []
+        closers = [self.compositor.close] + ([self.recorder.close] if self.recorder is not None else [])
+        for close in closers:
+            try:
+                close()
+            except Exception as exc:
+                errors.append(exc)
+        for sink in [self.sink] + [p.sink for p in self.outputs]:
+            if sink is None:
+                continue
+            try:
+                sink.close()  # before report(): sinks that encode in the background finish here
+            except Exception as exc:
+                errors.append(exc)
+            report = getattr(sink, "report", None)
+            if report is not None:
+                lines.append(report())
+        if errors:
+            raise errors[0]
+        if not quiet:
+            print(f"Frame: {self.frame_no}/{self.frame_no}")
+            for line in lines:
+                print(line)
+        return lines
 
-    def output_filename(self) -> str:
-        return f"{self.base_filename}_{self.frame_no:06}.png"
+    def output_filename(self, frame_no: Optional[int] = None) -> str:
+        if frame_no is None:
+            frame_no = self.frame_no
+        return f"{self.base_filename}_{frame_no:06}.png"
@@ -0,0 +1,245 @@
+# recording.py
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Sequence
+
+import cairocffi
+
+from .memory import surface_nbytes
+from .primitives import Vec2
+from .sprite import Sprite
+from .sprite_layer import SpriteLayer
+
+# One sprite's drawable state: name, x, y, opacity, and its layers as
+# [source, offset_x, offset_y, scale, opacity] rows, bottom to top.
+SpriteState = Dict[str, Any]
+
+FORMAT_VERSION = 1
+
+
+def sprite_state(sprite: Sprite) -> SpriteState:
+    return {
+        "name": sprite.name,
+        "x": sprite.position.x,
+        "y": sprite.position.y,
+        "opacity": sprite.opacity,
+        "layers": [
+            [layer.source, layer.offset.x, layer.offset.y, layer.scale, layer.opacity]
+            for layer in sprite.layers
+        ],
+    }
+
+
+def scene_state(sprites: Sequence[Sprite]) -> List[SpriteState]:
+    """Everything the compositor reads for one frame, as plain data."""
+    return [sprite_state(s) for s in sprites]
+
+
+class TimelineRecorder:
+    """
+    Writes a scene's timeline as JSON lines while it renders.
+
+    Line kinds (field "t"):
+      - header: format version, canvas size, base filename
+      - event:  frame, source bus, event name, payload
+      - anim:   frame an animation was added, its target and describe()
+      - frame:  frame number, sprite count, and the states of sprites that
+                changed since the previous frame (keyed by sprite index)
+
+    Objects in payloads are written as references: sprites by name, layers
+    as "<sprite>/<index>", animations by name, anything else by repr().
+    """
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._fh: Optional[IO[str]] = None
+        self._frame = 0
+        self._prev: List[SpriteState] = []
+        self._sprites: Sequence[Sprite] = ()
+
+    # ---- lifecycle
+
+    def begin(self, size: Sequence[float], base_filename: str, sprites: Sequence[Sprite]) -> None:
+        self._sprites = sprites
+        self._write({"t": "header", "version": FORMAT_VERSION,
+                     "size": list(size), "base_filename": base_filename})
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    # ---- capture
+
+    def tap_for(self, source: str) -> Callable[[str, Dict[str, Any]], None]:
+        """Return an EventBus tap that records events under `source`."""
+        def tap(event: str, payload: Dict[str, Any]) -> None:
+            self.event(source, event, payload)
+        return tap
+
+    def event(self, source: str, event: str, payload: Dict[str, Any]) -> None:
+        self._write({"t": "event", "f": self._frame, "src": source, "e": event,
+                     "data": self._plain(payload)})
+
+    def animation(self, anim: Any) -> None:
+        self._write({"t": "anim", "f": self._frame, "target": self._plain(anim.target),
+                     "desc": self._plain(anim.describe())})
+
+    def frame(self, frame_no: int, sprites: Sequence[Sprite]) -> None:
+        states = scene_state(sprites)
+        prev = self._prev
+        changed = {
+            str(i): st for i, st in enumerate(states)
+            if i >= len(prev) or prev[i] != st
+        }
+        self._write({"t": "frame", "f": frame_no, "n": len(states), "set": changed})
+        self._prev = states
+        self._frame = frame_no + 1
+
+    # ---- internals
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        if self._fh is None:
+            self._fh = open(self.path, "w", encoding="utf-8")
+        self._fh.write(json.dumps(record, separators=(",", ":")))
+        self._fh.write("\n")
+
+    def _plain(self, v: Any) -> Any:
+        if v is None or isinstance(v, (bool, int, float, str)):
+            return v
+        if isinstance(v, dict):
+            return {str(k): self._plain(x) for k, x in v.items()}
+        if isinstance(v, (list, tuple)):
+            return [self._plain(x) for x in v]
+        if isinstance(v, Vec2):
+            return [v.x, v.y]
+        if isinstance(v, Sprite):
+            return {"sprite": v.name}
+        if isinstance(v, SpriteLayer):
+            for sprite in self._sprites:
+                for i, layer in enumerate(sprite.layers):
+                    if layer is v:
+                        return {"layer": f"{sprite.name}/{i}"}
+            return {"layer": v.source}
+        if hasattr(v, "describe") and hasattr(v, "bus"):
+            return {"animation": v.name}
+        return repr(v)
+
+
+@dataclass
+class Timeline:
+    """A loaded recording: header, events, animation records, per-frame deltas."""
+    header: Dict[str, Any]
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    animations: List[Dict[str, Any]] = field(default_factory=list)
+    frames: List[Dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: str) -> "Timeline":
+        with open(path, "r", encoding="utf-8") as fh:
+            return cls.parse(fh)
+
+    @classmethod
+    def parse(cls, lines: Iterator[str]) -> "Timeline":
+        timeline: Optional[Timeline] = None
+        for line in lines:
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            kind = rec["t"]
+            if kind == "header":
+                if rec["version"] != FORMAT_VERSION:
+                    raise ValueError(f"unsupported timeline version {rec['version']}")
+                timeline = cls(header=rec)
+            elif timeline is None:
+                raise ValueError("timeline is missing its header line")
+            elif kind == "event":
+                timeline.events.append(rec)
+            elif kind == "anim":
+                timeline.animations.append(rec)
+            elif kind == "frame":
+                timeline.frames.append(rec)
+        if timeline is None:
+            raise ValueError("empty timeline")
+        return timeline
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def states(self) -> Iterator[List[SpriteState]]:
+        """Yield the full scene state of every frame, in order."""
+        current: List[SpriteState] = []
+        for rec in self.frames:
+            n = rec["n"]
+            current = current[:n] + [{}] * max(0, n - len(current))
+            for i, st in rec["set"].items():
+                current[int(i)] = st
+            yield list(current)
+
+    def first_difference(self, other: "Timeline") -> Optional[int]:
+        """First frame whose scene state differs between two recordings (None if identical)."""
+        mine, theirs = self.states(), other.states()
+        frame = 0
+        while True:
+            a, b = next(mine, None), next(theirs, None)
+            if a is None and b is None:
+                return None
+            if a != b:
+                return frame
+            frame += 1
+
+
+class TimelineReplay:
+    """
+    Rebuilds a recorded scene frame by frame without running its script:
+    sprites and layers are reconstructed from the recorded state, and
+    layer images are decoded once per source file.
+    """
+    def __init__(self, timeline: Timeline, *, load_image: Optional[Callable[[str], Any]] = None) -> None:
+        self.timeline = timeline
+        self._load_image = load_image or cairocffi.ImageSurface.create_from_png
+        self._images: Dict[str, Any] = {}
+        self._applied: List[SpriteState] = []
+
+    def apply(self, state: List[SpriteState], sprites: List[Sprite]) -> None:
+        """Make `sprites` match `state` (sprites are reused by index)."""
+        del sprites[len(state):]
+        applied = self._applied
+        del applied[len(state):]
+        for i, st in enumerate(state):
+            if i == len(sprites):
+                sprites.append(Sprite(name=st["name"]))
+            elif i < len(applied) and applied[i] is st:
+                continue  # unchanged since the last frame
+            if i == len(applied):
+                applied.append(st)
+            else:
+                applied[i] = st
+            sprite = sprites[i]
+            sprite.name = st["name"]
+            sprite.position = Vec2(st["x"], st["y"])
+            sprite.opacity = st["opacity"]
+            sprite.layers = [
+                SpriteLayer(surface=self._image(src), source=src, offset=Vec2(ox, oy), scale=scale, opacity=op)
+                for src, ox, oy, scale, op in st["layers"]
+            ]
+
+    def image_cache_nbytes(self) -> int:
+        return sum(surface_nbytes(s) for s in self._images.values())
+
+    def render(self, spire: Any) -> None:
+        """Composite every recorded frame through `spire` (a PySpire with no animations)."""
+        spire.memory.register_cache("replay_images", self.image_cache_nbytes)
+        for state in self.timeline.states():
+            self.apply(state, spire.sprites)
+            spire.render_frame()
+
+    def _image(self, source: str) -> Any:
+        surface = self._images.get(source)
+        if surface is None:
+            if not source:
+                raise ValueError("recorded layer has no source image; it cannot be replayed")
+            surface = self._images[source] = self._load_image(source)
+        return surface
+
@@ -0,0 +1,182 @@
+# segments.py
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Any, BinaryIO, List, Optional, Sequence
+
+import cairocffi
+
+from .sinks import RAW_DATA_OFFSET, RawFrameSink
+
+# Placeholders: {output} {width} {height} {fps} {pix_fmt}; raw frames arrive on stdin.
+FFMPEG_COMMAND = (
+    "ffmpeg", "-y", "-loglevel", "error",
+    "-f", "rawvideo", "-pix_fmt", "{pix_fmt}", "-s", "{width}x{height}", "-r", "{fps}", "-i", "-",
+    "-c:v", "libx264", "-preset", "medium", "-crf", "18", "-pix_fmt", "yuv420p",
+    "{output}",
+)
+
+
+def raw_pix_fmt(fmt: int) -> str:
+    """ffmpeg's name for cairo's in-memory pixel layout (native-endian 32-bit words)."""
+    alpha = fmt == cairocffi.FORMAT_ARGB32
+    if sys.byteorder == "little":
+        return "bgra" if alpha else "bgr0"
+    return "argb" if alpha else "0rgb"
+
+
+@dataclass
+class Segment:
+    start: int      # first frame number, a multiple of segment_frames
+    frames: int     # frames spooled (count past `start`, including gaps)
+    output: str
+    spool: str
+    returncode: Optional[int] = None
+    error: str = ""
+
+
+class SegmentedEncoderSink:
+    """
+    Splits the frame stream into segments of `segment_frames` frames and
+    encodes the segments in parallel, one encoder subprocess each. It then
+    writes <base_filename>.ffconcat, which joins them without re-encoding:
+
+        ffmpeg -f concat -safe 0 -i <base_filename>.ffconcat -c copy video.mp4
+
+    Segment k holds frames k*segment_frames up to the next boundary, in
+    output_filename() numbering, and is named <base_filename>_seg<start:06>.<extension>.
+    Each segment must begin at its first frame; write() raises ValueError
+    otherwise rather than encode the missing frames over an existing
+    segment. (PySpire.resume() does not support sinks, so a render that
+    stopped is rendered again from frame 0.)
+    Frames are spooled raw (a RawFrameSink file) until their segment is
+    complete. The segment's encoder then reads that file on stdin while
+    rendering moves on. At most `jobs` encoders run at once. When all of
+    them are busy, the render waits at the next segment boundary, so at
+    most jobs + 1 segments are spooled on disk.
+
+    `command` is an argv template (see FFMPEG_COMMAND). Any program that
+    reads raw frames on stdin and writes {output} will do. Frames must
+    arrive in order; gaps inside a segment encode as black. close()
+    waits for every encoder. It raises RuntimeError, naming the failed
+    segments with the tail of each one's log, if any failed. The
+    manifest is written only when all segments succeed. A failed
+    segment keeps its spool and .log file.
+    """
+    def __init__(self, base_filename: str, *, segment_frames: int = 600, command: Sequence[str] = FFMPEG_COMMAND,
+                 extension: str = "mp4", fps: int = 60, jobs: Optional[int] = None) -> None:
+        if segment_frames < 1:
+            raise ValueError(f"segment_frames must be >= 1, got {segment_frames}")
+        self.base_filename = base_filename
+        self.segment_frames = int(segment_frames)
+        self.command = tuple(command)
+        self.extension = extension
+        self.fps = int(fps)
+        self.jobs = max(1, int(jobs or os.cpu_count() or 1))
+        self.segments: List[Segment] = []
+        self._open: Optional[RawFrameSink] = None
+        self._running: List[Any] = []  # (segment, process, stdin, log)
+        self._geometry: Optional[tuple] = None
+
+    def segment_start(self, frame_no: int) -> int:
+        return frame_no - frame_no % self.segment_frames
+
+    def manifest_path(self) -> str:
+        return f"{self.base_filename}.ffconcat"
+
+    def write(self, frame_no: int, surface: Any) -> None:
+        start = self.segment_start(frame_no)
+        current = self.segments[-1] if self._open is not None else None
+        if current is not None and start != current.start:
+            if start < current.start:
+                raise ValueError(f"frame {frame_no} arrived after segment {current.start} was started")
+            self._finish_segment()
+        if self._open is None:
+            if frame_no != start:
+                # leading frames would encode as black over whatever the segment held before
+                raise ValueError(f"frame {frame_no} is inside segment {start}; a segment must start "
+                                 f"at its first frame (render from frame {start})")
+            name = f"{self.base_filename}_seg{start:06}"
+            segment = Segment(start, 0, f"{name}.{self.extension}", f"{name}.raw")
+            self.segments.append(segment)
+            self._open = RawFrameSink(segment.spool, frames=self.segment_frames)
+        self._open.write(frame_no - start, surface)
+        self.segments[-1].frames = self._open.count
+        self._geometry = (surface.get_format(), surface.get_width(), surface.get_height(), surface.get_stride())
+
+    def _finish_segment(self) -> None:
+        self._open.close()
+        self._open = None
+        self._reap()
+        while len(self._running) >= self.jobs:  # backpressure: wait for the oldest encoder
+            self._running[0][1].wait()
+            self._reap()
+        segment = self.segments[-1]
+        fmt, width, height, stride = self._geometry
+        if stride != width * 4:
+            raise ValueError(f"stride {stride} has padding; raw frames must be {width * 4} bytes per row")
+        argv = [arg.format(output=segment.output, width=width, height=height, fps=self.fps,
+                           pix_fmt=raw_pix_fmt(fmt)) for arg in self.command]
+        stdin: BinaryIO = open(segment.spool, "rb")
+        stdin.seek(RAW_DATA_OFFSET)  # the encoder inherits the offset and reads pixels only
+        log = open(f"{segment.output}.log", "wb")
+        try:
+            proc = subprocess.Popen(argv, stdin=stdin, stdout=subprocess.DEVNULL, stderr=log)
+        except OSError as exc:
+            stdin.close()
+            log.close()
+            segment.returncode, segment.error = -1, f"{type(exc).__name__}: {exc}"
+            return
+        self._running.append((segment, proc, stdin, log))
+
+    def _reap(self) -> None:
+        still = []
+        for entry in self._running:
+            segment, proc, stdin, log = entry
+            if proc.poll() is None:
+                still.append(entry)
+                continue
+            stdin.close()
+            log.close()
+            segment.returncode = proc.returncode
+            if proc.returncode == 0:
+                os.remove(segment.spool)
+                os.remove(log.name)
+            else:
+                with open(log.name, "rb") as fh:
+                    tail = fh.read()[-500:].decode("utf-8", "replace").strip()
+                segment.error = f"exit code {proc.returncode}" + (f": {tail}" if tail else "")
+        self._running = still
+
+    def close(self) -> None:
+        if self._open is not None:
+            self._finish_segment()
+        for _, proc, _, _ in self._running:
+            proc.wait()
+        self._reap()
+        failed = [s for s in self.segments if s.returncode != 0]
+        if failed:
+            details = "; ".join(f"segment {s.start}: {s.error}" for s in failed)
+            raise RuntimeError(f"{len(failed)} of {len(self.segments)} segment(s) failed to encode; {details}")
+        if self.segments:
+            self.write_manifest()
+
+    def write_manifest(self) -> str:
+        """ffconcat list of the segments in frame order, relative to the manifest."""
+        path = self.manifest_path()
+        root = os.path.dirname(os.path.abspath(path))
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write("ffconcat version 1.0\n")
+            for s in sorted(self.segments, key=lambda s: s.start):
+                name = os.path.relpath(os.path.abspath(s.output), root).replace("'", "'\\''")
+                fh.write(f"file '{name}'\n")
+        return path
+
+    def report(self) -> str:
+        frames = sum(s.frames for s in self.segments)
+        failed = sum(1 for s in self.segments if s.returncode not in (0, None))
+        return (f"segmented encode: {len(self.segments)} segments of {self.segment_frames}, {frames} frames, "
+                f"{self.jobs} parallel encoders, {failed} failed")
@@ -0,0 +1,246 @@
+# shared_frames.py
+from __future__ import annotations
+
+import gc
+import multiprocessing
+import os
+import queue
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import cairocffi
+
+# seconds between checks that the encoder processes are still alive while waiting on them
+WORKER_POLL_S = 0.5
+
+# (slot, frame_no, format, width, height, stride) -- all a worker needs to read a slot
+SlotInfo = Tuple[int, int, int, int, int, int]
+Encoder = Callable[[int, memoryview, int, int, int, int], None]
+
+
+class FrameRing:
+    """
+    Fixed ring of framebuffer slots in one shared-memory block.
+
+    Slot ownership moves through two queues of small tuples, never pixels.
+    `free` holds the indices of slots nobody is using; the compositor
+    takes one, renders into it and publishes it on `ready`. An encoder
+    process takes it from `ready`, reads it in place and hands the index
+    back to `free`. A ring passed to a child process re-attaches to the
+    same block by name.
+    """
+    def __init__(self, slots: int, slot_nbytes: int, *, ctx: Any = None) -> None:
+        ctx = ctx or multiprocessing.get_context()
+        self.slots = int(slots)
+        self.slot_nbytes = int(slot_nbytes)
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_nbytes)
+        self._owner_pid = os.getpid()  # forked children inherit the object but don't own the block
+        self.free = ctx.Queue()
+        self.ready = ctx.Queue()
+        for slot in range(self.slots):
+            self.free.put(slot)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"slots": self.slots, "slot_nbytes": self.slot_nbytes, "name": self._shm.name,
+                "free": self.free, "ready": self.ready, "owner_pid": self._owner_pid}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.slots, self.slot_nbytes = state["slots"], state["slot_nbytes"]
+        self.free, self.ready = state["free"], state["ready"]
+        # encoder processes are children sharing the parent's resource tracker,
+        # so attaching here doesn't get the block unlinked when they exit
+        self._shm = shared_memory.SharedMemory(name=state["name"])
+        self._owner_pid = state["owner_pid"]
+
+    def view(self, slot: int, nbytes: Optional[int] = None) -> memoryview:
+        """Writable memoryview of a slot (first `nbytes` of it) -- no copy."""
+        start = slot * self.slot_nbytes
+        return self._shm.buf[start: start + (self.slot_nbytes if nbytes is None else nbytes)]
+
+    def acquire(self, timeout: Optional[float] = None) -> int:
+        """Take a free slot, waiting while all of them are in use (backpressure)."""
+        try:
+            return self.free.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"no free frame slot within {timeout}s") from None
+
+    def release(self, slot: int) -> None:
+        self.free.put(slot)
+
+    def close(self) -> None:
+        """Detach from the block; the creating process also removes it."""
+        gc.collect()  # drop surfaces that still export slot views
+        self._shm.close()
+        if os.getpid() == self._owner_pid:
+            self._shm.unlink()
+
+
+def _encode_worker(ring: FrameRing, encode: Encoder, done: Any) -> None:
+    while True:
+        info = ring.ready.get()
+        if info is None:
+            break
+        slot, frame_no, fmt, width, height, stride = info
+        error = None
+        view = ring.view(slot, stride * height)
+        try:
+            encode(frame_no, view, fmt, width, height, stride)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        finally:
+            view.release()
+            ring.release(slot)
+        done.put((frame_no, error))
+    ring.close()
+
+
+class PngEncoder:
+    """Encoder writing <base_filename>_<frame:06>.png straight from a slot."""
+    def __init__(self, base_filename: str) -> None:
+        self.base_filename = base_filename
+
+    def __call__(self, frame_no: int, pixels: memoryview, fmt: int, width: int, height: int, stride: int) -> None:
+        surface = cairocffi.ImageSurface.create_for_data(pixels, fmt, width, height, stride)
+        surface.write_to_png(f"{self.base_filename}_{frame_no:06}.png")
+        surface.finish()
+
+
+class SharedMemorySink:
+    """
+    Frame sink that hands frames to encoder processes through a FrameRing.
+
+    PySpire composites straight into a ring slot (frame_surface), and
+    write() only publishes the slot index, so frames are neither copied
+    nor pickled. `encode(frame_no, pixels, fmt, width, height, stride)`
+    runs in one of `workers` processes; it must be picklable (a
+    module-level function or an instance like PngEncoder). The ring is
+    created on the first frame, sized for it, with `slots` buffers.
+    When all slots are in flight, rendering waits for an encoder.
+    close() waits for every frame and raises RuntimeError if any
+    encode failed. An encoder process that dies takes its frame (and
+    slot) with it, so waiting on the ring raises RuntimeError naming it
+    instead of blocking; close() still stops the other workers and
+    removes the shared-memory block.
+    """
+    def __init__(self, encode: Encoder, *, slots: int = 4, workers: Optional[int] = None,
+                 ctx: Any = None) -> None:
+        self.encode = encode
+        self.slots = int(slots)
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self._ctx = ctx or multiprocessing.get_context()
+        self.ring: Optional[FrameRing] = None
+        self._procs: List[Any] = []
+        self._done: Any = None
+        self._pending: Dict[int, Tuple[int, Any, memoryview]] = {}  # id(surface) -> (slot, surface, view)
+        self.published = 0
+        self.encoded = 0
+        self.errors: List[Tuple[int, str]] = []
+
+    def _start(self, nbytes: int) -> FrameRing:
+        self.ring = FrameRing(self.slots, nbytes, ctx=self._ctx)
+        self._done = self._ctx.Queue()
+        for i in range(self.workers):
+            proc = self._ctx.Process(target=_encode_worker, args=(self.ring, self.encode, self._done),
+                                     name=f"pyspire-encode-{i}", daemon=True)
+            proc.start()
+            self._procs.append(proc)
+        return self.ring
+
+    def frame_surface(self, fmt: int, width: int, height: int) -> cairocffi.ImageSurface:
+        """An image surface over a free slot for the next frame (waits for one if needed)."""
+        stride = cairocffi.ImageSurface.format_stride_for_width(fmt, width)
+        nbytes = stride * height
+        ring = self.ring or self._start(nbytes)
+        if nbytes > ring.slot_nbytes:
+            raise ValueError(f"frame of {nbytes} bytes does not fit a {ring.slot_nbytes}-byte slot")
+        while True:
+            try:
+                slot = ring.acquire(timeout=WORKER_POLL_S)
+                break
+            except TimeoutError:
+                self._check_workers()
+        view = ring.view(slot, nbytes)
+        surface = cairocffi.ImageSurface.create_for_data(view, fmt, width, height, stride)
+        self._pending[id(surface)] = (slot, surface, view)
+        return surface
+
+    def write(self, frame_no: int, surface: Any) -> None:
+        entry = self._pending.pop(id(surface), None)
+        if entry is None or entry[1] is not surface:
+            # not rendered into a slot (e.g. a replacement surface): copy it in
+            target = self.frame_surface(surface.get_format(), surface.get_width(), surface.get_height())
+            surface.flush()
+            self._pending[id(target)][2][:] = surface.get_data()
+            target.mark_dirty()
+            return self.write(frame_no, target)
+        slot, _, view = entry
+        info = (slot, frame_no, surface.get_format(), surface.get_width(), surface.get_height(), surface.get_stride())
+        surface.finish()  # flushes; the slot now belongs to the encoder
+        view.release()
+        self.ring.ready.put(info)
+        self.published += 1
+        self._collect(block=False)
+
+    def discard(self, surface: Any) -> None:
+        """Return the slot behind a frame_surface() that will not be written."""
+        entry = self._pending.pop(id(surface), None)
+        if entry is None:
+            return
+        slot, surface, view = entry
+        surface.finish()
+        view.release()
+        self.ring.release(slot)
+
+    def _check_workers(self) -> None:
+        for proc in self._procs:
+            if not proc.is_alive():
+                raise RuntimeError(f"encoder process {proc.name} (pid {proc.pid}) died "
+                                   f"with exit code {proc.exitcode}")
+
+    def _collect(self, block: bool) -> None:
+        while self.encoded + len(self.errors) < self.published:
+            try:
+                frame_no, error = self._done.get(block=block, timeout=WORKER_POLL_S if block else None)
+            except queue.Empty:
+                if not block:
+                    return
+                self._check_workers()
+                continue
+            if error is None:
+                self.encoded += 1
+            else:
+                self.errors.append((frame_no, error))
+
+    def close(self) -> None:
+        if self.ring is None:
+            return
+        try:
+            self._collect(block=True)
+        finally:
+            self._shutdown()
+        if self.errors:
+            frame_no, error = self.errors[0]
+            raise RuntimeError(f"{len(self.errors)} frame(s) failed to encode; frame {frame_no}: {error}")
+
+    def _shutdown(self) -> None:
+        for _ in self._procs:
+            self.ring.ready.put(None)
+        for proc in self._procs:
+            proc.join(WORKER_POLL_S * 4)
+            if proc.is_alive():  # still encoding after a failure elsewhere
+                proc.terminate()
+                proc.join()
+        for _, surface, view in self._pending.values():  # handed out but never written
+            surface.finish()
+            view.release()
+        self._pending.clear()
+        self.ring.close()
+        self.ring = None
+        self._procs = []
+
+    def report(self) -> str:
+        return f"shared-memory encode: {self.encoded} frames by {self.workers} workers, {len(self.errors)} failed"
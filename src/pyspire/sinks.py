@@ -0,0 +1,370 @@
+# sinks.py
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+import zlib
+from typing import Any, Callable, Dict, Iterator, List, Optional, Protocol, Tuple
+
+import cairocffi
+
+
+class FrameSink(Protocol):
+    """Where PySpire.render_frame sends finished frames (default: PNG files)."""
+    def write(self, frame_no: int, surface: Any) -> None: ...
+    def close(self) -> None: ...
+
+
+class PngSequenceSink:
+    """One PNG per frame: <base_filename>_<frame:06>.png (the classic output)."""
+    def __init__(self, base_filename: str) -> None:
+        self.base_filename = base_filename
+
+    def filename(self, frame_no: int) -> str:
+        return f"{self.base_filename}_{frame_no:06}.png"
+
+    def write(self, frame_no: int, surface: Any) -> None:
+        surface.write_to_png(self.filename(frame_no))
+
+    def write_bytes(self, frame_no: int, png: bytes) -> None:
+        with open(self.filename(frame_no), "wb") as fh:
+            fh.write(png)
+
+    def close(self) -> None:
+        pass
+
+
+# ---- frame archive ------------------------------------------------------------
+#
+# <path>       data file: MAGIC, then one record per frame:
+#              RECORD_HEADER (b"FRAM", frame_no, length, crc32) + PNG bytes
+# <path>.idx   append-only index: one INDEX_ENTRY (frame_no, offset, length,
+#              crc32) per record, written after the record itself
+#
+# A writer crash leaves at most one partial index entry and one partial
+# record at the tail; both are ignored by readers and trimmed when the
+# archive is reopened for appending. Complete records the index never got
+# to (or a lost index) are recovered by scanning record headers.
+
+MAGIC = b"PYSPFA01"
+RECORD_HEADER = struct.Struct("<4sIQI")
+INDEX_ENTRY = struct.Struct("<IQQI")
+RECORD_TAG = b"FRAM"
+
+IndexEntry = Tuple[int, int, int]  # offset, length, crc32
+
+
+def _read_index(path: str) -> Dict[int, IndexEntry]:
+    """Load the .idx entries, then pick up any complete records written after them."""
+    index: Dict[int, IndexEntry] = {}
+    data_size = os.path.getsize(path)
+    try:
+        with open(f"{path}.idx", "rb") as fh:
+            raw = fh.read()
+    except FileNotFoundError:
+        raw = b""
+    usable = len(raw) - len(raw) % INDEX_ENTRY.size
+    end = len(MAGIC)
+    for frame_no, offset, length, crc in INDEX_ENTRY.iter_unpack(raw[:usable]):
+        if offset + length > data_size:
+            break  # entry outlived its record (data not yet on disk)
+        index[frame_no] = (offset, length, crc)
+        end = max(end, offset + length)
+    _scan(path, end, index)
+    return index
+
+
+def _scan(path: str, start: int, index: Dict[int, IndexEntry]) -> None:
+    """Add records found from `start` onward to `index` (stops at the first damaged record)."""
+    with open(path, "rb") as fh:
+        if fh.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a pyspire frame archive")
+        fh.seek(start)
+        while True:
+            head = fh.read(RECORD_HEADER.size)
+            if len(head) < RECORD_HEADER.size:
+                break
+            tag, frame_no, length, crc = RECORD_HEADER.unpack(head)
+            offset = fh.tell()
+            body = fh.read(length)
+            if tag != RECORD_TAG or len(body) < length or zlib.crc32(body) != crc:
+                break
+            index[frame_no] = (offset, length, crc)
+
+
+class FrameArchiveSink:
+    """
+    Appends encoded PNG frames to one large file with a crash-safe offset
+    index, instead of one file per frame. Read back with FrameArchive.
+
+    sync_every: fsync data and index every N frames (0 = leave it to the OS).
+    """
+    def __init__(self, path: str, *, append: bool = False, sync_every: int = 0) -> None:
+        self.path = path
+        self.sync_every = int(sync_every)
+        self._written = 0
+        end = len(MAGIC)
+        entries = 0
+        if append and os.path.exists(path):
+            index = _read_index(path)
+            if index:
+                end = max(off + length for off, length, _ in index.values())
+            entries = len(index)
+            # trim whatever a crashed writer left half-written
+            with open(path, "r+b") as fh:
+                fh.truncate(end)
+            with open(f"{path}.idx", "wb") as fh:
+                for frame_no, (off, length, crc) in sorted(index.items(), key=lambda kv: kv[1][0]):
+                    fh.write(INDEX_ENTRY.pack(frame_no, off, length, crc))
+            self._data = open(path, "ab")
+        else:
+            self._data = open(path, "wb")
+            self._data.write(MAGIC)
+            open(f"{path}.idx", "wb").close()
+        self._index = open(f"{path}.idx", "ab")
+        self._offset = end
+        self.frames = entries
+
+    def write(self, frame_no: int, surface: Any) -> None:
+        self.write_bytes(frame_no, surface.write_to_png())
+
+    def write_bytes(self, frame_no: int, png: bytes) -> None:
+        crc = zlib.crc32(png)
+        self._data.write(RECORD_HEADER.pack(RECORD_TAG, frame_no, len(png), crc))
+        offset = self._offset + RECORD_HEADER.size
+        self._data.write(png)
+        self._data.flush()
+        self._index.write(INDEX_ENTRY.pack(frame_no, offset, len(png), crc))
+        self._index.flush()
+        self._offset = offset + len(png)
+        self.frames += 1
+        self._written += 1
+        if self.sync_every and self._written % self.sync_every == 0:
+            os.fsync(self._data.fileno())
+            os.fsync(self._index.fileno())
+
+    def close(self) -> None:
+        if self._data.closed:
+            return
+        self._data.flush()
+        os.fsync(self._data.fileno())
+        self._data.close()
+        self._index.flush()
+        os.fsync(self._index.fileno())
+        self._index.close()
+
+
+class FrameArchive:
+    """Random-access reader for archives written by FrameArchiveSink."""
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as fh:
+            if fh.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a pyspire frame archive")
+        self._index = _read_index(path)
+        self._fh = open(path, "rb")
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, frame_no: int) -> bool:
+        return frame_no in self._index
+
+    def frames(self) -> List[int]:
+        return sorted(self._index)
+
+    def read(self, frame_no: int) -> bytes:
+        offset, length, crc = self._index[frame_no]
+        self._fh.seek(offset)
+        png = self._fh.read(length)
+        if zlib.crc32(png) != crc:
+            raise ValueError(f"frame {frame_no} in {self.path} is corrupt")
+        return png
+
+    def __iter__(self) -> Iterator[Tuple[int, bytes]]:
+        for frame_no in self.frames():
+            yield frame_no, self.read(frame_no)
+
+    def export(self, base_filename: str, *, renumber: bool = False) -> int:
+        """
+        Write frames back out as <base_filename>_<frame:06>.png (contiguous
+        from 0 when `renumber`). Returns the number of files written.
+        """
+        count = 0
+        for i, (frame_no, png) in enumerate(self):
+            with open(f"{base_filename}_{(i if renumber else frame_no):06}.png", "wb") as fh:
+                fh.write(png)
+            count += 1
+        return count
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def __enter__(self) -> "FrameArchive":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+# ---- raw frame store ----------------------------------------------------------
+#
+# <path>   RAW_HEADER padded to RAW_DATA_OFFSET, then frame n's pixels at
+#          RAW_DATA_OFFSET + n * stride * height, exactly as cairo holds them
+#          (native-endian 32-bit words; `big_endian` records which)
+#
+# `count` is one past the highest frame written; frames never written read
+# as zeros. The data starts on a page boundary so it can be mapped directly.
+
+RAW_MAGIC = b"PYSPRAW1"
+RAW_VERSION = 1
+RAW_HEADER = struct.Struct("<8sHHIIIIB3xQQ")  # magic, version, format, width, height, stride, data offset,
+                                              # big_endian, count, capacity
+RAW_DATA_OFFSET = 4096
+
+
+class RawFrameSink:
+    """
+    Writes uncompressed frames into one memory-mapped file, laid out as
+    frames x height x stride behind a small header. Read back with
+    RawFrameStore, e.g. as a NumPy memmap, with no decoding.
+
+    frames: expected frame count (see count_frames). The file is
+    preallocated for that many frames on the first write. Without it, or
+    past it, the file grows sparsely, doubling each time. close() trims
+    it to the frames written.
+    """
+    def __init__(self, path: str, *, frames: Optional[int] = None) -> None:
+        self.path = path
+        self.expected = frames
+        self.capacity = 0
+        self.count = 0
+        self.frame_nbytes = 0
+        self._geometry: Optional[Tuple[int, int, int, int]] = None
+        self._fh = open(path, "w+b")
+        self._map: Optional[mmap.mmap] = None
+
+    def write(self, frame_no: int, surface: Any) -> None:
+        geometry = (surface.get_format(), surface.get_width(), surface.get_height(), surface.get_stride())
+        if self._geometry is None:
+            self._geometry = geometry
+            self.frame_nbytes = geometry[3] * geometry[2]
+            self._resize(max(self.expected or 0, frame_no + 1), preallocate=self.expected is not None)
+        elif geometry != self._geometry:
+            raise ValueError(f"frame {frame_no} is {geometry[1]}x{geometry[2]} (format {geometry[0]}); "
+                             f"{self.path} holds {self._geometry[1]}x{self._geometry[2]} (format {self._geometry[0]})")
+        if frame_no >= self.capacity:
+            self._resize(max(frame_no + 1, self.capacity * 2), preallocate=False)
+        surface.flush()
+        offset = RAW_DATA_OFFSET + frame_no * self.frame_nbytes
+        self._map[offset: offset + self.frame_nbytes] = surface.get_data()
+        if frame_no >= self.count:
+            self.count = frame_no + 1
+            self._write_header()
+
+    def _resize(self, capacity: int, *, preallocate: bool) -> None:
+        if self._map is not None:
+            self._map.close()
+        size = RAW_DATA_OFFSET + capacity * self.frame_nbytes
+        if preallocate and hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(self._fh.fileno(), 0, size)
+        else:
+            self._fh.truncate(size)  # sparse on most filesystems
+        self.capacity = capacity
+        self._map = mmap.mmap(self._fh.fileno(), size)
+        self._write_header()
+
+    def _header(self) -> bytes:
+        fmt, width, height, stride = self._geometry or (cairocffi.FORMAT_ARGB32, 0, 0, 0)
+        return RAW_HEADER.pack(RAW_MAGIC, RAW_VERSION, fmt, width, height, stride, RAW_DATA_OFFSET,
+                               sys.byteorder == "big", self.count, self.capacity)
+
+    def _write_header(self) -> None:
+        self._map[:RAW_HEADER.size] = self._header()
+
+    def close(self) -> None:
+        if self._fh.closed:
+            return
+        if self._map is not None:
+            self.capacity = self.count
+            self._write_header()
+            self._map.flush()
+            self._map.close()
+            self._fh.truncate(RAW_DATA_OFFSET + self.count * self.frame_nbytes)
+        else:  # no frames: still a valid, empty store
+            self._fh.write(self._header())
+            self._fh.truncate(RAW_DATA_OFFSET)
+        os.fsync(self._fh.fileno())
+        self._fh.close()
+
+
+class RawFrameStore:
+    """Random-access reader for files written by RawFrameSink."""
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._fh = open(path, "rb")
+        head = self._fh.read(RAW_HEADER.size)
+        if len(head) < RAW_HEADER.size or head[:len(RAW_MAGIC)] != RAW_MAGIC:
+            raise ValueError(f"{path} is not a pyspire raw frame store")
+        (_, version, self.format, self.width, self.height, self.stride, self.data_offset,
+         big_endian, self.count, _) = RAW_HEADER.unpack(head)
+        if version != RAW_VERSION:
+            raise ValueError(f"{path} is raw frame store version {version}, expected {RAW_VERSION}")
+        self.big_endian = bool(big_endian)
+        self.frame_nbytes = self.stride * self.height
+
+    def __len__(self) -> int:
+        return self.count
+
+    def read(self, frame_no: int) -> bytes:
+        """Frame `frame_no`'s pixel bytes (stride * height, cairo layout)."""
+        if not 0 <= frame_no < self.count:
+            raise IndexError(f"frame {frame_no} is not in {self.path} ({self.count} frames)")
+        self._fh.seek(self.data_offset + frame_no * self.frame_nbytes)
+        return self._fh.read(self.frame_nbytes)
+
+    def surface(self, frame_no: int) -> Any:
+        """Frame `frame_no` as a new cairo image surface."""
+        return cairocffi.ImageSurface.create_for_data(bytearray(self.read(frame_no)), self.format,
+                                                      self.width, self.height, self.stride)
+
+    def array(self) -> Any:
+        """
+        Read-only (frames, height, width, 4) uint8 view of the whole file
+        through numpy.memmap: B, G, R, A channels, premultiplied, no copy.
+        Requires NumPy (`pip install pyspire[numpy]`).
+        """
+        import numpy as np
+
+        if self.count == 0:  # numpy cannot map zero bytes
+            return np.zeros((0, self.height, self.width, 4), dtype=np.uint8)
+        mapped = np.memmap(self.path, dtype=np.uint8, mode="r", offset=self.data_offset,
+                           shape=(self.count * self.frame_nbytes,))
+        px = np.lib.stride_tricks.as_strided(mapped, shape=(self.count, self.height, self.width, 4),
+                                             strides=(self.frame_nbytes, self.stride, 4, 1), writeable=False)
+        return px[..., ::-1] if self.big_endian else px
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def __enter__(self) -> "RawFrameStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def count_frames(build: Callable[[], Any], *, limit: int = 216_000) -> int:
+    """
+    Dry run: build a scene and simulate it to the end without compositing.
+    Returns its frame count, e.g. to size a RawFrameSink. Raises
+    RuntimeError if the scene has not set `done` after `limit` frames
+    (default: one hour at 60 fps), since it may never end.
+    """
+    spire = build()
+    frames = spire.fast_forward(limit)
+    if not spire.done:
+        raise RuntimeError(f"scene did not finish within {limit} frames")
+    return frames
@@ -1,13 +1,18 @@
 # sprite.py
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
 import cairocffi  # pycairo / cairocffi (whichever you’re using)
 
 from .primitives import Vec2, Size, Rect, lerp
 from .sprite_layer import SpriteLayer
 from .event_bus import EventBus
+from .assets import load_png
+
+if TYPE_CHECKING:
+    from .outputs import ScaledAssets
+    from .scene_graph import Group
 
 @dataclass(slots=True)
 class Sprite:
@@ -15,6 +20,9 @@ class Sprite:
     position: Vec2 = Vec2(0, 0)                    # replaces x,y
     layers: List[SpriteLayer] = field(default_factory=list)
     opacity: float = 1.0
+    z: float = 0.0                                 # paint order: higher draws later (added to the parents' z)
+    # set by Group.add; position, opacity and z are then relative to the group
+    parent: Optional["Group"] = field(default=None, repr=False, compare=False)
 
     # --- ergonomic compat so existing code can still use .x / .y ---
     @property
@@ -42,10 +50,15 @@ class Sprite:
     def get_height(self) -> float:
         return self.size.height
 
+    @property
+    def world_position(self) -> Vec2:
+        """Position in the frame: `position` plus the parent group's world offset."""
+        return self.position if self.parent is None else self.parent.world_position + self.position
+
     @property
     def bounds(self) -> Rect:
         """World-space rect of the sprite."""
-        return Rect(self.position, self.size)
+        return Rect(self.world_position, self.size)
 
     # --- movement/placement helpers (Vec2/Rect make these trivial) ---
     def move_by(self, delta: Vec2) -> None:
@@ -69,8 +82,8 @@ class Sprite:
         Load an image as a new layer and position it in sprite-local space using an anchor.
         Sprite-local = (0,0) at sprite's top-left; final draw uses sprite.position + layer.offset.
         """
-        surface = cairocffi.ImageSurface.create_from_png(filename)
-        layer = SpriteLayer(surface=surface)
+        surface = load_png(filename)
+        layer = SpriteLayer(surface=surface, source=filename)
 
         # Local rect for the sprite (origin at 0,0 in local space)
         local_sprite_rect = Rect.from_xywh(0, 0, max(self.size.w, layer.get_width()), max(self.size.h, layer.get_height()))
@@ -82,15 +95,20 @@ class Sprite:
         return layer
 
     def replace_layer_image(self, layer_no: int, filename: str):
-        surface = cairocffi.ImageSurface.create_from_png(filename)
+        surface = load_png(filename)
         self.layers[layer_no].surface = surface
+        self.layers[layer_no].source = filename
 
     # --- rendering example (using the affordances for clean math) ---
-    def render(self, ctx: cairo.Context) -> None:
+    def render(self, ctx: cairo.Context, assets: Optional["ScaledAssets"] = None) -> None:
+        """Draw the layers; with `assets`, draw their pre-scaled copies at scaled positions."""
         for layer in self.layers:
             # final position = sprite.position (world) + layer.offset (sprite-local)
             px, py = tuple(self.position + layer.offset)
             ctx.save()
-            ctx.set_source_surface(layer.surface, px, py)
+            if assets is None:
+                ctx.set_source_surface(layer.surface, px, py)
+            else:
+                ctx.set_source_surface(assets.get(layer.surface), px * assets.scale, py * assets.scale)
             ctx.paint_with_alpha(self.opacity * layer.opacity)
             ctx.restore()
@@ -21,12 +21,15 @@ class SpriteLayer:
     - `size` comes from the underlying surface (optionally scaled).
     - `get_width()` / `get_height()` return **extents** (offset + size), matching
       your earlier usage where sprite size = max over layer extents.
+    - `source` names the image file behind `surface`, so recordings can
+      rebuild the layer without the script that made it.
     """
     surface: SurfaceLike
     name: str = ""
     offset: Vec2 = Vec2(0, 0)
     scale: float = 1.0  # uniform scale; extend to Vec2 if you want non-uniform
     opacity: float = 1.0
+    source: str = ""    # file the surface was loaded from ("" if built in code)
 
     # --- Back-compat sugar for code that still uses .x / .y ---
     @property
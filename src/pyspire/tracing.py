@@ -0,0 +1,127 @@
+# tracing.py
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+# (phase, name, category, start_s, duration_s, thread ident, id, args)
+_Record = Tuple[str, str, str, float, float, int, int, Optional[Dict[str, Any]]]
+
+
+class Tracer:
+    """
+    Low-overhead span collector that exports Chrome / Perfetto trace JSON.
+
+    Records go into a ring buffer of `capacity` entries (oldest dropped
+    first), so a tracer can stay on for a full-length render. Spans:
+      - frame stages (category "frame"), recorded by PySpire.render_frame
+      - animation lifetimes (category "animation", async tracks per animation)
+      - EventBus handler calls (category "handler")
+      - anything else via span(), from any thread (e.g. encode jobs)
+
+    Load the file from save() in chrome://tracing or ui.perfetto.dev.
+    """
+    def __init__(self, *, capacity: int = 1_000_000) -> None:
+        self.capacity = int(capacity)
+        self._records: Deque[_Record] = deque(maxlen=self.capacity)
+        self._origin = perf_counter()
+        self._threads: Dict[int, str] = {}
+        self._open: Dict[int, float] = {}
+        self.frame_no = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    # ---- generic spans
+
+    def complete(self, name: str, cat: str, start: float, end: float,
+                 args: Optional[Dict[str, Any]] = None) -> None:
+        """Record a finished span; `start`/`end` are perf_counter() seconds."""
+        self._records.append(("X", name, cat, start, end - start, self._tid(), 0, args))
+
+    @contextmanager
+    def span(self, name: str, cat: str = "task", **args: Any) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.complete(name, cat, start, perf_counter(), args or None)
+
+    def instant(self, name: str, cat: str = "event", **args: Any) -> None:
+        self._records.append(("i", name, cat, perf_counter(), 0.0, self._tid(), 0, args or None))
+
+    # ---- render hooks
+
+    def frame(self, frame_no: int, stages: List[Tuple[str, float, float]]) -> None:
+        """One frame's stage spans as (stage, start, end), plus an enclosing frame span."""
+        self.complete(f"frame {frame_no}", "frame", stages[0][1], stages[-1][2])
+        for stage, start, end in stages:
+            self.complete(stage, "frame", start, end)
+        self.frame_no = frame_no + 1
+
+    def animation_begin(self, anim: Any) -> None:
+        now = perf_counter()
+        self._open[id(anim)] = now
+        self._records.append(("b", anim.name, "animation", now, 0.0, 0, id(anim),
+                              {"type": type(anim).__name__, "frame": self.frame_no}))
+
+    def animation_end(self, anim: Any) -> None:
+        if self._open.pop(id(anim), None) is None:
+            return
+        self._records.append(("e", anim.name, "animation", perf_counter(), 0.0, 0, id(anim),
+                              {"frame": self.frame_no}))
+
+    def handler_runner(self, source: str) -> Callable[[str, Callable[..., Any], Dict[str, Any]], None]:
+        """Return an EventBus `trace` callable that times each handler call."""
+        def run(event: str, handler: Callable[..., Any], payload: Dict[str, Any]) -> None:
+            start = perf_counter()
+            try:
+                handler(**payload)
+            finally:
+                self.complete(f"{event} -> {_handler_name(handler)}", "handler", start, perf_counter(),
+                              {"bus": source, "frame": self.frame_no})
+        return run
+
+    def _tid(self) -> int:
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        return tid
+
+    # ---- export
+
+    def events(self) -> List[Dict[str, Any]]:
+        pid = os.getpid()
+        out: List[Dict[str, Any]] = [
+            {"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in self._threads.items()
+        ]
+        for ph, name, cat, start, dur, tid, ident, args in list(self._records):
+            ev: Dict[str, Any] = {"ph": ph, "name": name, "cat": cat, "pid": pid, "tid": tid,
+                                  "ts": (start - self._origin) * 1e6}
+            if ph == "X":
+                ev["dur"] = dur * 1e6
+            elif ph == "i":
+                ev["s"] = "t"
+            else:
+                ev["id"] = hex(ident)
+            if args:
+                ev["args"] = args
+            out.append(ev)
+        return out
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"traceEvents": self.events(), "displayTimeUnit": "ms"}, fh, default=repr)
+
+
+def _handler_name(handler: Callable[..., Any]) -> str:
+    target = getattr(handler, "target", None)  # weak/owned subscription wrapper
+    if callable(target):
+        handler = target() or handler
+    return getattr(handler, "__qualname__", None) or repr(handler)
@@ -0,0 +1,122 @@
+# yuv.py
+"""
+Planar YUV 4:2:0 conversion of composited frames, and a Y4M stream writer.
+
+Requires NumPy (`pip install pyspire[numpy]`).
+"""
+from __future__ import annotations
+
+from typing import Any, BinaryIO, Dict, List, Tuple, Union
+
+import numpy as np
+
+from .arrays import surface_array
+
+# (Kr, Kb) luma coefficients per matrix
+MATRICES: Dict[str, Tuple[float, float]] = {
+    "bt601": (0.299, 0.114),
+    "bt709": (0.2126, 0.0722),
+}
+
+Planes = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def bgra_to_yuv420(bgra: np.ndarray, *, matrix: str = "bt709", full_range: bool = False) -> Planes:
+    """
+    Convert (h, w, 4) B,G,R,A pixels to Y, U, V uint8 planes.
+
+    Alpha is ignored: premultiplied input therefore comes out composited
+    over black, which is exact for opaque frames. Chroma is the 2x2 block
+    average (edges replicated for odd sizes), so U and V are
+    ceil(h/2) x ceil(w/2). Limited range maps Y to 16..235 and chroma to
+    16..240; full range uses 0..255.
+    """
+    kr, kb = MATRICES[matrix]
+    kg = 1.0 - kr - kb
+    h, w = bgra.shape[:2]
+    b = bgra[..., 0].astype(np.float32)
+    g = bgra[..., 1].astype(np.float32)
+    r = bgra[..., 2].astype(np.float32)
+
+    y = kr * r + kg * g + kb * b
+
+    # the transform is linear, so averaging RGB first equals averaging Cb/Cr
+    if h % 2 or w % 2:
+        pad = ((0, h % 2), (0, w % 2))
+        r, g, b = (np.pad(c, pad, mode="edge") for c in (r, g, b))
+    h2, w2 = r.shape[0] // 2, r.shape[1] // 2
+    rs, gs, bs = (c.reshape(h2, 2, w2, 2).mean(axis=(1, 3)) for c in (r, g, b))
+    ys = kr * rs + kg * gs + kb * bs
+    cb = (bs - ys) / (2.0 * (1.0 - kb))
+    cr = (rs - ys) / (2.0 * (1.0 - kr))
+
+    if full_range:
+        planes = (y, cb + 128.0, cr + 128.0)
+    else:
+        planes = (16.0 + y * (219.0 / 255.0), 128.0 + cb * (224.0 / 255.0), 128.0 + cr * (224.0 / 255.0))
+    return tuple(np.clip(np.rint(p), 0, 255).astype(np.uint8) for p in planes)  # type: ignore[return-value]
+
+
+def surface_to_yuv420(surface: Any, *, matrix: str = "bt709", full_range: bool = False) -> Planes:
+    return bgra_to_yuv420(surface_array(surface, readonly=True), matrix=matrix, full_range=full_range)
+
+
+class Y4MWriter:
+    """
+    YUV4MPEG2 (4:2:0) stream writer; also usable as a PySpire frame sink.
+
+    `target` is a path or a binary file object (e.g. an encoder's stdin).
+    Frames must be written in order; frame numbers are not stored.
+    """
+    def __init__(self, target: Union[str, BinaryIO], width: int, height: int, *, fps: int = 60,
+                 matrix: str = "bt709", full_range: bool = False) -> None:
+        if matrix not in MATRICES:
+            raise ValueError(f"unknown matrix {matrix!r}; expected one of {sorted(MATRICES)}")
+        self.width, self.height = int(width), int(height)
+        self.matrix, self.full_range = matrix, full_range
+        self._owns = isinstance(target, str)
+        self._fh: BinaryIO = open(target, "wb") if isinstance(target, str) else target
+        color_range = "FULL" if full_range else "LIMITED"
+        self._fh.write(
+            f"YUV4MPEG2 W{self.width} H{self.height} F{int(fps)}:1 Ip A1:1 C420jpeg "
+            f"XCOLORRANGE={color_range}\n".encode("ascii")
+        )
+        self.frames = 0
+
+    def write_planes(self, y: np.ndarray, u: np.ndarray, v: np.ndarray) -> None:
+        if y.shape != (self.height, self.width):
+            raise ValueError(f"frame is {y.shape[1]}x{y.shape[0]}, stream is {self.width}x{self.height}")
+        self._fh.write(b"FRAME\n")
+        for plane in (y, u, v):
+            self._fh.write(np.ascontiguousarray(plane).data)
+        self.frames += 1
+
+    def write(self, frame_no: int, surface: Any) -> None:
+        self.write_planes(*surface_to_yuv420(surface, matrix=self.matrix, full_range=self.full_range))
+
+    def close(self) -> None:
+        self._fh.flush()
+        if self._owns:
+            self._fh.close()
+
+
+def read_y4m(data: bytes) -> Tuple[Dict[str, str], List[Planes]]:
+    """Parse a Y4M byte string into (header fields, [(Y, U, V), ...]); for tests and tools."""
+    header, _, rest = data.partition(b"\n")
+    fields: Dict[str, str] = {}
+    for token in header.decode("ascii").split()[1:]:
+        fields[token[0]] = token[1:]
+    w, h = int(fields["W"]), int(fields["H"])
+    cw, ch = (w + 1) // 2, (h + 1) // 2
+    frame_size = w * h + 2 * cw * ch
+    frames: List[Planes] = []
+    pos = 0
+    while pos < len(rest):
+        marker_end = rest.index(b"\n", pos)
+        pos = marker_end + 1
+        buf = np.frombuffer(rest, dtype=np.uint8, count=frame_size, offset=pos)
+        frames.append((buf[: w * h].reshape(h, w),
+                       buf[w * h: w * h + cw * ch].reshape(ch, cw),
+                       buf[w * h + cw * ch:].reshape(ch, cw)))
+        pos += frame_size
+    return fields, frames
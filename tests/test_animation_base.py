@@ -109,3 +109,23 @@ def test_completed_emits_once_and_further_steps_noop():
     anim.step()
     anim.step()
     assert tgt.x == x_before
+
+def test_lifecycle_event_names_are_built_at_construction():
+    anim = NudgeX("walk", DummyTarget(), count=1)
+    assert (anim.event_start, anim.event_paused, anim.event_resume, anim.event_completed) == (
+        "walk_start", "walk_paused", "walk_resume", "walk_completed"
+    )
+
+def test_completion_releases_generator_and_handlers():
+    tgt = DummyTarget()
+    anim = NudgeX("walk", tgt, count=1)
+    completed: List[bool] = []
+    anim.bus.on("walk_completed", lambda: completed.append(True))
+    anim.bus.on("marker", lambda: None)
+
+    anim.step()
+    anim.step()
+
+    assert completed == [True]
+    assert anim._gen is None
+    assert anim.bus._subs == {}
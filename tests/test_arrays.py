@@ -0,0 +1,112 @@
+# tests/test_arrays.py
+from __future__ import annotations
+
+import gc
+import sys
+import weakref
+from typing import Any, List
+
+import cairocffi
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pyspire import OutputProfile, PySpire, Size, SpriteLayer
+from pyspire.arrays import layer_array, surface_array
+
+
+class FakeSurface:
+    """Native-endian ARGB32 buffer with row padding, like cairo hands out."""
+    def __init__(self, w: int, h: int, stride: int, fmt: int = cairocffi.FORMAT_ARGB32) -> None:
+        self.w, self.h, self.stride, self.fmt = w, h, stride, fmt
+        self.data = bytearray(stride * h)
+        self.flushed = 0
+    def flush(self) -> None: self.flushed += 1
+    def get_format(self) -> int: return self.fmt
+    def get_width(self) -> int: return self.w
+    def get_height(self) -> int: return self.h
+    def get_stride(self) -> int: return self.stride
+    def get_data(self): return memoryview(self.data)
+    def pixel(self, x: int, y: int) -> int:
+        off = y * self.stride + x * 4
+        return int.from_bytes(self.data[off: off + 4], sys.byteorder)
+    def set_pixel(self, x: int, y: int, argb: int) -> None:
+        off = y * self.stride + x * 4
+        self.data[off: off + 4] = argb.to_bytes(4, sys.byteorder)
+
+
+def test_view_honours_stride_and_channel_order():
+    s = FakeSurface(3, 2, stride=16)
+    s.set_pixel(2, 1, 0xFF102030)
+    px = surface_array(s)
+    assert px.shape == (2, 3, 4) and px.dtype == np.uint8
+    assert abs(px.strides[0]) == 16 and not px.flags.c_contiguous
+    assert tuple(px[1, 2]) == (0x30, 0x20, 0x10, 0xFF)
+    assert s.flushed == 1
+
+
+def test_writes_go_straight_to_the_surface():
+    s = FakeSurface(4, 4, stride=16)
+    px = surface_array(s)
+    assert np.shares_memory(px, np.frombuffer(s.data, dtype=np.uint8))
+    px[3, 0] = (0x01, 0x02, 0x03, 0xFF)
+    assert s.pixel(0, 3) == 0xFF030201
+
+
+def test_view_keeps_surface_alive():
+    s = FakeSurface(2, 2, stride=8)
+    ref = weakref.ref(s)
+    row = surface_array(s)[1]
+    del s
+    gc.collect()
+    assert ref() is not None
+    del row
+    gc.collect()
+    assert ref() is None
+
+
+def test_readonly_and_format_checks():
+    px = surface_array(FakeSurface(2, 2, stride=8, fmt=cairocffi.FORMAT_RGB24), readonly=True)
+    with pytest.raises(ValueError):
+        px[0, 0, 0] = 1
+    with pytest.raises(ValueError):
+        surface_array(FakeSurface(2, 2, stride=4, fmt=cairocffi.FORMAT_A8))
+
+
+def test_layer_array_views_the_layer_surface():
+    surface = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, 5, 3)
+    px = layer_array(SpriteLayer(surface=surface))
+    assert px.shape == (3, 5, 4)
+    assert np.shares_memory(px, surface_array(surface))
+
+
+class ListSink:
+    def __init__(self) -> None:
+        self.seen: List[Any] = []
+    def write(self, frame_no: int, surface: Any) -> None:
+        self.seen.append(surface_array(surface)[0, 0].tolist())
+    def close(self) -> None:
+        pass
+
+
+def test_frame_hooks_edit_pixels_before_write():
+    calls: List[Any] = []
+
+    def watermark(frame_no: int, surface: Any, profile: Any) -> None:
+        calls.append((frame_no, None if profile is None else profile.name))
+        surface_array(surface)[0, 0] = (frame_no, 0, 0, 255)
+
+    sink = ListSink()
+    spire = PySpire(size=Size(8, 8), base_filename="unused", sink=sink, frame_hooks=[watermark])
+    spire.render_frame()
+    spire.render_frame()
+    assert calls == [(0, None), (1, None)]
+    assert sink.seen == [[0, 0, 0, 255], [1, 0, 0, 255]]
+
+    calls.clear()
+    thumb = ListSink()
+    spire = PySpire(size=Size(8, 8), base_filename="unused", frame_hooks=[watermark],
+                    outputs=[OutputProfile("full", sink=ListSink()), OutputProfile("thumb", scale=0.5, sink=thumb)])
+    spire.render_frame()
+    assert calls == [(0, "full"), (0, "thumb")]
+    assert thumb.seen == [[0, 0, 0, 255]]
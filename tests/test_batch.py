@@ -0,0 +1,115 @@
+# tests/test_batch.py
+from __future__ import annotations
+
+import os
+import textwrap
+
+import cairocffi
+
+from pyspire import AssetCache, BatchRunner
+from pyspire.assets import asset_scope, load_png
+from pyspire.batch import defer_render
+
+SCENE = """
+from pyspire import Animation, PySpire, Size
+
+class Walk(Animation):
+    def _updates(self):
+        for i in range({frames}):
+            yield {{"x": i + 1}}
+
+spire = PySpire(size=Size(8, 8), base_filename="{base}")
+box = spire.add_sprite("box")
+box.add_image("card.png")
+walk = Walk("walk", box)
+walk.bus.on("walk_completed", lambda: setattr(spire, "done", True))
+spire.add_animation(walk)
+spire.render_until_done()
+"""
+
+
+def write_png(path) -> None:
+    cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, 2, 2).write_to_png(str(path))
+
+
+def write_scene(directory, name: str, *, frames: int = 5, base: str = "out/frame", body: str = SCENE) -> str:
+    directory.mkdir(exist_ok=True)
+    write_png(directory / "card.png")
+    path = directory / f"{name}.py"
+    path.write_text(textwrap.dedent(body.format(frames=frames, base=base)))
+    return str(path)
+
+
+def pngs(directory) -> list:
+    return sorted(os.listdir(directory))
+
+
+def test_asset_cache_shares_decoded_images(tmp_path):
+    write_png(tmp_path / "a.png")
+    cache = AssetCache()
+    with asset_scope(cache, str(tmp_path)):
+        first, second = load_png("a.png"), load_png("a.png")
+    assert first is second
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+    assert cache.nbytes() > 0
+
+
+def test_asset_cache_reloads_changed_files(tmp_path):
+    path = tmp_path / "a.png"
+    write_png(path)
+    cache = AssetCache()
+    first = cache.get(str(path))
+    os.utime(path, ns=(0, 0))
+    assert cache.get(str(path)) is not first
+
+
+def test_defer_render_outside_batch_is_a_no_op():
+    assert defer_render(object()) is False
+
+
+def test_renders_scenes_and_shares_assets(tmp_path):
+    scripts = [write_scene(tmp_path / "a", "one", frames=4, base="out/one"),
+               write_scene(tmp_path / "a", "two", frames=7, base="out/two")]
+    runner = BatchRunner(scripts, jobs=2, encoders=2)
+    results = runner.run(quiet=True)
+
+    assert [(r.name, r.frames, r.ok) for r in results] == [("one", 5, True), ("two", 8, True)]
+    assert pngs(tmp_path / "a" / "out") == sorted(
+        [f"one_{n:06}.png" for n in range(5)] + [f"two_{n:06}.png" for n in range(8)])
+    assert (runner.assets.misses, runner.assets.hits) == (1, 1)
+    summary = runner.summary()
+    assert "one" in summary and "2 scenes, 13 frames" in summary
+
+
+def test_colliding_outputs_get_scene_names(tmp_path):
+    scripts = [write_scene(tmp_path, "one", frames=1), write_scene(tmp_path, "two", frames=1)]
+    BatchRunner(scripts, jobs=2).run(quiet=True)
+    assert pngs(tmp_path / "out") == [f"frame_{s}_{n:06}.png" for s in ("one", "two") for n in range(2)]
+
+
+def test_failures_are_reported_per_scene(tmp_path):
+    broken = write_scene(tmp_path, "broken", body="raise RuntimeError('bad script')\n")
+    idle = write_scene(tmp_path, "idle", body="x = 1\n")
+    good = write_scene(tmp_path, "good", frames=2)
+    runner = BatchRunner([broken, idle, good], jobs=1)
+    results = runner.run(quiet=True)
+
+    assert [r.ok for r in results] == [False, False, True]
+    assert "bad script" in results[0].error
+    assert "render_until_done" in results[1].error
+    assert "FAILED" in runner.summary()
+
+
+def test_shared_memory_budget(tmp_path):
+    scripts = [write_scene(tmp_path / "a", "one", base="out/one"), write_scene(tmp_path / "a", "two", base="out/two")]
+    runner = BatchRunner(scripts, jobs=2, memory_budget=8 * 8 * 4 * 2)
+    runner.run(quiet=True)
+    assert 0 < runner.budget.peak <= 8 * 8 * 4 * 2
+
+
+def test_cli_exit_status(tmp_path, capsys):
+    from pyspire.batch import main
+
+    assert main([write_scene(tmp_path, "good", frames=1)]) == 0
+    assert main([write_scene(tmp_path, "bad", body="1 / 0\n")]) == 1
+    assert "ZeroDivisionError" in capsys.readouterr().out
@@ -0,0 +1,100 @@
+# tests/test_checkpoint.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, List
+
+import pytest
+
+from pyspire import Animation, FrameArchiveSink, OutputProfile, PySpire, Size
+from pyspire.checkpoint import PNG_SIGNATURE, PNG_TRAILER, Checkpoint, is_complete_png
+
+
+@dataclass
+class Box:
+    x: int = 0
+
+
+class Walk(Animation):
+    def __init__(self, target: Any, count: int) -> None:
+        super().__init__("walk", target)
+        self.count = count
+
+    def _updates(self):
+        for i in range(self.count):
+            yield {"x": i + 1}
+
+
+def make_scene(tmp_path, count: int = 10, **kw: Any) -> PySpire:
+    spire = PySpire(size=Size(8, 8), base_filename=str(tmp_path / "frame"), checkpoint_every=4, **kw)
+    box = spire.add_sprite("box")
+    walk = Walk(box, count)
+    walk.queue_event_in(8 / 60, "midway")
+    walk.bus.on("walk_completed", lambda: setattr(spire, "done", True))
+    spire.add_animation(walk)
+    return spire
+
+
+def fake_frames(spire: PySpire, frames: int) -> None:
+    """Write complete PNG-shaped files and simulate, as a render that died would have."""
+    for _ in range(frames):
+        spire.step_animations()
+        with open(spire.output_filename(), "wb") as fh:
+            fh.write(PNG_SIGNATURE + b"pixels" + PNG_TRAILER)
+        spire.frame_no += 1
+        if spire.frame_no % spire.checkpoint_every == 0:
+            Checkpoint.capture(spire).save(spire.checkpoint_path())
+
+
+def test_complete_png_detection(tmp_path):
+    good, cut = tmp_path / "good.png", tmp_path / "cut.png"
+    good.write_bytes(PNG_SIGNATURE + b"data" + PNG_TRAILER)
+    cut.write_bytes(PNG_SIGNATURE + b"da")
+    assert is_complete_png(str(good))
+    assert not is_complete_png(str(cut))
+    assert not is_complete_png(str(tmp_path / "missing.png"))
+
+
+def test_checkpoint_round_trips(tmp_path):
+    spire = make_scene(tmp_path)
+    fake_frames(spire, 4)
+    loaded = Checkpoint.load(spire.checkpoint_path())
+    assert loaded == Checkpoint.capture(spire)
+    assert loaded.frame_no == 4
+    assert loaded.animations[0]["scheduled"] == {"8": ["midway"]}
+
+
+def test_resume_fast_forwards_to_latest_checkpoint(tmp_path):
+    fake_frames(make_scene(tmp_path), 9)  # died after frame 8; checkpoint at 8
+
+    fresh = make_scene(tmp_path)
+    assert fresh.resume() == 8
+    assert fresh.sprites[0].x == 8
+
+
+def test_resume_stops_at_first_damaged_frame(tmp_path):
+    fake_frames(make_scene(tmp_path), 8)
+    (tmp_path / "frame_000005.png").write_bytes(PNG_SIGNATURE)  # truncated write
+
+    fresh = make_scene(tmp_path)
+    assert fresh.resume() == 5
+
+
+def test_resume_rejects_changed_script(tmp_path):
+    fake_frames(make_scene(tmp_path), 4)
+    changed = make_scene(tmp_path)
+    changed.sprites[0].opacity = 0.5
+    with pytest.raises(RuntimeError, match="scene"):
+        changed.resume()
+
+
+def test_resume_without_checkpoint_starts_at_zero(tmp_path):
+    assert make_scene(tmp_path).resume() == 0
+
+
+def test_resume_needs_the_default_png_output(tmp_path):
+    for kw in ({"sink": FrameArchiveSink(str(tmp_path / "frames.pfa"))}, {"outputs": [OutputProfile("full")]}):
+        spire = make_scene(tmp_path, **kw)
+        with pytest.raises(ValueError, match="sink or outputs"):
+            spire.render_until_done(resume=True, quiet=True)
+        assert spire.frame_no == 0
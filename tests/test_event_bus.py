@@ -1,7 +1,7 @@
 # test_event_bus.py
 import pytest
 from typing import List, Tuple, Any
-from pyspire import EventBus
+from pyspire import EventBus, EventQueue
 
 class TestEventBus:
     def test_on_and_emit_kwargs_only(self):
@@ -150,3 +150,195 @@ class TestEventBus:
         bus = EventBus()
         # Should not raise
         bus.emit("nobody")
+
+    def test_subscriptions_are_immutable_snapshots(self):
+        bus = EventBus()
+        h1 = lambda: None
+        h2 = lambda: None
+
+        bus.on("snap", h1)
+        before = bus._subs["snap"]
+        bus.on("snap", h2)
+
+        # on/off rebuild the tuple; a snapshot taken earlier never changes
+        assert before == (h1,)
+        assert bus._subs["snap"] == (h1, h2)
+        bus.off("snap", h1)
+        assert bus._subs["snap"] == (h2,)
+
+    def test_off_removes_only_first_matching_registration(self):
+        bus = EventBus()
+        calls = {"n": 0}
+
+        def h():
+            calls["n"] += 1
+
+        bus.on("dup", h)
+        bus.on("dup", h)
+        bus.off("dup", h)
+        bus.emit("dup")
+
+        assert calls["n"] == 1
+
+    def test_emit_rejects_positional_args_without_handlers(self):
+        bus = EventBus()
+        with pytest.raises(TypeError):
+            bus.emit("nobody", 1, 2)
+        bus.emit("nobody", {"k": 1})  # a payload dict is still fine
+
+    def test_emit_payload_dict_fans_out_to_many_handlers(self):
+        bus = EventBus()
+        seen: List[int] = []
+        for i in range(2000):
+            bus.on("wide", lambda i=i, **kw: seen.append(i + kw["k"]))
+
+        bus.emit("wide", {"k": 1})
+
+        assert seen == list(range(1, 2001))
+
+
+class TestEventQueue:
+    def test_queued_emit_defers_until_drain(self):
+        queue = EventQueue()
+        bus = EventBus(queue=queue)
+        seen: List[int] = []
+        bus.on("tick", lambda *, n: seen.append(n))
+
+        bus.emit("tick", n=1)
+        bus.emit("tick", n=2)
+        assert seen == []
+        assert len(queue) == 2
+
+        assert queue.drain() == 2
+        assert seen == [1, 2]
+        assert len(queue) == 0
+
+    def test_drain_preserves_order_across_buses(self):
+        queue = EventQueue()
+        a, b = EventBus(queue=queue), EventBus(queue=queue)
+        order: List[str] = []
+        a.on("e", lambda: order.append("a"))
+        b.on("e", lambda: order.append("b"))
+
+        b.emit("e")
+        a.emit("e")
+        b.emit("e")
+        queue.drain()
+
+        assert order == ["b", "a", "b"]
+
+    def test_coalesce_keeps_first_slot_and_last_payload(self):
+        queue = EventQueue(coalesce=["moved"])
+        bus = EventBus(queue=queue)
+        seen: List[Tuple[str, Any]] = []
+        bus.on("moved", lambda *, x: seen.append(("moved", x)))
+        bus.on("other", lambda: seen.append(("other", None)))
+
+        bus.emit("moved", x=1)
+        bus.emit("other")
+        bus.emit("moved", x=2)
+        bus.emit("moved", x=3)
+        queue.drain()
+
+        assert seen == [("moved", 3), ("other", None)]
+
+    def test_events_emitted_while_draining_run_in_next_batch(self):
+        queue = EventQueue()
+        bus = EventBus(queue=queue)
+        order: List[str] = []
+
+        def first():
+            order.append("first")
+            bus.emit("second")
+
+        bus.on("first", first)
+        bus.on("second", lambda: order.append("second"))
+        bus.on("third", lambda: order.append("third"))
+
+        bus.emit("first")
+        bus.emit("third")
+        assert queue.drain() == 3
+        assert order == ["first", "third", "second"]
+
+    def test_runaway_cascade_raises(self):
+        queue = EventQueue(max_rounds=5)
+        bus = EventBus(queue=queue)
+        bus.on("loop", lambda: bus.emit("loop"))
+        bus.emit("loop")
+        with pytest.raises(RuntimeError):
+            queue.drain()
+
+
+class TestScopedSubscriptions:
+    def test_weak_bound_method_is_dropped_with_instance(self):
+        import gc
+        bus = EventBus()
+        seen: List[int] = []
+
+        class Listener:
+            def handle(self, *, n):
+                seen.append(n)
+
+        listener = Listener()
+        bus.on("e", listener.handle, weak=True)
+        bus.emit("e", n=1)
+
+        del listener
+        gc.collect()
+        bus.emit("e", n=2)
+
+        assert seen == [1]
+        assert "e" not in bus._subs
+
+    def test_weak_handler_can_be_removed_with_off(self):
+        bus = EventBus()
+        seen: List[int] = []
+
+        class Listener:
+            def handle(self):
+                seen.append(1)
+
+        listener = Listener()
+        bus.on("e", listener.handle, weak=True)
+        bus.off("e", listener.handle)
+        bus.emit("e")
+
+        assert seen == []
+        assert "e" not in bus._subs
+
+    def test_owner_scoped_subscription_ends_with_owner(self):
+        import gc
+        bus = EventBus()
+        seen: List[str] = []
+
+        class Owner:
+            pass
+
+        owner = Owner()
+        bus.on("e", lambda: seen.append("owned"), owner=owner)
+        bus.on("e", lambda: seen.append("plain"))
+        bus.emit("e")
+
+        del owner
+        gc.collect()
+        bus.emit("e")
+
+        assert seen == ["owned", "plain", "plain"]
+
+    def test_removing_owner_scoped_subscription_detaches_finalizer(self):
+        class Owner:
+            pass
+
+        owner = Owner()
+        bus = EventBus()
+        off = bus.on("a", lambda: None, owner=owner)
+        bus.on("b", lambda: None, owner=owner)
+        (entry_a,), (entry_b,) = bus._subs["a"], bus._subs["b"]
+
+        off()
+        bus.clear()
+
+        # nothing left holding a finalizer on the long-lived owner
+        assert not entry_a.finalizer.alive
+        assert not entry_b.finalizer.alive
+        assert bus._subs == {}
@@ -0,0 +1,113 @@
+# tests/test_forking.py
+from __future__ import annotations
+
+import os
+from typing import Any, List
+
+import pytest
+
+from pyspire import Animation, FrameArchiveSink, OutputProfile, PySpire, SceneFork, Size
+from pyspire.forking import frame_files, share_file
+
+
+class Walk(Animation):
+    def __init__(self, name: str, target: Any, count: int) -> None:
+        super().__init__(name, target)
+        self.count = count
+
+    def _updates(self):
+        for i in range(self.count):
+            yield {"x": i + 1}
+
+
+def builder(tmp_path, count: int = 6, **kw: Any):
+    built: List[PySpire] = []
+
+    def build() -> PySpire:
+        spire = PySpire(size=Size(8, 8), base_filename=str(tmp_path / "frame"), **kw)
+        walk = Walk("walk", spire.add_sprite("box"), count)
+        walk.bus.on("walk_completed", lambda: setattr(spire, "done", True))
+        spire.add_animation(walk)
+        built.append(spire)
+        return spire
+    return build, built
+
+
+def extend(extra: int):
+    """Branch wiring: keep the scene going `extra` frames past the walk."""
+    def wire(spire: PySpire) -> None:
+        spire.animations[0].bus.clear()  # the walk no longer ends the scene
+        tail = Walk("tail", spire.sprites[0], extra)
+        tail.bus.on("tail_completed", lambda: setattr(spire, "done", True))
+        spire.add_animation(tail)
+    return wire
+
+
+def test_branches_share_prefix_and_render_own_tails(tmp_path):
+    build, built = builder(tmp_path)
+    fork = SceneFork(build, 3, {"short": lambda s: None, "long": extend(10)})
+    frames = fork.render(quiet=True)
+
+    assert frames == {"short": 7, "long": 14}
+    for n in range(3):
+        a, b = tmp_path / f"frame_short_{n:06}.png", tmp_path / f"frame_long_{n:06}.png"
+        assert os.path.samefile(a, b) or a.read_bytes() == b.read_bytes()
+    assert os.path.exists(tmp_path / "frame_long_000013.png")
+    assert not os.path.exists(tmp_path / "frame_short_000007.png")
+    assert (fork.rendered, fork.reused) == (3 + 4 + 11, 3)
+    assert "3 reused" in fork.report()
+    assert [s.base_filename for s in built] == [str(tmp_path / "frame_short"), str(tmp_path / "frame_long")]
+
+
+def test_branch_that_diverges_before_the_fork_is_rejected(tmp_path):
+    counts = iter([6, 2])
+
+    def build() -> PySpire:
+        spire = PySpire(size=Size(8, 8), base_filename=str(tmp_path / "frame"))
+        spire.add_animation(Walk("walk", spire.add_sprite("box"), next(counts)))
+        return spire
+
+    with pytest.raises(RuntimeError, match="differs"):
+        SceneFork(build, 4, {"a": lambda s: setattr(s, "done", True), "b": lambda s: None}).render(quiet=True)
+
+
+def test_fork_after_the_end_is_rejected(tmp_path):
+    build, _ = builder(tmp_path, count=2)
+    with pytest.raises(ValueError, match="before the fork"):
+        SceneFork(build, 10, {"a": lambda s: None}).render(quiet=True)
+
+
+def test_output_profiles_are_linked_per_profile(tmp_path):
+    def build() -> PySpire:  # fresh profiles each time: their sinks belong to one scene
+        spire = PySpire(size=Size(8, 8), base_filename=str(tmp_path / "frame"),
+                        outputs=[OutputProfile("full"), OutputProfile("half", scale=0.5)])
+        spire.add_animation(Walk("walk", spire.add_sprite("box"), 6))
+        spire.animations[0].bus.on("walk_completed", lambda: setattr(spire, "done", True))
+        return spire
+
+    SceneFork(build, 2, {"a": lambda s: None, "b": lambda s: None}).render(quiet=True)
+    for profile in ("full", "half"):
+        assert os.path.exists(tmp_path / f"frame_b_{profile}_000001.png")
+
+
+def test_non_png_outputs_are_rejected(tmp_path):
+    build, _ = builder(tmp_path, sink=FrameArchiveSink(str(tmp_path / "x.pfa")))
+    with pytest.raises(ValueError, match="PNG sequences"):
+        SceneFork(build, 1, {"a": lambda s: None}).render(quiet=True)
+
+
+def test_frame_files_and_share_file(tmp_path):
+    spire = PySpire(size=Size(8, 8), base_filename=str(tmp_path / "f"), outputs=[OutputProfile("x")])
+    assert frame_files(spire, 3) == [str(tmp_path / "f_x_000003.png")]
+
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    src.write_bytes(b"one")
+    dst.write_bytes(b"stale")
+    share_file(str(src), str(dst))
+    assert dst.read_bytes() == b"one"
+
+
+def test_profiles_shared_between_builds_are_rejected(tmp_path):
+    build, _ = builder(tmp_path, outputs=[OutputProfile("full")])
+    with pytest.raises(ValueError, match="every branch"):
+        SceneFork(build, 1, {"a": lambda s: None, "b": lambda s: None}).render(quiet=True)
@@ -0,0 +1,91 @@
+# tests/test_frame_cache.py
+from __future__ import annotations
+
+import os
+
+import cairocffi
+import pytest
+
+from pyspire import CairoCompositor, FrameCache, PySpire, Size, SpriteLayer, TiledCompositor, Vec2
+
+
+def make_scene(tmp_path, cache: FrameCache, x: float = 0, **kw) -> PySpire:
+    out = tmp_path / "output"
+    out.mkdir(exist_ok=True)
+    spire = PySpire(size=Size(32, 16), base_filename=str(out / "frame"), frame_cache=cache, **kw)
+    s = spire.add_sprite("box")
+    s.layers.append(SpriteLayer(surface=cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, 8, 8)))
+    s.position = Vec2(x, 0)
+    return spire
+
+
+def render(spire: PySpire, frames: int) -> None:
+    for _ in range(frames):
+        spire.render_frame()
+
+
+def test_rerender_reuses_every_unchanged_frame(tmp_path):
+    cache = FrameCache(str(tmp_path / "cache"))
+    render(make_scene(tmp_path, cache), 3)
+    assert (cache.hits, cache.misses) == (2, 1)  # static scene: frames 1-2 match frame 0
+
+    again = FrameCache(str(tmp_path / "cache"))
+    spire = make_scene(tmp_path, again)
+    render(spire, 3)
+    assert (again.hits, again.misses) == (3, 0)
+    assert again.hit_rate == 1.0
+    assert os.path.exists(spire.output_filename().replace("000003", "000002"))
+
+
+def test_changed_state_misses(tmp_path):
+    cache = FrameCache(str(tmp_path / "cache"))
+    render(make_scene(tmp_path, cache), 1)
+    render(make_scene(tmp_path, cache, x=5), 1)
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert "0 hits, 2 misses" in cache.report()
+
+
+def test_key_covers_layer_opacity_and_pixels(tmp_path):
+    cache = FrameCache(str(tmp_path / "cache"))
+    spire = make_scene(tmp_path, cache)
+    base = cache.key(spire.size, spire.sprites)
+
+    spire.sprites[0].layers[0].opacity = 0.5
+    faded = cache.key(spire.size, spire.sprites)
+    assert faded != base
+
+    spire.sprites[0].layers[0].surface = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, 8, 8)
+    assert cache.key(spire.size, spire.sprites) == faded  # same pixels, same key
+
+    assert cache.key(spire.size, spire.sprites, ((1, 1, 1), True)) != faded
+
+
+def test_miss_does_not_write_through_linked_cache_entry(tmp_path):
+    cache = FrameCache(str(tmp_path / "cache"))
+    dest = str(tmp_path / "frame.png")
+    src = tmp_path / "rendered.png"
+    src.write_bytes(b"first")
+    cache.store("ab" * 32, str(src))
+    assert cache.fetch("ab" * 32, dest)
+
+    assert not cache.fetch("cd" * 32, dest)
+    assert not os.path.exists(dest)  # stale link removed before the new write
+    assert open(cache.path_for("ab" * 32), "rb").read() == b"first"
+
+
+def test_backends_with_cairo_pixels_share_cached_frames(tmp_path):
+    cache = FrameCache(str(tmp_path / "cache"))
+    render(make_scene(tmp_path, cache), 1)
+    render(make_scene(tmp_path, cache, compositor=CairoCompositor()), 1)
+    render(make_scene(tmp_path, cache, compositor=TiledCompositor(2)), 1)
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_numpy_backend_gets_its_own_cached_frames(tmp_path):
+    pytest.importorskip("numpy")
+    from pyspire.numpy_compositor import NumpyCompositor
+
+    cache = FrameCache(str(tmp_path / "cache"))
+    render(make_scene(tmp_path, cache), 1)
+    render(make_scene(tmp_path, cache, compositor=NumpyCompositor()), 1)
+    assert (cache.hits, cache.misses) == (0, 2)
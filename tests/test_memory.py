@@ -0,0 +1,91 @@
+# tests/test_memory.py
+from __future__ import annotations
+
+import threading
+import time
+from typing import List
+
+import pytest
+
+from pyspire import MemoryBudget, MemoryTracker, PySpire, Size, SpriteLayer
+from pyspire.memory import surface_nbytes
+
+
+class FakeSurface:
+    def __init__(self, w: int, h: int, stride: int = 0) -> None:
+        self._w, self._h, self._stride = w, h, stride or w * 4
+    def get_width(self) -> int: return self._w
+    def get_height(self) -> int: return self._h
+    def get_stride(self) -> int: return self._stride
+
+
+def test_surface_nbytes_uses_stride():
+    assert surface_nbytes(FakeSurface(10, 5)) == 200
+    assert surface_nbytes(FakeSurface(10, 5, stride=64)) == 320
+
+
+def test_report_counts_shared_surfaces_once():
+    spire = PySpire(size=Size(16, 16), base_filename="unused")
+    shared, own = FakeSurface(100, 10), FakeSurface(10, 10)
+    for name in ("a", "b"):
+        s = spire.add_sprite(name)
+        s.layers.append(SpriteLayer(surface=shared))
+    spire.sprites[0].layers.append(SpriteLayer(surface=own))
+    spire.memory.register_cache("assets", lambda: 1234)
+
+    report = spire.memory_report()
+
+    assert report["layer_surfaces"] == {"count": 2, "bytes": 4000 + 400}
+    assert report["caches"] == {"assets": 1234}
+    assert report["tracked_bytes"] == 4400 + 1234
+    assert report["framebuffers"]["in_flight"] == 0
+
+
+def test_peak_rss_is_tracked_per_render():
+    tracker = MemoryTracker()
+    tracker.reset_peak()
+    before = tracker.peak_rss
+    blob = bytearray(32 * 1024 * 1024)
+    blob[::4096] = b"x" * len(blob[::4096])  # touch pages so they count as resident
+    tracker.sample()
+    if before is not None:
+        assert tracker.peak_rss >= before
+    del blob
+
+
+def test_budget_tracks_peak_and_rejects_oversized_frames():
+    budget = MemoryBudget(limit=100)
+    budget.acquire(60)
+    budget.release(60)
+    budget.acquire(40)
+    budget.acquire(40)
+    assert budget.peak == 80 and budget.count == 2
+    with pytest.raises(MemoryError):
+        budget.acquire(101)
+
+
+def test_budget_applies_backpressure_until_release():
+    budget = MemoryBudget(limit=100)
+    budget.acquire(80)
+    order: List[str] = []
+
+    def producer() -> None:
+        budget.acquire(50)  # blocks until the consumer frees its buffer
+        order.append("acquired")
+
+    t = threading.Thread(target=producer)
+    t.start()
+    time.sleep(0.05)
+    order.append("released")
+    budget.release(80)
+    t.join(timeout=2)
+
+    assert order == ["released", "acquired"]
+    assert budget.in_flight == 50
+
+
+def test_budget_timeout():
+    budget = MemoryBudget(limit=10)
+    budget.acquire(10)
+    with pytest.raises(TimeoutError):
+        budget.acquire(5, timeout=0.01)
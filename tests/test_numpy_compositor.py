@@ -0,0 +1,164 @@
+# tests/test_numpy_compositor.py
+from __future__ import annotations
+
+from typing import Any
+
+import cairocffi
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pyspire import CairoCompositor, OutputProfile, PySpire, Size, SpriteLayer, Vec2
+from pyspire.numpy_compositor import NumpyCompositor, _blend, alpha_u8, mul_un8
+from pyspire.arrays import surface_array
+
+
+def card(w: int, h: int, rgba=(0.2, 0.5, 0.9, 0.8)) -> cairocffi.ImageSurface:
+    surface = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, w, h)
+    ctx = cairocffi.Context(surface)
+    ctx.rectangle(0, 0, w, h)
+    ctx.set_source_rgba(0.1, 0.1, 0.1, 0.3)
+    ctx.fill()
+    ctx.arc(w / 2, h / 2, min(w, h) / 2.2, 0, 6.2832)
+    ctx.set_source_rgba(*rgba)
+    ctx.fill()
+    return surface
+
+
+def make_scene(compositor: Any, **kw: Any) -> PySpire:
+    spire = PySpire(size=Size(80, 50), base_filename="unused", compositor=compositor, **kw)
+    big, small = card(30, 24), card(10, 8, (0.9, 0.1, 0.1, 1.0))
+    for i in range(9):
+        s = spire.add_sprite(f"s{i}")
+        s.layers.append(SpriteLayer(surface=big))
+        s.layers.append(SpriteLayer(surface=small, offset=Vec2(6, 4), opacity=0.7))
+        s.position = Vec2(i * 12 % 70 - 8, i * 8 % 40 - 4)  # even, so half scale stays aligned; some clipped
+        s.opacity = (0.5, 0.8, 1.0)[i % 3]
+    return spire
+
+
+def frame(spire: PySpire, profile: Any = None) -> np.ndarray:
+    px = surface_array(spire.composite(profile)).astype(np.int16)
+    if spire.opaque:
+        px[..., 3] = 255  # undefined in RGB24
+    return px
+
+
+@pytest.mark.parametrize("background", [None, (0.95, 0.9, 0.8)])
+@pytest.mark.parametrize("output_format", ["argb32", "rgb24"])
+def test_matches_cairo_within_one_level(background, output_format):
+    kw = {"background": background, "output_format": output_format}
+    expected = frame(make_scene(CairoCompositor(), **kw))
+    got = frame(make_scene(NumpyCompositor(), **kw))
+    assert np.abs(got - expected).max() <= 1
+
+
+def test_scaled_profile_matches_cairo_within_one_level():
+    cairo_spire = make_scene(CairoCompositor(), outputs=[OutputProfile("half", scale=0.5)])
+    numpy_spire = make_scene(NumpyCompositor(), outputs=[OutputProfile("half", scale=0.5)])
+    diff = frame(numpy_spire, numpy_spire.outputs[0]) - frame(cairo_spire, cairo_spire.outputs[0])
+    assert np.abs(diff).max() <= 1
+
+
+def test_fractional_positions_are_rounded():
+    cairo_spire, numpy_spire = make_scene(CairoCompositor()), make_scene(NumpyCompositor())
+    for spire in (cairo_spire, numpy_spire):
+        for sprite in spire.sprites:
+            sprite.position = sprite.position + Vec2(0.3, 0.6)
+    # cairo filters the sub-pixel offset; the blitter snaps to the nearest pixel
+    diff = np.abs(frame(numpy_spire) - frame(cairo_spire))
+    assert diff.mean() < 8
+
+
+def reference_over(dst, src, alpha):
+    """Scalar pixman-style OVER with a solid mask, one pixel at a time."""
+    def mul(a, b):
+        t = a * b + 128
+        return ((t >> 8) + t) >> 8
+    s = [mul(int(c), alpha) for c in src]
+    return [min(255, s[i] + mul(int(dst[i]), 255 - s[3])) for i in range(4)]
+
+
+def test_blend_matches_scalar_reference_and_clips():
+    rng = np.random.default_rng(7)
+    src = rng.integers(0, 256, size=(5, 6, 4), dtype=np.uint8)
+    src[..., :3] = np.minimum(src[..., :3], src[..., 3:4])  # valid premultiplied
+    dst = rng.integers(0, 256, size=(8, 8, 4), dtype=np.uint8)
+    dst[..., :3] = np.minimum(dst[..., :3], dst[..., 3:4])
+    out = dst.copy()
+    _blend(out, src, 4, -2, 200, False)
+
+    for y in range(8):
+        for x in range(8):
+            sy, sx = y + 2, x - 4
+            if 0 <= sy < 5 and 0 <= sx < 6:
+                assert out[y, x].tolist() == reference_over(dst[y, x], src[sy, sx], 200)
+            else:
+                assert out[y, x].tolist() == dst[y, x].tolist()
+
+
+def test_opaque_full_alpha_layers_are_copied():
+    src = np.full((2, 2, 4), 255, dtype=np.uint8)
+    src[..., 0] = 9
+    dst = np.zeros((3, 3, 4), dtype=np.uint8)
+    _blend(dst, src, 1, 1, 255, True)
+    assert dst[2, 2].tolist() == [9, 255, 255, 255] and dst[0, 0].tolist() == [0, 0, 0, 0]
+
+
+def test_alpha_and_rounding_helpers():
+    assert [alpha_u8(a) for a in (0.0, 0.5, 1.0, 1.5)] == [0, 127, 255, 255]
+    a = np.arange(256, dtype=np.uint16)
+    assert (mul_un8(a, 255) == a).all() and (mul_un8(a, 0) == 0).all()
+
+
+def solid(w: int, h: int, margin: int = 0) -> cairocffi.ImageSurface:
+    """Opaque white surface with a fully transparent border of `margin` pixels."""
+    px = np.zeros((h, w, 4), dtype=np.uint8)
+    px[margin: h - margin, margin: w - margin] = 255
+    return cairocffi.ImageSurface.create_for_data(bytearray(px.tobytes()), cairocffi.FORMAT_ARGB32, w, h, w * 4)
+
+
+def test_layer_arrays_are_cropped_cached_and_pruned():
+    compositor = NumpyCompositor()
+    spire = PySpire(size=Size(40, 40), base_filename="unused", compositor=compositor)
+    framed, plain = solid(12, 10, margin=2), solid(6, 6)
+    for i in range(3):
+        s = spire.add_sprite(f"s{i}")
+        s.layers.append(SpriteLayer(surface=framed))
+        s.layers.append(SpriteLayer(surface=plain, offset=Vec2(1, 1)))
+        s.position = Vec2(i * 10, 0)
+    out = surface_array(spire.composite())
+    assert out[1, 9, 3] == 0 and out[2, 9, 3] == 255 and out[2, 10, 3] == 0  # margins stay put
+    assert len(compositor._caches[None]) == 2
+    assert spire.memory_report()["caches"]["compositor"] == (8 * 6 + 6 * 6) * 4
+
+    for sprite in spire.sprites:
+        sprite.layers.pop()
+    spire.sprites[0].layers[0].surface = solid(12, 10)
+    spire.composite()
+    assert len(compositor._caches[None]) == 2  # the new surface, and `framed` still used by the others
+
+
+def test_profiles_keep_their_own_arrays():
+    compositor = NumpyCompositor()
+    spire = make_scene(compositor, outputs=[OutputProfile("full"), OutputProfile("half", scale=0.5)])
+    for profile in spire.outputs:
+        spire.composite(profile)
+    cached = {key: dict(cache) for key, cache in compositor._caches.items()}
+    assert len(cached) == 2 and all(len(cache) == 2 for cache in cached.values())
+
+    for profile in spire.outputs:  # the next frame reuses every array
+        spire.composite(profile)
+    for key, cache in compositor._caches.items():
+        assert all(cache[k] is cached[key][k] for k in cache) and cache.keys() == cached[key].keys()
+
+
+def test_composites_into_a_reused_target():
+    compositor = NumpyCompositor()
+    spire = make_scene(compositor)
+    fresh = frame(spire)
+    target = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, 80, 50)
+    surface_array(target)[...] = 0xAB  # stale pixels from an earlier frame
+    out = spire.composite(None, target)
+    assert out is target
+    assert (surface_array(target).astype(np.int16) == fresh).all()
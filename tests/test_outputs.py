@@ -0,0 +1,98 @@
+# tests/test_outputs.py
+from __future__ import annotations
+
+from typing import Any, List, Tuple
+
+import cairocffi
+import pytest
+
+from pyspire import Animation, OutputProfile, PySpire, Size, SpriteLayer
+from pyspire.outputs import ScaledAssets
+
+
+class ListSink:
+    def __init__(self) -> None:
+        self.frames: List[Tuple[int, int, int, int]] = []
+        self.closed = False
+
+    def write(self, frame_no: int, surface: Any) -> None:
+        self.frames.append((frame_no, surface.get_width(), surface.get_height(), surface.get_format()))
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class Steps(Animation):
+    def __init__(self, name: str, target: Any, count: int) -> None:
+        super().__init__(name, target)
+        self.count = count
+        self.stepped = 0
+
+    def _updates(self):
+        for _ in range(self.count):
+            self.stepped += 1
+            yield {}
+
+
+def make_spire(outputs, **kw: Any) -> PySpire:
+    spire = PySpire(size=Size(64, 32), base_filename="unused", outputs=outputs, **kw)
+    sprite = spire.add_sprite("box")
+    sprite.layers.append(SpriteLayer(surface=cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, 16, 16)))
+    return spire
+
+
+def test_each_frame_is_simulated_once_and_written_per_profile():
+    full, half, thumb = ListSink(), ListSink(), ListSink()
+    spire = make_spire([
+        OutputProfile("full", sink=full),
+        OutputProfile("half", scale=0.5, sink=half, background=(1, 1, 1)),
+        OutputProfile("thumb", scale=0.25, sink=thumb, output_format="argb32"),
+    ], background=(0, 0, 0))
+    anim = Steps("a", spire.sprites[0], 3)
+    spire.add_animation(anim)
+    for _ in range(2):
+        spire.render_frame()
+
+    assert anim.stepped == 2
+    rgb24, argb32 = cairocffi.FORMAT_RGB24, cairocffi.FORMAT_ARGB32
+    assert full.frames == [(0, 64, 32, rgb24), (1, 64, 32, rgb24)]
+    assert half.frames == [(0, 32, 16, rgb24), (1, 32, 16, rgb24)]
+    assert thumb.frames == [(0, 16, 8, argb32), (1, 16, 8, argb32)]
+
+
+def test_frame_budget_covers_all_profiles():
+    spire = make_spire([OutputProfile("full", sink=ListSink()), OutputProfile("half", scale=0.5, sink=ListSink())])
+    spire.render_frame()
+    assert spire.memory.budget.peak == spire.frame_nbytes() + spire.frame_nbytes(spire.outputs[1])
+
+
+def test_default_sink_names_and_validation():
+    spire = make_spire([OutputProfile("thumb", scale=0.25)])
+    assert spire.outputs[0].sink.filename(3) == "unused_thumb_000003.png"
+    with pytest.raises(ValueError):
+        make_spire([OutputProfile("x")], sink=ListSink())
+    with pytest.raises(ValueError):
+        make_spire([OutputProfile("x", output_format="yuv")])
+    with pytest.raises(ValueError):
+        OutputProfile("x", scale=0)
+
+
+def test_scaled_assets_are_built_once_per_surface():
+    spire = make_spire([OutputProfile("half", scale=0.5, sink=ListSink())])
+    for _ in range(3):
+        spire.render_frame()
+    assets = spire._assets["half"]
+    layer = spire.sprites[0].layers[0]
+    scaled = assets.get(layer.surface)
+    assert len(assets) == 1 and (scaled.get_width(), scaled.get_height()) == (8, 8)
+    assert spire.memory_report()["caches"]["scaled_assets[half]"] == 8 * 8 * 4
+
+    layer.surface = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, 16, 16)
+    spire.render_frame()
+    assert len(assets) == 1 and assets.get(layer.surface) is not scaled
+
+
+def test_scaled_assets_round_up_and_never_vanish():
+    assets = ScaledAssets(0.1)
+    tiny = assets.get(cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, 15, 3))
+    assert (tiny.get_width(), tiny.get_height()) == (2, 1)
@@ -0,0 +1,151 @@
+# tests/test_palette.py
+from __future__ import annotations
+
+import struct
+import sys
+import zlib
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pyspire.palette import (
+    Palette,
+    PalettePngSink,
+    encode_indexed_png,
+    histogram,
+    merge_histograms,
+    unpremultiply,
+)
+
+
+def decode_indexed(data: bytes):
+    """Minimal color-type-3 PNG reader: (bit depth, palette RGB, tRNS, index rows)."""
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    pos, chunks = 8, {}
+    while pos < len(data):
+        (length,) = struct.unpack(">I", data[pos: pos + 4])
+        tag = data[pos + 4: pos + 8]
+        body = data[pos + 8: pos + 8 + length]
+        (crc,) = struct.unpack(">I", data[pos + 8 + length: pos + 12 + length])
+        assert zlib.crc32(tag + body) == crc
+        chunks.setdefault(tag, b"")
+        chunks[tag] += body
+        pos += 12 + length
+    w, h, bits, ctype = struct.unpack(">IIBB", chunks[b"IHDR"][:10])
+    assert ctype == 3 and b"IEND" in chunks
+    raw = zlib.decompress(chunks[b"IDAT"])
+    row_bytes = (w * bits + 7) // 8
+    rows = []
+    for y in range(h):
+        line = raw[y * (row_bytes + 1): (y + 1) * (row_bytes + 1)]
+        assert line[0] == 0
+        bitstr = "".join(f"{b:08b}" for b in line[1:])
+        rows.append([int(bitstr[i * bits: (i + 1) * bits], 2) for i in range(w)])
+    return bits, chunks[b"PLTE"], chunks.get(b"tRNS", b""), rows
+
+
+def bgra(pixels):
+    """Build premultiplied B,G,R,A from straight (r, g, b, a) rows."""
+    out = np.zeros((len(pixels), len(pixels[0]), 4), dtype=np.uint8)
+    for y, row in enumerate(pixels):
+        for x, (r, g, b, a) in enumerate(row):
+            out[y, x] = (round(b * a / 255), round(g * a / 255), round(r * a / 255), a)
+    return out
+
+
+def test_unpremultiply_restores_straight_alpha():
+    px = bgra([[(255, 0, 0, 255), (0, 255, 0, 128), (9, 9, 9, 0)]])
+    rgba = unpremultiply(px)
+    assert rgba[0, 0].tolist() == [255, 0, 0, 255]
+    assert rgba[0, 1].tolist() == [0, 255, 0, 128]
+    assert rgba[0, 2].tolist() == [0, 0, 0, 0]
+    assert unpremultiply(px, opaque=True)[0, 2].tolist() == [0, 0, 0, 255]
+
+
+def test_quantize_exact_and_nearest():
+    pal = Palette(np.array([[255, 255, 255, 255], [0, 0, 0, 255], [200, 30, 30, 255]]))
+    img = np.array([[[0, 0, 0, 255], [200, 30, 30, 255], [255, 255, 255, 255]]], dtype=np.uint8)
+    indices, error = pal.quantize(img)
+    assert indices.tolist() == [[1, 2, 0]] and error == 0.0
+
+    img[0, 0] = (4, 4, 4, 255)  # off-palette: nearest is black, error 3/4 per channel on 1 of 3 pixels
+    indices, error = pal.quantize(img)
+    assert indices[0, 0] == 1
+    assert error == pytest.approx(3.0 / 3)
+
+
+def test_histogram_palette_keeps_most_frequent():
+    img = np.zeros((4, 4, 4), dtype=np.uint8)
+    img[...] = (10, 20, 30, 255)
+    img[0, :3] = (1, 1, 1, 255)
+    img[1, 0] = (9, 9, 9, 255)
+    keys, counts = merge_histograms(*histogram(img), *histogram(img[:1]))
+    pal = Palette.from_histogram(keys, counts, max_colors=2)
+    assert sorted(map(tuple, pal.colors.tolist())) == [(1, 1, 1, 255), (10, 20, 30, 255)]
+
+
+@pytest.mark.parametrize("ncolors, bits", [(2, 1), (4, 2), (9, 4), (40, 8)])
+def test_encode_indexed_png_round_trip(ncolors, bits):
+    rng = np.random.default_rng(ncolors)
+    colors = rng.integers(0, 256, size=(ncolors, 4), dtype=np.uint8)
+    colors[:, 3] = 255
+    colors[0, 3] = 0
+    pal = Palette(colors)
+    indices = rng.integers(0, ncolors, size=(5, 7), dtype=np.uint8)
+    got_bits, plte, trns, rows = decode_indexed(encode_indexed_png(indices, pal))
+    assert got_bits == bits
+    assert rows == indices.tolist()
+    assert plte == colors[:, :3].tobytes()
+    assert trns == b"\x00"  # trailing opaque entries are omitted
+
+
+class FakeSurface:
+    """Native-endian ARGB32 buffer; write_to_png() returns a stand-in truecolor PNG."""
+    def __init__(self, px) -> None:
+        self.h, self.w = px.shape[:2]
+        words = px.astype(np.uint32)
+        argb = (words[..., 3] << 24) | (words[..., 2] << 16) | (words[..., 1] << 8) | words[..., 0]
+        self.data = bytearray(argb.astype(f"{'<' if sys.byteorder == 'little' else '>'}u4").tobytes())
+        self.truecolor_writes = 0
+    def flush(self) -> None: pass
+    def get_width(self) -> int: return self.w
+    def get_height(self) -> int: return self.h
+    def get_stride(self) -> int: return self.w * 4
+    def get_format(self) -> int: return 0  # cairocffi.FORMAT_ARGB32
+    def get_data(self): return memoryview(self.data)
+    def write_to_png(self) -> bytes:
+        self.truecolor_writes += 1
+        return b"\x89PNG truecolor" + bytes(self.data) * 2
+
+
+def flat_frame(color=(40, 90, 200, 255)):
+    px = np.zeros((6, 8, 4), dtype=np.uint8)
+    px[...] = (250, 250, 250, 255)
+    px[2:4, 2:6] = color
+    return bgra(px.tolist())
+
+
+def test_sink_adaptive_palette_then_frozen(tmp_path):
+    sink = PalettePngSink(str(tmp_path / "f"), adaptive_frames=2, compare_every=1)
+    for n in range(3):
+        sink.write(n, FakeSurface(flat_frame()))
+    assert sink.palette is not None and len(sink.palette) == 2
+    bits, plte, _, rows = decode_indexed((tmp_path / "f_000002.png").read_bytes())
+    assert bits == 1 and len(rows) == 6
+    stats = sink.stats()
+    assert stats["indexed"] == 3 and stats["truecolor"] == 0
+    assert stats["size_saving"] > 0
+    assert "palette png: 3 frames" in sink.report()
+
+
+def test_sink_falls_back_to_truecolor_over_threshold(tmp_path):
+    pal = Palette(np.array([[250, 250, 250, 255], [40, 90, 200, 255]]))
+    sink = PalettePngSink(str(tmp_path / "f"), palette=pal, max_error=0.5, compare_every=0)
+    sink.write(0, FakeSurface(flat_frame()))
+    noisy = FakeSurface(flat_frame((200, 20, 20, 255)))
+    sink.write(1, noisy)
+    assert (sink.indexed, sink.truecolor) == (1, 1)
+    assert noisy.truecolor_writes == 1
+    assert (tmp_path / "f_000001.png").read_bytes().startswith(b"\x89PNG truecolor")
+    assert "size_saving" not in sink.stats()
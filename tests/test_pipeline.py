@@ -0,0 +1,242 @@
+# tests/test_pipeline.py
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from typing import Any, List, Tuple
+
+import cairocffi
+import pytest
+
+from pyspire import Animation, FrameArchive, FrameArchiveSink, OutputProfile, PySpire, Size, TimelineRecorder
+from pyspire.checkpoint import Checkpoint
+from pyspire.frame_cache import FrameCache
+from pyspire.memory import MemoryTracker
+from pyspire.pipeline import RenderPipeline, snapshot
+
+
+class Walk(Animation):
+    def __init__(self, target: Any, count: int) -> None:
+        super().__init__("walk", target)
+        self.count = count
+
+    def _updates(self):
+        for i in range(self.count):
+            yield {"x": i + 1}
+
+
+def make_scene(tmp_path, count: int = 12, **kw: Any) -> PySpire:
+    spire = PySpire(size=Size(8, 8), base_filename=str(tmp_path / "frame"), **kw)
+    box = spire.add_sprite("box")
+    walk = Walk(box, count)
+    walk.bus.on("walk_completed", lambda: setattr(spire, "done", True))
+    spire.add_animation(walk)
+    return spire
+
+
+class RecordingSink:
+    """Remembers (frame_no, sprite x at composite time) in write order."""
+    def __init__(self) -> None:
+        self.frames: List[Tuple[int, float]] = []
+        self.closed = False
+
+    def write(self, frame_no: int, surface: Any) -> None:
+        self.frames.append((frame_no, surface.box_x))
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class TaggingCompositor:
+    """Cairo-free stand-in that tags each frame with the box position it was drawn from."""
+    def composite(self, fmt, width, height, sprites, background=None, assets=None, target=None):
+        surface = target if target is not None else cairocffi.ImageSurface(fmt, width, height)
+        surface.box_x = sprites[0].position.x
+        return surface
+
+    def close(self) -> None:
+        pass
+
+
+def render(spire: PySpire, **kw: Any) -> RenderPipeline:
+    pipeline = RenderPipeline(spire, **kw)
+    asyncio.run(pipeline.run())
+    return pipeline
+
+
+def test_snapshot_is_independent_of_later_moves(tmp_path):
+    spire = make_scene(tmp_path)
+    copy = snapshot(spire.sprites)
+    spire.sprites[0].x = 5
+    assert copy[0].position.x == 0
+    assert copy[0].layers == spire.sprites[0].layers
+
+
+def test_frames_written_in_order_from_their_own_state(tmp_path):
+    sequential = make_scene(tmp_path, sink=RecordingSink(), compositor=TaggingCompositor())
+    while not sequential.done:
+        sequential.render_frame()
+
+    sink = RecordingSink()
+    spire = make_scene(tmp_path, sink=sink, compositor=TaggingCompositor())
+    pipeline = render(spire, depth=3, encoders=4)
+    assert sink.frames == sequential.sink.frames
+    assert pipeline.frames == spire.frame_no == sequential.frame_no
+
+
+def test_png_files_match_sequential_render(tmp_path):
+    spire = make_scene(tmp_path)
+    render(spire)
+    names = sorted(os.listdir(tmp_path))
+    assert names == [f"frame_{n:06}.png" for n in range(spire.frame_no)]
+
+
+def test_bytes_sinks_get_encoded_frames(tmp_path):
+    spire = make_scene(tmp_path, outputs=[
+        OutputProfile("full", sink=FrameArchiveSink(str(tmp_path / "full.pfa"))),
+        OutputProfile("half", scale=0.5),
+    ])
+    render(spire)
+    spire.outputs[0].sink.close()
+    with FrameArchive(str(tmp_path / "full.pfa")) as archive:
+        assert archive.frames() == list(range(spire.frame_no))
+    assert os.path.exists(tmp_path / f"frame_half_{spire.frame_no - 1:06}.png")
+
+
+def test_queues_stay_bounded(tmp_path):
+    seen: List[int] = []
+    spire = make_scene(tmp_path, count=30, sink=RecordingSink(), compositor=TaggingCompositor())
+    pipeline = RenderPipeline(spire, depth=2)
+
+    async def watch(task: asyncio.Future) -> None:
+        while not task.done():
+            seen.extend(pipeline.depths().values())
+            await asyncio.sleep(0)
+
+    async def main() -> None:
+        task = asyncio.ensure_future(pipeline.run())
+        await asyncio.gather(task, watch(task))
+
+    asyncio.run(main())
+    assert seen and max(seen) <= 2
+    stats = pipeline.stats()
+    assert stats["frames"] == spire.frame_no
+    assert set(stats["mean_depth"]) == {"composite", "encode", "write"}
+    assert stats["bottleneck"] in stats["mean_depth"]
+    assert "bottleneck" in pipeline.report()
+
+
+def test_checkpoints_and_recorder(tmp_path):
+    (tmp_path / "seq").mkdir()
+    sequential = make_scene(tmp_path / "seq", checkpoint_every=4)
+    sequential.render_until_done()
+
+    recorder = TimelineRecorder(str(tmp_path / "timeline.json"))
+    spire = make_scene(tmp_path, checkpoint_every=4, recorder=recorder)
+    spire.render_until_done(pipelined=True)
+    assert Checkpoint.load(spire.checkpoint_path()) == Checkpoint.load(sequential.checkpoint_path())
+    assert os.path.exists(tmp_path / "timeline.json")
+
+
+def test_stage_error_propagates(tmp_path):
+    class Broken(RecordingSink):
+        def write(self, frame_no: int, surface: Any) -> None:
+            if frame_no == 3:
+                raise OSError("disk full")
+            super().write(frame_no, surface)
+
+    sink = Broken()
+    spire = make_scene(tmp_path, count=50, sink=sink, compositor=TaggingCompositor())
+    with pytest.raises(OSError, match="disk full"):
+        render(spire)
+    assert [n for n, _ in sink.frames] == [0, 1, 2]
+
+
+class LendingSink(RecordingSink):
+    """Lends its own buffers, like SharedMemorySink, and fails writing frame `fail_at`."""
+    def __init__(self, fail_at: int) -> None:
+        super().__init__()
+        self.fail_at = fail_at
+        self.lent: set = set()
+
+    def frame_surface(self, fmt: int, width: int, height: int) -> Any:
+        surface = cairocffi.ImageSurface(fmt, width, height)
+        self.lent.add(id(surface))
+        return surface
+
+    def write(self, frame_no: int, surface: Any) -> None:
+        self.lent.discard(id(surface))
+        if frame_no == self.fail_at:
+            raise OSError("disk full")
+        super().write(frame_no, surface)
+
+    def discard(self, surface: Any) -> None:
+        self.lent.discard(id(surface))
+
+
+def test_failure_returns_budget_and_lent_buffers(tmp_path):
+    frame = 8 * 8 * 4
+    sink = LendingSink(fail_at=2)
+    spire = make_scene(tmp_path, count=50, sink=sink, compositor=TaggingCompositor(),
+                       memory=MemoryTracker(budget=3 * frame))
+    errors: List[BaseException] = []
+
+    def run() -> None:
+        try:
+            spire.render_until_done(pipelined=True, quiet=True)
+        except OSError as exc:
+            errors.append(exc)
+
+    # frames queued behind the failed write used to keep the compositor blocked on the budget
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    worker.join(10)
+    assert not worker.is_alive()
+    assert [str(e) for e in errors] == ["disk full"]
+    assert (spire.memory.budget.in_flight, spire.memory.budget.count) == (0, 0)
+    assert sink.lent == set() and sink.closed
+
+
+def test_frame_hook_failure_returns_budget(tmp_path):
+    def hook(frame_no: int, surface: Any, profile: Any) -> None:
+        if frame_no == 3:
+            raise ValueError("bad hook")
+
+    spire = make_scene(tmp_path, count=20, sink=RecordingSink(), compositor=TaggingCompositor(),
+                       frame_hooks=[hook])
+    with pytest.raises(ValueError, match="bad hook"):
+        render(spire, depth=4)
+    assert spire.memory.budget.in_flight == 0
+
+
+def test_compositing_continues_while_a_write_is_slow(tmp_path):
+    drawn = threading.Condition()
+    calls = [0]
+
+    class Counting(TaggingCompositor):
+        def composite(self, fmt, width, height, sprites, background=None, assets=None, target=None):
+            with drawn:
+                calls[0] += 1
+                drawn.notify_all()
+            return super().composite(fmt, width, height, sprites, background, assets, target)
+
+    class Slow(RecordingSink):
+        overlapped = False
+
+        def write(self, frame_no: int, surface: Any) -> None:
+            if frame_no == 0:  # two more frames get drawn while this one is being written
+                with drawn:
+                    start = calls[0]
+                    self.overlapped = drawn.wait_for(lambda: calls[0] >= start + 2 or calls[0] >= 9, 10)
+            super().write(frame_no, surface)
+
+    sink = Slow()
+    render(make_scene(tmp_path, count=8, sink=sink, compositor=Counting()), depth=4)
+    assert sink.overlapped
+
+
+def test_frame_cache_is_rejected(tmp_path):
+    spire = make_scene(tmp_path, frame_cache=FrameCache(str(tmp_path / "cache")))
+    with pytest.raises(ValueError, match="frame_cache"):
+        RenderPipeline(spire)
@@ -0,0 +1,70 @@
+# tests/test_profiling.py
+from __future__ import annotations
+
+import json
+from typing import Dict, List, Tuple
+
+import pytest
+
+from pyspire import FrameProfiler
+from pyspire.profiling import percentile
+
+
+def test_percentile_nearest_rank():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 95) == 95.0
+    assert percentile(samples, 100) == 100.0
+    assert percentile([], 50) == 0.0
+
+
+def test_rolling_stats_cover_window_totals_cover_render():
+    prof = FrameProfiler(window=4)
+    for i in range(10):
+        prof.record(i, {"animate": 0.001, "composite": 0.010 * (i + 1), "write": 0.002})
+
+    st = prof.stage_stats("composite")
+    # last four frames: 0.07, 0.08, 0.09, 0.10
+    assert st["p50"] == pytest.approx(0.08)
+    assert st["p95"] == pytest.approx(0.10)
+    assert st["max"] == pytest.approx(0.10)
+    assert st["total"] == pytest.approx(0.55)
+    assert st["mean"] == pytest.approx(0.055)
+    assert prof.frames == 10
+
+
+def test_hooks_receive_every_frame_and_can_be_removed():
+    prof = FrameProfiler()
+    seen: List[Tuple[int, Dict[str, float]]] = []
+    remove = prof.add_hook(lambda n, d: seen.append((n, d)))
+
+    prof.record(0, {"write": 0.5})
+    remove()
+    prof.record(1, {"write": 0.5})
+
+    assert seen == [(0, {"write": 0.5})]
+
+
+def test_eta_needs_expected_frames():
+    prof = FrameProfiler()
+    prof.record(0, {"write": 0.01})
+    prof.record(1, {"write": 0.01})
+    assert prof.eta() is None
+    assert "ETA" not in prof.status_line(2)
+
+    prof.expected_frames = 100
+    assert prof.eta() is not None and prof.eta() >= 0
+    assert "ETA" in prof.status_line(2)
+
+
+def test_summary_is_json_and_report_lists_stages():
+    prof = FrameProfiler()
+    prof.record(0, {"animate": 0.001, "composite": 0.002, "write": 0.003})
+
+    data = json.loads(prof.to_json())
+    assert data["frames"] == 1
+    assert set(data["stages"]) == {"animate", "composite", "write"}
+
+    text = prof.report()
+    for stage in ("animate", "composite", "write"):
+        assert stage in text
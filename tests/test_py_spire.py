@@ -0,0 +1,153 @@
+# tests/test_py_spire.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, List
+
+import cairocffi
+import pytest
+
+from pyspire import Animation, EventQueue, OutputProfile, PySpire, Size
+
+
+@dataclass
+class DummyTarget:
+    x: int = 0
+
+
+class Count(Animation):
+    """Yield `count` updates of x, then complete."""
+    def __init__(self, name: str, target: Any, count: int) -> None:
+        super().__init__(name, target)
+        self.count = count
+
+    def _updates(self):
+        for i in range(self.count):
+            yield {"x": i + 1}
+
+
+def make_spire(**kw: Any) -> PySpire:
+    return PySpire(size=Size(16, 16), base_filename="unused", **kw)
+
+
+def test_step_animations_drops_finished():
+    spire = make_spire()
+    short, long = Count("short", DummyTarget(), 1), Count("long", DummyTarget(), 3)
+    spire.add_animation(short)
+    spire.add_animation(long)
+
+    spire.step_animations()  # short applies its only update
+    spire.step_animations()  # short completes
+    assert spire.animations == [long]
+
+
+def test_animation_added_by_handler_starts_next_frame():
+    spire = make_spire()
+    first, tgt = Count("first", DummyTarget(), 1), DummyTarget()
+    spawned: List[Count] = []
+
+    def spawn(**_: Any) -> None:
+        anim = Count("spawned", tgt, 2)
+        spawned.append(anim)
+        spire.add_animation(anim)
+
+    first.bus.on("first_start", spawn)
+    spire.add_animation(first)
+
+    spire.step_animations()
+    assert tgt.x == 0          # added mid-frame, not stepped yet
+    spire.step_animations()
+    assert tgt.x == 1
+
+
+def test_queued_mode_delivers_after_all_animations_step():
+    spire = make_spire(event_queue=EventQueue())
+    a_tgt, b_tgt = DummyTarget(), DummyTarget()
+    a, b = Count("a", a_tgt, 1), Count("b", b_tgt, 1)
+    seen: List[Any] = []
+    a.bus.on("a_start", lambda: seen.append((a_tgt.x, b_tgt.x)))
+    spire.add_animation(a)
+    spire.add_animation(b)
+
+    spire.step_animations()
+    # handler ran at the drain point, after b had also applied its update
+    assert seen == [(1, 1)]
+
+
+def test_queued_mode_covers_scene_bus():
+    spire = make_spire(event_queue=EventQueue())
+    spire.bus.on("animation.done", lambda: setattr(spire, "done", True))
+    spire.bus.emit("animation.done")
+    assert not spire.done
+    spire.step_animations()
+    assert spire.done
+
+
+def test_chained_short_lived_animations_stay_bounded():
+    import gc
+    import tracemalloc
+
+    spire = make_spire()
+    tgt = DummyTarget()
+    prev = None
+
+    def run(n: int) -> None:
+        nonlocal prev
+        for _ in range(n):
+            anim = Count("blip", tgt, 1)
+            # each handler captures the previous animation, like scene callbacks do
+            anim.bus.on("blip_completed", lambda prev=prev, payload=bytearray(256): None)
+            spire.add_animation(anim)
+            spire.step_animations()
+            spire.step_animations()
+            prev = anim
+
+    tracemalloc.start()
+    try:
+        run(1_000)
+        gc.collect()
+        baseline = tracemalloc.get_traced_memory()[0]
+        run(99_000)
+        gc.collect()
+        grown = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+
+    assert spire.animations == []
+    assert grown < 256 * 1024
+
+
+def test_output_format_follows_background():
+    assert make_spire().cairo_format() == cairocffi.FORMAT_ARGB32
+    opaque = make_spire(background=(1.0, 1.0, 1.0))
+    assert opaque.opaque and opaque.cairo_format() == cairocffi.FORMAT_RGB24
+    assert opaque.composite().get_format() == cairocffi.FORMAT_RGB24
+    overlay = make_spire(background=(1.0, 1.0, 1.0), output_format="argb32")
+    assert not overlay.opaque
+    assert make_spire(output_format="rgb24").opaque
+    with pytest.raises(ValueError):
+        make_spire(output_format="rgba")
+
+
+class ClosingSink:
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.closed = False
+
+    def write(self, frame_no: int, surface: Any) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+        if self.fail:
+            raise RuntimeError("encode failed")
+
+
+def test_every_sink_is_closed_when_one_fails():
+    sinks = [ClosingSink(fail=True), ClosingSink()]
+    spire = make_spire(outputs=[OutputProfile("a", sink=sinks[0]), OutputProfile("b", sink=sinks[1])])
+    spire.add_animation(Count("walk", DummyTarget(), 2))
+    spire.animations[0].bus.on("walk_completed", lambda: setattr(spire, "done", True))
+    with pytest.raises(RuntimeError, match="encode failed"):
+        spire.render_until_done(quiet=True)
+    assert [s.closed for s in sinks] == [True, True]
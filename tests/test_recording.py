@@ -0,0 +1,100 @@
+# tests/test_recording.py
+from __future__ import annotations
+
+from typing import Any, List
+
+from pyspire import PySpire, Size, Sprite, SpriteLayer, Timeline, TimelineRecorder, TimelineReplay
+from pyspire.animation import Fade
+from pyspire.recording import scene_state
+
+
+class FakeSurface:
+    def __init__(self, source: str = "", w: int = 20, h: int = 10) -> None:
+        self.source, self._w, self._h = source, w, h
+    def get_width(self) -> int: return self._w
+    def get_height(self) -> int: return self._h
+
+
+def make_sprite(name: str, *sources: str) -> Sprite:
+    s = Sprite(name=name)
+    for src in sources:
+        s.layers.append(SpriteLayer(surface=FakeSurface(src), source=src))
+    return s
+
+
+def record_fade(path: str, frames: int = 4) -> PySpire:
+    rec = TimelineRecorder(path)
+    spire = PySpire(size=Size(64, 32), base_filename="out/x", recorder=rec)
+    box = make_sprite("box", "bg.png", "fg.png")
+    spire.sprites.append(box)
+    spire.sprites.append(make_sprite("still", "bg.png"))
+    fade = Fade(box, frames=frames, start=0.0, end=1.0)
+    fade.bus.on("fade_completed", lambda: spire.bus.emit("animation.done", who=box))
+    spire.add_animation(fade)
+    for _ in range(frames + 1):
+        spire.step_animations()
+        rec.frame(spire.frame_no, spire.sprites)
+        spire.frame_no += 1
+    rec.close()
+    return spire
+
+
+def test_recording_round_trips_events_animations_and_states(tmp_path):
+    path = str(tmp_path / "timeline.jsonl")
+    spire = record_fade(path)
+
+    tl = Timeline.load(path)
+    assert tl.header["size"] == [64, 32]
+    assert len(tl) == 5
+    assert [(e["f"], e["src"], e["e"]) for e in tl.events] == [
+        (0, "fade", "fade_start"),
+        (4, "fade", "fade_completed"),
+        (4, "scene", "animation.done"),
+    ]
+    assert tl.events[-1]["data"] == {"who": {"sprite": "box"}}
+    (anim,) = tl.animations
+    assert anim["target"] == {"sprite": "box"}
+    assert anim["desc"]["type"] == "Fade" and anim["desc"]["frames"] == 4
+
+    states = list(tl.states())
+    assert [st[0]["opacity"] for st in states] == [0.0, 1 / 3, 2 / 3, 1.0, 1.0]
+    assert states[-1] == scene_state(spire.sprites)
+
+
+def test_unchanged_sprites_are_not_rewritten(tmp_path):
+    path = str(tmp_path / "timeline.jsonl")
+    record_fade(path)
+    tl = Timeline.load(path)
+    assert sorted(tl.frames[0]["set"]) == ["0", "1"]
+    assert sorted(tl.frames[1]["set"]) == ["0"]
+    assert tl.frames[-1]["set"] == {}
+
+
+def test_replay_rebuilds_scene_without_callbacks(tmp_path):
+    path = str(tmp_path / "timeline.jsonl")
+    spire = record_fade(path)
+    loads: List[str] = []
+
+    def load(src: str) -> Any:
+        loads.append(src)
+        return FakeSurface(src)
+
+    replay = TimelineReplay(Timeline.load(path), load_image=load)
+    rebuilt: List[Sprite] = []
+    for state in replay.timeline.states():
+        replay.apply(state, rebuilt)
+        assert scene_state(rebuilt) == state
+
+    assert scene_state(rebuilt) == scene_state(spire.sprites)
+    assert sorted(loads) == ["bg.png", "fg.png"]  # each image decoded once
+
+
+def test_first_difference_between_recordings(tmp_path):
+    a, b, c = (str(tmp_path / f"{n}.jsonl") for n in "abc")
+    record_fade(a)
+    record_fade(b)
+    record_fade(c, frames=6)
+    ta, tb, tc = Timeline.load(a), Timeline.load(b), Timeline.load(c)
+
+    assert ta.first_difference(tb) is None
+    assert ta.first_difference(tc) == 1
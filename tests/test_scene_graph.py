@@ -0,0 +1,204 @@
+# tests/test_scene_graph.py
+from __future__ import annotations
+
+from typing import Any, List
+
+import cairocffi
+import pytest
+
+from pyspire import Group, PySpire, Size, SpriteLayer, Vec2
+from pyspire.animation import Bump, Fade, Sweep
+from pyspire.animation.geom import center_of
+from pyspire.checkpoint import Checkpoint
+
+
+def make_spire(**kw: Any) -> PySpire:
+    return PySpire(size=Size(64, 64), base_filename="unused", **kw)
+
+
+def layered(spire: PySpire, name: str, w: int = 4, h: int = 2, **kw: Any):
+    sprite = spire.add_sprite(name, **kw)
+    sprite.layers.append(SpriteLayer(surface=cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, w, h)))
+    return sprite
+
+
+class Capture:
+    """Compositor stand-in that keeps the sprites it was asked to draw."""
+    def __init__(self) -> None:
+        self.frames: List[list] = []
+
+    def composite(self, fmt, width, height, sprites, background=None, assets=None, target=None):
+        self.frames.append([(s.name, tuple(s.position), s.opacity) for s in sprites])
+        return cairocffi.ImageSurface(fmt, width, height)
+
+    def close(self) -> None:
+        pass
+
+
+def test_children_are_placed_relative_to_ancestors():
+    spire = make_spire()
+    outer = spire.add_group("outer", position=Vec2(10, 20), opacity=0.5)
+    inner = spire.add_group("inner", parent=outer, position=Vec2(1, 2), opacity=0.5)
+    a = spire.add_sprite("a", parent=inner)
+    a.position = Vec2(3, 3)
+    loose = spire.add_sprite("loose")
+
+    world = spire.render_list()
+    assert [(s.name, tuple(s.position), s.opacity) for s in world] == [
+        ("a", (14, 25), 0.25), ("loose", (0, 0), 1.0)]
+    assert world[1] is loose            # ungrouped sprites are drawn as they are
+    assert a.position == Vec2(3, 3)     # the sprite itself stays local
+
+
+def test_world_transform_is_cached_until_an_ancestor_changes():
+    spire = make_spire()
+    outer = spire.add_group("outer")
+    inner = spire.add_group("inner", parent=outer)
+    first = inner.world()
+    assert inner.world() is first
+
+    outer.x = 5
+    moved = inner.world()
+    assert moved is not first and moved.position == Vec2(5, 0)
+    assert inner.world() is moved
+
+
+def test_world_copies_are_reused_while_nothing_changes():
+    spire = make_spire()
+    group = spire.add_group("g")
+    kids = [spire.add_sprite(f"s{i}", parent=group) for i in range(3)]
+    first = spire.render_list()
+    assert all(x is y for x, y in zip(first, spire.render_list()))
+
+    kids[1].x = 7
+    second = spire.render_list()
+    assert second[0] is first[0] and second[1] is not first[1]
+    assert second[1].layers is kids[1].layers
+
+
+def test_reassigned_layers_reach_the_world_copy():
+    spire = make_spire()
+    sprite = layered(spire, "s", w=2, h=2, parent=spire.add_group("g"))
+    assert spire.render_list()[0].size == Size(2, 2)
+    sprite.layers = [SpriteLayer(surface=cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, 5, 5))]
+    world = spire.render_list()[0]
+    assert world.layers is sprite.layers and world.size == Size(5, 5)
+
+
+def test_one_group_animation_moves_every_child():
+    capture = Capture()
+    spire = make_spire(compositor=capture)
+    group = spire.add_group("g")
+    for i in range(100):
+        spire.add_sprite(f"s{i}", parent=group).x = i
+    fade = Fade(group, start=1.0, end=0.0, duration_s=2 / 60)
+    spire.add_animation(fade)
+
+    for _ in range(3):
+        spire.step_animations()
+        spire.composite()
+    assert {opacity for _, _, opacity in capture.frames[-1]} == {group.opacity}
+    assert group.opacity < 1.0
+
+
+def test_z_orders_paint_through_groups():
+    spire = make_spire()
+    back = spire.add_group("back", z=-1)
+    front = spire.add_group("front", z=1)
+    a = spire.add_sprite("a", parent=front)
+    b = spire.add_sprite("b", parent=back)
+    c = spire.add_sprite("c")
+    d = spire.add_sprite("d", parent=back)
+    d.z = 3  # -1 + 3 = 2: above everything in "front"
+
+    assert [s.name for s in spire.render_list()] == ["b", "c", "a", "d"]
+
+
+def test_moving_between_groups_and_cycles():
+    spire = make_spire()
+    g1, g2 = spire.add_group("g1", position=Vec2(1, 0)), spire.add_group("g2", position=Vec2(2, 0))
+    s = spire.add_sprite("s", parent=g1)
+    g2.add(s)
+    assert s.parent is g2 and g1.children == [] and g2.children == [s]
+    assert spire.render_list()[0].position == Vec2(2, 0)
+
+    g2.add(g1)
+    with pytest.raises(ValueError, match="descendants"):
+        g1.add(g2)
+    g2.remove(s)
+    assert s.parent is None and spire.render_list()[0] is s
+
+
+def test_group_bounds_cover_descendants():
+    spire = make_spire()
+    group = spire.add_group("g", position=Vec2(10, 10))
+    layered(spire, "a", parent=group)
+    b = layered(spire, "b", w=2, h=8, parent=group)
+    b.position = Vec2(5, -3)
+
+    bounds = group.bounds
+    assert (bounds.x, bounds.y, bounds.w, bounds.h) == (10, 7, 7, 8)
+    assert group.get_width() == 7
+    assert spire.add_group("empty", position=Vec2(3, 4)).bounds.size == Size(0, 0)
+
+
+def test_checkpoint_sees_group_motion():
+    spire = make_spire()
+    group = spire.add_group("g")
+    spire.add_sprite("s", parent=group)
+    before = Checkpoint.capture(spire)
+    group.y = 9
+    assert before.diff(Checkpoint.capture(spire)) == ["scene"]
+
+
+def test_flat_scenes_are_untouched():
+    spire = make_spire()
+    spire.add_sprite("a")
+    assert spire.render_list() is spire.sprites
+
+
+def run(anim) -> None:
+    while not anim.done:
+        anim.step()
+
+
+def test_geometry_is_in_world_space():
+    spire = make_spire()
+    group = spire.add_group("g", position=Vec2(100, 0))
+    a = layered(spire, "a", w=10, h=10, parent=group)
+    a.x = 50
+    assert a.bounds.x == 150 and a.world_position == Vec2(150, 0)
+    assert center_of(a) == (155, 5)
+    assert center_of(group) == (155, 5)
+
+
+def test_bump_grouped_sprite_and_group_to_contact():
+    for subject in ("a", "g"):
+        spire = make_spire()
+        group = spire.add_group("g", position=Vec2(100, 0))
+        a = layered(spire, "a", w=10, h=10, parent=group)
+        a.x = 50
+        wall = layered(spire, "wall", w=10, h=10)
+        wall.x = 300
+        node = a if subject == "a" else group
+        bump = Bump(node, wall)
+        assert bump.plan_summary()["delta"] == (140, 0)
+
+        contact = []
+        bump.bus.on("bump_contact", lambda **kw: contact.append(a.bounds.max_x))
+        run(bump)
+        assert contact == [300]  # touching, not through the wall
+        assert a.bounds.x == 150
+
+
+def test_sweep_group_spans_its_content():
+    spire = make_spire()
+    group = spire.add_group("g")
+    for i in range(2):
+        layered(spire, f"s{i}", w=10, parent=group).x = 20 + 30 * i  # content from x=20, 40 wide
+    sweep = Sweep(group, container_width=200, frames=3)
+    xs = []
+    while not sweep.done:
+        sweep.step()
+        xs.append(group.bounds.x)
+    assert xs[0] == 0 and xs[-1] == 160
@@ -0,0 +1,110 @@
+# tests/test_segments.py
+from __future__ import annotations
+
+import os
+import sys
+
+import cairocffi
+import pytest
+
+from pyspire import SegmentedEncoderSink
+from pyspire.segments import raw_pix_fmt
+
+# stands in for ffmpeg: writes "<argv...>\n" then the raw bytes it was fed
+STUB = "import sys; data = sys.stdin.buffer.read(); open(sys.argv[1], 'wb').write(' '.join(sys.argv[2:]).encode() + b'\\n' + data)"
+STUB_COMMAND = (sys.executable, "-c", STUB, "{output}", "{width}x{height}", "{fps}", "{pix_fmt}")
+
+
+class Pixels:
+    """2x1 ARGB32 surface stand-in whose every byte is `value`."""
+    def __init__(self, value: int) -> None:
+        self.data = bytes([value]) * 8
+    def get_format(self) -> int: return cairocffi.FORMAT_ARGB32
+    def get_width(self) -> int: return 2
+    def get_height(self) -> int: return 1
+    def get_stride(self) -> int: return 8
+    def get_data(self): return memoryview(self.data)
+    def flush(self) -> None: pass
+
+
+def render(sink: SegmentedEncoderSink, frames) -> None:
+    for n in frames:
+        sink.write(n, Pixels(n))
+    sink.close()
+
+
+def test_segments_align_to_frame_numbers(tmp_path):
+    base = str(tmp_path / "video")
+    sink = SegmentedEncoderSink(base, segment_frames=4, command=STUB_COMMAND, fps=30, jobs=2)
+    render(sink, range(10))
+
+    assert [(s.start, s.frames) for s in sink.segments] == [(0, 4), (4, 4), (8, 2)]
+    header, pixels = (tmp_path / "video_seg000004.mp4").read_bytes().split(b"\n", 1)
+    assert header == f"2x1 30 {raw_pix_fmt(cairocffi.FORMAT_ARGB32)}".encode()
+    assert pixels == b"".join(bytes([n]) * 8 for n in range(4, 8))
+    assert sorted(os.listdir(tmp_path)) == [
+        "video.ffconcat", "video_seg000000.mp4", "video_seg000004.mp4", "video_seg000008.mp4"]
+    assert "3 segments" in sink.report()
+
+
+def test_manifest_lists_segments_in_order(tmp_path):
+    sink = SegmentedEncoderSink(str(tmp_path / "it's"), segment_frames=2, command=STUB_COMMAND, jobs=3)
+    render(sink, range(6))
+    assert (tmp_path / "it's.ffconcat").read_text().splitlines() == [
+        "ffconcat version 1.0",
+        "file 'it'\\''s_seg000000.mp4'",
+        "file 'it'\\''s_seg000002.mp4'",
+        "file 'it'\\''s_seg000004.mp4'",
+    ]
+
+
+def test_streams_start_at_a_segment_boundary(tmp_path):
+    (tmp_path / "v_seg000004.mp4").write_bytes(b"encoded earlier")
+    sink = SegmentedEncoderSink(str(tmp_path / "v"), segment_frames=4, command=STUB_COMMAND)
+    with pytest.raises(ValueError, match="inside segment 4.*from frame 4"):
+        sink.write(6, Pixels(6))
+    sink.close()
+    assert (tmp_path / "v_seg000004.mp4").read_bytes() == b"encoded earlier"
+
+    render(sink, range(4, 9))
+    assert [(s.start, s.frames) for s in sink.segments] == [(4, 4), (8, 1)]
+
+
+def test_gaps_inside_a_segment_encode_as_black(tmp_path):
+    sink = SegmentedEncoderSink(str(tmp_path / "v"), segment_frames=4, command=STUB_COMMAND)
+    render(sink, [0, 2, 3])
+    pixels = (tmp_path / "v_seg000000.mp4").read_bytes().split(b"\n", 1)[1]
+    assert pixels == bytes([0]) * 8 + bytes(8) + bytes([2]) * 8 + bytes([3]) * 8
+
+
+def test_report_after_close_counts_failed_segments(tmp_path):
+    failing = (sys.executable, "-c", "import sys; sys.exit(3)", "{output}")
+    sink = SegmentedEncoderSink(str(tmp_path / "v"), segment_frames=2, command=failing)
+    for n in range(3):
+        sink.write(n, Pixels(n))
+    with pytest.raises(RuntimeError):
+        sink.close()
+    assert sink.report().endswith("2 failed")
+
+
+def test_out_of_order_frames_are_rejected(tmp_path):
+    sink = SegmentedEncoderSink(str(tmp_path / "v"), segment_frames=2, command=STUB_COMMAND)
+    sink.write(2, Pixels(0))
+    with pytest.raises(ValueError, match="after segment 2"):
+        sink.write(1, Pixels(0))
+    sink.close()
+
+
+def test_failed_encoder_is_reported(tmp_path):
+    failing = (sys.executable, "-c", "import sys; sys.stderr.write('no codec'); sys.exit(3)", "{output}")
+    sink = SegmentedEncoderSink(str(tmp_path / "v"), segment_frames=2, command=failing)
+    with pytest.raises(RuntimeError, match="2 of 2 segment.*exit code 3: no codec"):
+        render(sink, range(4))
+    assert not os.path.exists(sink.manifest_path())
+    assert os.path.exists(sink.segments[0].spool)
+
+
+def test_missing_encoder_is_reported(tmp_path):
+    sink = SegmentedEncoderSink(str(tmp_path / "v"), command=(str(tmp_path / "no-such-encoder"), "{output}"))
+    with pytest.raises(RuntimeError, match="FileNotFoundError"):
+        render(sink, range(2))
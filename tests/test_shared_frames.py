@@ -0,0 +1,142 @@
+# tests/test_shared_frames.py
+from __future__ import annotations
+
+import multiprocessing
+import os
+from typing import Any
+
+import cairocffi
+import pytest
+
+from pyspire import FrameRing, OutputProfile, PySpire, SharedMemorySink, Size
+
+if "fork" not in multiprocessing.get_all_start_methods():
+    pytest.skip("tests pass encoders defined here to forked workers", allow_module_level=True)
+
+FORK = multiprocessing.get_context("fork")
+
+
+class Record:
+    """Encoder that writes what it saw in the slot to <directory>/<frame>.txt."""
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def __call__(self, frame_no: int, pixels: memoryview, fmt: int, width: int, height: int, stride: int) -> None:
+        with open(os.path.join(self.directory, f"{frame_no}.txt"), "w") as fh:
+            fh.write(f"{pixels[0]} {pixels[len(pixels) - 1]} {width}x{height}/{stride} {len(pixels)} {os.getpid()}")
+
+
+def failing(frame_no: int, *args: Any) -> None:
+    if frame_no == 1:
+        raise ValueError("disk full")
+
+
+def crash(frame_no: int, *args: Any) -> None:
+    os._exit(1)
+
+
+def read(directory, frame_no: int):
+    return (directory / f"{frame_no}.txt").read_text().split()
+
+
+def test_ring_slots_move_between_free_and_taken():
+    ring = FrameRing(2, 64, ctx=FORK)
+    try:
+        a, b = ring.acquire(), ring.acquire()
+        assert {a, b} == {0, 1}
+        with pytest.raises(TimeoutError):
+            ring.acquire(timeout=0.05)
+        view = ring.view(a, 16)
+        view[:] = bytes(range(16))
+        assert bytes(ring.view(a)[:16]) == bytes(range(16)) and len(ring.view(b)) == 64
+        view.release()
+        ring.release(a)
+        assert ring.acquire(timeout=1) == a
+    finally:
+        ring.close()
+
+
+def stamp(frame_no: int, surface: Any, profile: Any) -> None:
+    """Mark the first and last byte of the frame with the frame number."""
+    data = surface.get_data()
+    data[0:1] = bytes([frame_no])
+    data[len(data) - 1: len(data)] = bytes([frame_no + 100])
+
+
+def test_frames_reach_encoder_processes_through_the_ring(tmp_path):
+    sink = SharedMemorySink(Record(str(tmp_path)), slots=2, workers=2, ctx=FORK)
+    spire = PySpire(size=Size(10, 4), base_filename="unused", sink=sink, frame_hooks=[stamp])
+    for _ in range(6):
+        spire.render_frame()
+    sink.close()
+
+    assert (sink.published, sink.encoded, sink.errors) == (6, 6, [])
+    stride = cairocffi.ImageSurface.format_stride_for_width(cairocffi.FORMAT_ARGB32, 10)
+    pids = set()
+    for n in range(6):
+        first, last, shape, nbytes, pid = read(tmp_path, n)
+        assert (int(first), int(last)) == (n, n + 100)
+        assert shape == f"10x4/{stride}" and int(nbytes) == stride * 4
+        pids.add(int(pid))
+    assert os.getpid() not in pids
+    assert "6 frames by 2 workers" in sink.report()
+
+
+def test_profiles_get_their_own_rings(tmp_path):
+    (tmp_path / "full").mkdir()
+    (tmp_path / "half").mkdir()
+    sinks = [SharedMemorySink(Record(str(tmp_path / name)), slots=2, workers=1, ctx=FORK) for name in ("full", "half")]
+    spire = PySpire(size=Size(16, 8), base_filename="unused",
+                    outputs=[OutputProfile("full", sink=sinks[0]), OutputProfile("half", scale=0.5, sink=sinks[1])])
+    for _ in range(3):
+        spire.render_frame()
+    for sink in sinks:
+        sink.close()
+    assert read(tmp_path / "full", 2)[2].startswith("16x8/")
+    assert read(tmp_path / "half", 2)[2].startswith("8x4/")
+
+
+def test_surfaces_from_elsewhere_are_copied_into_a_slot(tmp_path):
+    sink = SharedMemorySink(Record(str(tmp_path)), slots=1, workers=1, ctx=FORK)
+    surface = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, 4, 2)
+    stamp(7, surface, None)
+    sink.write(7, surface)
+    sink.close()
+    assert read(tmp_path, 7)[:2] == ["7", "107"]
+
+
+def test_encode_failures_surface_on_close():
+    sink = SharedMemorySink(failing, slots=2, workers=1, ctx=FORK)
+    for n in range(3):
+        sink.write(n, sink.frame_surface(cairocffi.FORMAT_ARGB32, 4, 4))
+    with pytest.raises(RuntimeError, match="frame 1: ValueError: disk full"):
+        sink.close()
+    assert sink.encoded == 2
+
+
+def test_discarded_surfaces_give_their_slot_back(tmp_path):
+    sink = SharedMemorySink(Record(str(tmp_path)), slots=1, workers=1, ctx=FORK)
+    sink.discard(sink.frame_surface(cairocffi.FORMAT_ARGB32, 4, 2))
+    sink.write(0, sink.frame_surface(cairocffi.FORMAT_ARGB32, 4, 2))  # would wait forever for the slot
+    sink.close()
+    assert sink.published == sink.encoded == 1
+
+
+def test_dead_encoder_is_reported_on_close():
+    sink = SharedMemorySink(crash, slots=2, workers=1, ctx=FORK)
+    sink.write(0, sink.frame_surface(cairocffi.FORMAT_ARGB32, 4, 4))
+    with pytest.raises(RuntimeError, match="pyspire-encode-0.*exit code 1"):
+        sink.close()
+    assert sink.ring is None and sink._procs == []
+
+
+def test_dead_encoders_do_not_block_rendering():
+    sink = SharedMemorySink(crash, slots=1, workers=1, ctx=FORK)
+    sink.write(0, sink.frame_surface(cairocffi.FORMAT_ARGB32, 4, 4))
+    with pytest.raises(RuntimeError, match="died"):
+        sink.frame_surface(cairocffi.FORMAT_ARGB32, 4, 4)  # the only slot went down with the worker
+    name = sink.ring.name
+    with pytest.raises(RuntimeError, match="died"):
+        sink.close()
+    if os.path.isdir("/dev/shm"):
+        assert not os.path.exists(f"/dev/shm/{name}")  # the block was still removed
@@ -0,0 +1,215 @@
+# tests/test_sinks.py
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from pyspire import (Animation, FrameArchive, FrameArchiveSink, PngSequenceSink, PySpire, RawFrameSink,
+                     RawFrameStore, Size)
+from pyspire.sinks import INDEX_ENTRY, RAW_DATA_OFFSET, count_frames
+
+
+class PngBytes:
+    """Surface stand-in whose encoded form is known up front."""
+    def __init__(self, payload: bytes) -> None:
+        self.payload = payload
+    def write_to_png(self, target=None):
+        if target is None:
+            return self.payload
+        with open(target, "wb") as fh:
+            fh.write(self.payload)
+
+
+def write_frames(path: str, n: int, **kw) -> None:
+    sink = FrameArchiveSink(path, **kw)
+    for i in range(n):
+        sink.write(i, PngBytes(f"frame-{i}".encode() * (i + 1)))
+    sink.close()
+
+
+def test_png_sequence_sink_matches_output_filename(tmp_path):
+    base = str(tmp_path / "f")
+    spire = PySpire(size=Size(4, 4), base_filename=base)
+    sink = PngSequenceSink(base)
+    sink.write(3, PngBytes(b"x"))
+    assert os.path.exists(spire.output_filename(3))
+
+
+def test_archive_random_access_and_iteration(tmp_path):
+    path = str(tmp_path / "frames.pfa")
+    write_frames(path, 5)
+
+    with FrameArchive(path) as archive:
+        assert len(archive) == 5
+        assert archive.frames() == [0, 1, 2, 3, 4]
+        assert archive.read(3) == b"frame-3" * 4
+        assert archive.read(0) == b"frame-0"
+        assert [n for n, _ in archive] == [0, 1, 2, 3, 4]
+
+
+def test_export_back_to_numbered_sequence(tmp_path):
+    path = str(tmp_path / "frames.pfa")
+    write_frames(path, 3)
+    out = tmp_path / "seq"
+    out.mkdir()
+
+    with FrameArchive(path) as archive:
+        assert archive.export(str(out / "cmake_animation")) == 3
+
+    assert (out / "cmake_animation_000002.png").read_bytes() == b"frame-2" * 3
+
+
+def test_index_survives_torn_tail(tmp_path):
+    path = str(tmp_path / "frames.pfa")
+    write_frames(path, 4)
+    # simulate a writer killed mid-frame: half a record, half an index entry
+    with open(path, "ab") as fh:
+        fh.write(b"FRAM\x04\x00")
+    with open(path + ".idx", "ab") as fh:
+        fh.write(INDEX_ENTRY.pack(4, os.path.getsize(path), 999, 0)[:10])
+
+    with FrameArchive(path) as archive:
+        assert archive.frames() == [0, 1, 2, 3]
+
+    # reopening for append trims the damage and continues
+    sink = FrameArchiveSink(path, append=True)
+    sink.write(4, PngBytes(b"late"))
+    sink.close()
+    with FrameArchive(path) as archive:
+        assert archive.frames() == [0, 1, 2, 3, 4]
+        assert archive.read(4) == b"late"
+
+
+def test_records_missing_from_index_are_recovered(tmp_path):
+    path = str(tmp_path / "frames.pfa")
+    write_frames(path, 3)
+    os.remove(path + ".idx")
+
+    with FrameArchive(path) as archive:
+        assert archive.frames() == [0, 1, 2]
+        assert archive.read(1) == b"frame-1" * 2
+
+
+def test_corrupt_frame_is_detected(tmp_path):
+    path = str(tmp_path / "frames.pfa")
+    write_frames(path, 2)
+    with FrameArchive(path) as archive:
+        offset = archive._index[1][0]
+    with open(path, "r+b") as fh:
+        fh.seek(offset)
+        fh.write(b"X")
+
+    with FrameArchive(path) as archive:
+        with pytest.raises(ValueError):
+            archive.read(1)
+
+
+def test_sink_and_frame_cache_are_exclusive(tmp_path):
+    from pyspire import FrameCache
+    with pytest.raises(ValueError):
+        PySpire(size=Size(4, 4), base_filename="x",
+                sink=FrameArchiveSink(str(tmp_path / "a.pfa")),
+                frame_cache=FrameCache(str(tmp_path / "cache")))
+
+
+class Pixels:
+    """ARGB32 surface stand-in whose every byte is `value`."""
+    def __init__(self, value: int, w: int = 3, h: int = 2, stride: int = 16) -> None:
+        self.w, self.h, self.stride = w, h, stride
+        self.data = bytes([value]) * (stride * h)
+    def get_format(self) -> int: return 0
+    def get_width(self) -> int: return self.w
+    def get_height(self) -> int: return self.h
+    def get_stride(self) -> int: return self.stride
+    def get_data(self): return memoryview(self.data)
+    def flush(self) -> None: pass
+
+
+def test_raw_store_random_access(tmp_path):
+    path = str(tmp_path / "frames.raw")
+    sink = RawFrameSink(path, frames=4)
+    for i in range(4):
+        sink.write(i, Pixels(i + 1))
+    sink.close()
+    assert os.path.getsize(path) == RAW_DATA_OFFSET + 4 * 32
+
+    with RawFrameStore(path) as store:
+        assert len(store) == 4
+        assert (store.width, store.height, store.stride) == (3, 2, 16)
+        assert store.read(2) == bytes([3]) * 32
+        with pytest.raises(IndexError):
+            store.read(4)
+
+
+def test_raw_store_grows_past_its_estimate(tmp_path):
+    path = str(tmp_path / "frames.raw")
+    sink = RawFrameSink(path, frames=1)
+    sink.write(0, Pixels(1))
+    sink.write(5, Pixels(6))  # gap: frames 1-4 stay zero
+    assert sink.capacity >= 6
+    sink.close()
+
+    with RawFrameStore(path) as store:
+        assert len(store) == 6
+        assert store.read(3) == bytes(32)
+        assert store.read(5) == bytes([6]) * 32
+
+
+def test_raw_store_rejects_other_geometry(tmp_path):
+    sink = RawFrameSink(str(tmp_path / "frames.raw"))
+    sink.write(0, Pixels(1))
+    with pytest.raises(ValueError, match="holds 3x2"):
+        sink.write(1, Pixels(1, w=4, stride=16))
+    sink.close()
+
+
+def test_raw_store_as_numpy_memmap(tmp_path):
+    pytest.importorskip("numpy")
+    path = str(tmp_path / "frames.raw")
+    sink = RawFrameSink(path)
+    for i in range(3):
+        sink.write(i, Pixels(10 * i))
+    sink.close()
+
+    with RawFrameStore(path) as store:
+        px = store.array()
+    assert px.shape == (3, 2, 3, 4)
+    assert not px.flags.writeable
+    assert int(px[2].min()) == int(px[2].max()) == 20
+    assert not px.flags.owndata  # a view of the mapping, not a copy
+
+
+def test_count_frames_is_a_dry_run(tmp_path):
+    class Walk(Animation):
+        def _updates(self):
+            for i in range(4):
+                yield {"x": i}
+
+    def build() -> PySpire:
+        spire = PySpire(size=Size(4, 4), base_filename=str(tmp_path / "f"))
+        walk = Walk("walk", spire.add_sprite("box"))
+        walk.bus.on("walk_completed", lambda: setattr(spire, "done", True))
+        spire.add_animation(walk)
+        return spire
+
+    assert count_frames(build) == 5
+    assert count_frames(build, limit=5) == 5
+    with pytest.raises(RuntimeError, match="within 2 frames"):
+        count_frames(build, limit=2)
+    assert os.listdir(tmp_path) == []
+
+
+def test_count_frames_stops_scenes_that_never_end(tmp_path):
+    with pytest.raises(RuntimeError, match="did not finish"):
+        count_frames(lambda: PySpire(size=Size(4, 4), base_filename=str(tmp_path / "f")), limit=100)
+
+
+def test_raw_store_with_no_frames(tmp_path):
+    path = str(tmp_path / "frames.raw")
+    RawFrameSink(path).close()
+    assert os.path.getsize(path) == RAW_DATA_OFFSET
+    with RawFrameStore(path) as store:
+        assert len(store) == 0
+        with pytest.raises(IndexError):
+            store.read(0)
@@ -59,3 +59,8 @@ def test_rect_local_matches_offset_and_size():
     layer = SpriteLayer(surface=FakeSurface(64, 32), offset=Vec2(8, 12))
     r = layer.rect_local
     assert (r.x, r.y, r.w, r.h) == (8, 12, 64, 32)
+
+
+def test_positional_fields_keep_their_order():
+    layer = SpriteLayer(FakeSurface(4, 4), "n", Vec2(3, 5), 2.0, 0.5)
+    assert (layer.name, layer.offset, layer.scale, layer.opacity, layer.source) == ("n", Vec2(3, 5), 2.0, 0.5, "")
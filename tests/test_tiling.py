@@ -0,0 +1,82 @@
+# tests/test_tiling.py
+from __future__ import annotations
+
+import threading
+from typing import Any, List
+
+import cairocffi
+import pytest
+
+from pyspire import OutputProfile, PySpire, Size, SpriteLayer, TiledCompositor, Vec2
+from pyspire.outputs import ScaledAssets
+from pyspire.tiling import sprite_rows
+
+
+def card(w: int, h: int, rgba=(0.2, 0.5, 0.9, 0.8)) -> cairocffi.ImageSurface:
+    surface = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, w, h)
+    ctx = cairocffi.Context(surface)
+    ctx.arc(w / 2, h / 2, min(w, h) / 2.2, 0, 6.2832)
+    ctx.set_source_rgba(*rgba)
+    ctx.fill()
+    return surface
+
+
+def make_scene(**kw: Any) -> PySpire:
+    spire = PySpire(size=Size(96, 61), base_filename="unused", **kw)
+    big, small = card(40, 30), card(12, 9, (0.9, 0.1, 0.1, 1.0))
+    for i in range(12):
+        s = spire.add_sprite(f"s{i}")
+        s.layers.append(SpriteLayer(surface=big))
+        s.layers.append(SpriteLayer(surface=small, offset=Vec2(5.5, 3.25), opacity=0.7))
+        s.position = Vec2(i * 7.3 % 70, i * 5.7 % 45)
+        s.opacity = 0.6 + i % 3 * 0.2
+    return spire
+
+
+def pixels(surface: Any) -> bytes:
+    surface.flush()
+    return bytes(surface.get_data())
+
+
+@pytest.mark.parametrize("threads, bands", [(1, 1), (2, 3), (4, 8), (8, 61)])
+@pytest.mark.parametrize("background", [None, (1.0, 1.0, 0.9)])
+def test_tiled_pixels_match_single_threaded(threads, bands, background):
+    expected = pixels(make_scene(background=background).composite())
+    compositor = TiledCompositor(threads, bands=bands)
+    got = pixels(make_scene(background=background, compositor=compositor).composite())
+    compositor.close()
+    assert got == expected
+
+
+def test_tiled_profiles_match_single_threaded():
+    plain = make_scene(outputs=[OutputProfile("half", scale=0.5)])
+    tiled = make_scene(outputs=[OutputProfile("half", scale=0.5)], compositor=TiledCompositor(4))
+    assert pixels(tiled.composite(tiled.outputs[0])) == pixels(plain.composite(plain.outputs[0]))
+
+
+class Spy:
+    """Sprite stand-in that records which thread painted it."""
+    def __init__(self, y: float, h: int) -> None:
+        self.position = Vec2(0, y)
+        self.layers = [SpriteLayer(surface=cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, 4, h))]
+        self.painted: List[str] = []
+
+    def render(self, ctx: Any, assets: Any = None) -> None:
+        self.painted.append(threading.current_thread().name)
+
+
+def test_bands_paint_only_intersecting_sprites():
+    inside, straddling, offscreen = Spy(2, 8), Spy(14, 8), Spy(200, 8)
+    compositor = TiledCompositor(4, bands=4)  # 16 rows per band
+    compositor.composite(cairocffi.FORMAT_ARGB32, 8, 64, [inside, straddling, offscreen])
+    compositor.close()
+    assert len(inside.painted) == 1
+    assert len(straddling.painted) == 2
+    assert offscreen.painted == []
+    assert all(name.startswith("pyspire-tile") for name in inside.painted + straddling.painted)
+
+
+def test_sprite_rows_use_scaled_assets():
+    spy = Spy(10.5, 8)
+    assert sprite_rows(spy) == (9, 20)
+    assert sprite_rows(spy, ScaledAssets(0.5)) == (4, 11)  # 5.25 .. 9.25 with a row of padding
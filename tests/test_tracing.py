@@ -0,0 +1,98 @@
+# tests/test_tracing.py
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, List
+
+from pyspire import Animation, EventQueue, PySpire, Size, Tracer
+
+
+@dataclass
+class DummyTarget:
+    x: int = 0
+
+
+class Count(Animation):
+    def __init__(self, name: str, target: Any, count: int) -> None:
+        super().__init__(name, target)
+        self.count = count
+
+    def _updates(self):
+        for i in range(self.count):
+            yield {"x": i + 1}
+
+
+def names(tracer: Tracer, cat: str) -> List[str]:
+    return [e["name"] for e in tracer.events() if e.get("cat") == cat]
+
+
+def test_frame_stages_become_nested_complete_events():
+    tracer = Tracer()
+    tracer.frame(7, [("animate", 1.0, 1.1), ("composite", 1.1, 1.5), ("write", 1.5, 2.0)])
+    evs = [e for e in tracer.events() if e["ph"] == "X"]
+    assert [e["name"] for e in evs] == ["frame 7", "animate", "composite", "write"]
+    assert evs[0]["dur"] == sum(e["dur"] for e in evs[1:])
+    assert tracer.frame_no == 8
+
+
+def test_animation_lifetimes_and_handlers_are_traced():
+    tracer = Tracer()
+    spire = PySpire(size=Size(8, 8), base_filename="unused", tracer=tracer)
+    anim = Count("walk", DummyTarget(), 1)
+
+    def on_done() -> None:
+        pass
+
+    anim.bus.on("walk_completed", on_done)
+    spire.add_animation(anim)
+    spire.step_animations()
+    spire.step_animations()
+
+    evs = tracer.events()
+    phases = [(e["ph"], e["name"]) for e in evs if e.get("cat") == "animation"]
+    assert phases == [("b", "walk"), ("e", "walk")]
+    (handler,) = [e for e in evs if e.get("cat") == "handler"]
+    assert handler["name"].startswith("walk_completed -> ")
+    assert handler["name"].endswith("on_done")
+    assert handler["args"]["bus"] == "walk"
+
+
+def test_queued_handlers_are_traced_at_drain():
+    tracer = Tracer()
+    spire = PySpire(size=Size(8, 8), base_filename="unused", tracer=tracer, event_queue=EventQueue())
+    spire.bus.on("animation.done", lambda: None)
+    spire.bus.emit("animation.done")
+    assert names(tracer, "handler") == []
+    spire.step_animations()
+    assert len(names(tracer, "handler")) == 1
+
+
+def test_ring_buffer_keeps_newest_records():
+    tracer = Tracer(capacity=3)
+    for i in range(5):
+        tracer.instant(f"tick {i}")
+    assert len(tracer) == 3
+    assert names(tracer, "event") == ["tick 2", "tick 3", "tick 4"]
+
+
+def test_spans_from_worker_threads_get_named_tracks(tmp_path):
+    tracer = Tracer()
+
+    def encode() -> None:
+        with tracer.span("encode", cat="encode", frame=3):
+            pass
+
+    worker = threading.Thread(target=encode, name="encoder-0")
+    worker.start()
+    worker.join()
+
+    path = tmp_path / "trace.json"
+    tracer.save(str(path))
+    data = json.loads(path.read_text())
+    (meta,) = [e for e in data["traceEvents"] if e["ph"] == "M"]
+    (span,) = [e for e in data["traceEvents"] if e["ph"] == "X"]
+    assert meta["args"]["name"] == "encoder-0"
+    assert span["tid"] == meta["tid"]
+    assert span["args"] == {"frame": 3}
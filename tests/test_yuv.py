@@ -0,0 +1,95 @@
+# tests/test_yuv.py
+from __future__ import annotations
+
+import io
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pyspire.yuv import MATRICES, Y4MWriter, bgra_to_yuv420, read_y4m
+
+
+def reference_pixel(r: float, g: float, b: float, matrix: str, full_range: bool):
+    """Textbook scalar conversion, straight from the matrix definitions."""
+    kr, kb = MATRICES[matrix]
+    y = kr * r + (1 - kr - kb) * g + kb * b
+    cb = (b - y) / (2 * (1 - kb))
+    cr = (r - y) / (2 * (1 - kr))
+    if full_range:
+        return y, 128 + cb, 128 + cr
+    return 16 + y * 219 / 255, 128 + cb * 224 / 255, 128 + cr * 224 / 255
+
+
+def solid(r: int, g: int, b: int, h: int = 2, w: int = 2):
+    px = np.zeros((h, w, 4), dtype=np.uint8)
+    px[...] = (b, g, r, 255)
+    return px
+
+
+@pytest.mark.parametrize(
+    "rgb, matrix, full_range, expected",
+    [
+        ((255, 255, 255), "bt709", False, (235, 128, 128)),
+        ((0, 0, 0), "bt709", False, (16, 128, 128)),
+        ((255, 0, 0), "bt601", False, (81, 90, 240)),
+        ((0, 255, 0), "bt601", False, (145, 54, 34)),
+        ((0, 0, 255), "bt601", False, (41, 240, 110)),
+        ((255, 0, 0), "bt709", False, (63, 102, 240)),
+        ((0, 255, 0), "bt709", False, (173, 42, 26)),
+        ((0, 0, 255), "bt709", False, (32, 240, 118)),
+        ((255, 255, 255), "bt601", True, (255, 128, 128)),
+        ((255, 0, 0), "bt601", True, (76, 85, 255)),
+    ],
+)
+def test_golden_primaries(rgb, matrix, full_range, expected):
+    y, u, v = bgra_to_yuv420(solid(*rgb), matrix=matrix, full_range=full_range)
+    assert (int(y[0, 0]), int(u[0, 0]), int(v[0, 0])) == expected
+
+
+@pytest.mark.parametrize("matrix", sorted(MATRICES))
+@pytest.mark.parametrize("full_range", [False, True])
+def test_matches_reference_on_random_frame(matrix, full_range):
+    rng = np.random.default_rng(1234)
+    h, w = 7, 9  # odd on purpose: chroma edges are replicated
+    bgra = rng.integers(0, 256, size=(h, w, 4), dtype=np.uint8)
+    y, u, v = bgra_to_yuv420(bgra, matrix=matrix, full_range=full_range)
+    assert y.shape == (7, 9) and u.shape == v.shape == (4, 5)
+
+    padded = np.pad(bgra.astype(np.float64), ((0, 1), (0, 1), (0, 0)), mode="edge")
+    for i in range(h):
+        for j in range(w):
+            b, g, r = bgra[i, j, :3].astype(float)
+            ry, _, _ = reference_pixel(r, g, b, matrix, full_range)
+            assert abs(int(y[i, j]) - ry) <= 0.5 + 1e-3
+    for i in range(4):
+        for j in range(5):
+            block = padded[2 * i: 2 * i + 2, 2 * j: 2 * j + 2].reshape(4, 4).mean(axis=0)
+            b, g, r = block[:3]
+            _, ru, rv = reference_pixel(r, g, b, matrix, full_range)
+            assert abs(int(u[i, j]) - min(255, max(0, ru))) <= 0.5 + 1e-3
+            assert abs(int(v[i, j]) - min(255, max(0, rv))) <= 0.5 + 1e-3
+
+
+def test_y4m_stream_round_trip():
+    buf = io.BytesIO()
+    writer = Y4MWriter(buf, 4, 2, fps=30, matrix="bt601")
+    frames = [solid(255, 0, 0, 2, 4), solid(0, 0, 0, 2, 4)]
+    for f in frames:
+        writer.write_planes(*bgra_to_yuv420(f, matrix="bt601"))
+    writer.close()
+
+    fields, decoded = read_y4m(buf.getvalue())
+    assert fields["W"] == "4" and fields["H"] == "2" and fields["F"] == "30:1"
+    assert fields["C"] == "420jpeg"
+    assert len(decoded) == 2
+    assert int(decoded[0][0][0, 0]) == 81 and int(decoded[1][0][0, 0]) == 16
+    # 4:2:0 is 1.5 bytes per pixel (12 per 4x2 frame) versus 4 for ARGB32
+    header = buf.getvalue().index(b"\n") + 1
+    assert len(buf.getvalue()) - header == 2 * (len(b"FRAME\n") + 12)
+
+
+def test_y4m_rejects_wrong_frame_size():
+    writer = Y4MWriter(io.BytesIO(), 4, 4)
+    with pytest.raises(ValueError):
+        writer.write_planes(*bgra_to_yuv420(solid(0, 0, 0, 2, 2)))